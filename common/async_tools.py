@@ -0,0 +1,20 @@
+"""Async wrappers for blocking agent tools - keeps the event loop free during file I/O."""
+
+import asyncio
+import functools
+from typing import Callable
+
+
+def run_tool_in_thread(func: Callable) -> Callable:
+    """Wrap a blocking tool so ADK awaits it on a worker thread.
+
+    ADK calls plain functions directly on the event loop, so a slow directory walk in one
+    ParallelAgent branch stalls the model calls of the others. The wrapper keeps the
+    original name and signature, so FunctionTool builds the same declaration.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,44 @@
+"""In-flight request deduplication - concurrent identical LLM requests share one model call."""
+
+import asyncio
+from typing import Any, Dict, Hashable, Optional
+
+
+class InFlightDedup:
+    """Track in-flight requests by key so concurrent duplicates can await the first one.
+
+    The first caller for a key becomes the leader and makes the real call; later callers
+    get the leader's future and wait for its result. Leaders must always call resolve,
+    passing None when they have no usable result so waiters fall back to their own call.
+    """
+
+    def __init__(self):
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+
+    def claim(self, key: Hashable) -> Optional[asyncio.Future]:
+        """Register the caller as leader for key, or return the leader's future to await."""
+        future = self._futures.get(key)
+        if future is not None and not future.done():
+            return future
+
+        self._futures[key] = asyncio.get_running_loop().create_future()
+        return None
+
+    def resolve(self, key: Hashable, result: Any) -> None:
+        """Publish the leader's result (or None) to all waiters and forget the key."""
+        future = self._futures.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    async def wait(self, key: Hashable, future: asyncio.Future, timeout: float) -> Optional[Any]:
+        """Wait for a leader's result, giving up (and dropping the stale entry) on timeout."""
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            # The leader never resolved (e.g. its model call raised), let the next caller lead
+            if self._futures.get(key) is future:
+                self.resolve(key, None)
+            return None
+
+    def __len__(self) -> int:
+        return len(self._futures)
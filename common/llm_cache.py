@@ -0,0 +1,251 @@
+"""LLM response caching for Google ADK agents - skips model calls for repeated requests."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from common.inflight import InFlightDedup
+from common.logging_setup import logger
+
+# State key holding a counter that is bumped on every state change made by tools
+STATE_VERSION_KEY = "__version__"
+
+# How long a duplicate request waits for the in-flight original before calling the model itself
+INFLIGHT_WAIT_TIMEOUT = 120.0
+
+
+def _copy_response(response: Any) -> Any:
+    """Hand out copies so ADK can't mutate a shared response in place."""
+    return response.model_copy(deep=True) if hasattr(response, "model_copy") else response
+
+
+class LLMResponseCache:
+    """Bounded in-memory LRU cache of LLM responses keyed by request hash."""
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a copy of the cached response for key, or None on a miss."""
+        response = self._entries.get(key)
+        if response is None:
+            return None
+        self._entries.move_to_end(key)
+        return _copy_response(response)
+
+    def put(self, key: Hashable, response: Any) -> None:
+        """Store a response, evicting the least recently used entries over the limit."""
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SqliteLLMCache:
+    """Persistent LLM response cache backed by SQLite, shared across runs.
+
+    Responses are stored as JSON and rebuilt with response_type (ADK's LlmResponse
+    by default), so every hit hands out a fresh object.
+    """
+
+    def __init__(self, db_path: str, response_type: Optional[Any] = None):
+        self.db_path = db_path
+        self._response_type = response_type
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache "
+            "(hash TEXT PRIMARY KEY, response BLOB NOT NULL, ts INTEGER NOT NULL)"
+        )
+        self._connection.commit()
+
+    @property
+    def response_type(self):
+        """Class used to rebuild cached responses, imported lazily from ADK."""
+        if self._response_type is None:
+            from google.adk.models import LlmResponse
+
+            self._response_type = LlmResponse
+        return self._response_type
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached response for key, or None on a miss."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response FROM llm_cache WHERE hash = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return self.response_type.model_validate_json(row[0])
+
+    def put(self, key: str, response: Any) -> None:
+        """Store a response, replacing any previous entry for key."""
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_cache (hash, response, ts) VALUES (?, ?, ?)",
+                (key, response.model_dump_json(exclude_none=True), int(time.time())),
+            )
+            self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+def _continues_after_tool_call(llm_request) -> bool:
+    """Check if the request feeds tool output back to the model mid-turn."""
+    contents = getattr(llm_request, "contents", None) or []
+    if not contents:
+        return False
+    parts = getattr(contents[-1], "parts", None) or []
+    return any(getattr(part, "function_response", None) for part in parts)
+
+
+def _is_cacheable(llm_response) -> bool:
+    """Only complete, successful responses with content are worth replaying."""
+    return (
+        getattr(llm_response, "content", None) is not None
+        and not getattr(llm_response, "error_code", None)
+        and not getattr(llm_response, "partial", False)
+    )
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize ADK/genai pydantic objects by value rather than by repr."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    return str(value)
+
+
+def _session_id(callback_context) -> Optional[str]:
+    """Id of the session a callback runs in, so cached responses never cross sessions."""
+    invocation_context = getattr(callback_context, "_invocation_context", None)
+    return getattr(getattr(invocation_context, "session", None), "id", None)
+
+
+def request_cache_key(callback_context, llm_request) -> str:
+    """Hash agent name, model, system instruction and the full request contents.
+
+    This is an exact match on everything sent to the model, so it is safe to persist
+    across runs and to reuse after tool calls.
+    """
+    config = getattr(llm_request, "config", None)
+    payload = json.dumps(
+        {
+            "n": callback_context.agent_name,
+            "m": getattr(llm_request, "model", None),
+            "i": getattr(config, "system_instruction", None),
+            "c": getattr(llm_request, "contents", None),
+        },
+        sort_keys=True,
+        default=_json_default,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def set_versioned_state(state, key: str, value: Any) -> None:
+    """Write a state value and bump the state version if the value changed.
+
+    Rewriting an identical value leaves the version alone, so cache keys built by
+    versioned_cache_key stay valid across loop iterations that change nothing.
+    """
+    if key in state and state[key] == value:
+        return
+    state[key] = value
+    state[STATE_VERSION_KEY] = state.get(STATE_VERSION_KEY, 0) + 1
+
+
+def versioned_cache_key(callback_context, llm_request) -> Optional[Hashable]:
+    """Key on session, agent name and state version, without hashing anything.
+
+    Meant for agents whose requests are fixed by a static instruction plus session state,
+    like the potato loop. The conversation, which grows every loop turn, is left out on
+    purpose, so a turn that finds the state unchanged reuses the previous turn's response.
+    Only valid when every state change that should invalidate the cache goes through
+    set_versioned_state.
+    """
+    if _continues_after_tool_call(llm_request):
+        return None
+
+    return (
+        _session_id(callback_context),
+        callback_context.agent_name,
+        callback_context.state.get(STATE_VERSION_KEY, 0),
+    )
+
+
+def create_cached_model_callbacks(
+    pre_model_callback: Callable,
+    after_model_callback: Callable,
+    cache: Optional[LLMResponseCache] = None,
+    key_func: Callable = request_cache_key,
+    logger_instance: Optional[Any] = None,
+    inflight: Optional[InFlightDedup] = None,
+    inflight_timeout: float = INFLIGHT_WAIT_TIMEOUT,
+) -> Tuple[Callable, Callable]:
+    """Wrap model callbacks so identical requests are answered from a response cache.
+
+    On a hit the pre-model callback returns the cached response, which makes ADK skip
+    the model call (and the wrapped rate limiting). On a miss the wrapped callbacks run
+    as usual and the successful response is stored by the after-model callback.
+
+    With inflight set, a miss that matches a request already in flight waits for that
+    request's response instead of making its own model call.
+
+    Returns:
+        Tuple of (pre_model_callback, after_model_callback)
+    """
+    response_cache = cache if cache is not None else LLMResponseCache()
+    log = logger_instance or logger
+    pending_keys: Dict[Tuple[str, str], str] = {}
+
+    async def pre_model_with_cache(callback_context, llm_request):
+        """Pre-model callback that short-circuits on cache hits."""
+        key = key_func(callback_context, llm_request)
+        if key is not None:
+            cached_response = response_cache.get(key)
+            if cached_response is not None:
+                log.info(f"LLM response cache hit for {callback_context.agent_name}")
+                return cached_response
+            if inflight is not None:
+                leader_future = inflight.claim(key)
+                if leader_future is not None:
+                    shared_response = await inflight.wait(key, leader_future, inflight_timeout)
+                    if shared_response is not None:
+                        log.info(f"Reused in-flight LLM response for {callback_context.agent_name}")
+                        return _copy_response(shared_response)
+                    inflight.claim(key)  # The original failed, lead the retry ourselves
+            pending_keys[(callback_context.invocation_id, callback_context.agent_name)] = key
+
+        result = await pre_model_callback(callback_context, llm_request)
+        if result is not None and key is not None:
+            # ADK skips the model call and the after-model callback, so release waiters now
+            pending_keys.pop((callback_context.invocation_id, callback_context.agent_name), None)
+            if inflight is not None:
+                inflight.resolve(key, None)
+        return result
+
+    async def after_model_with_cache(callback_context, llm_response):
+        """After-model callback that stores successful responses."""
+        key = pending_keys.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        cacheable = False
+        try:
+            result = await after_model_callback(callback_context, llm_response)
+            cacheable = key is not None and result is None and _is_cacheable(llm_response)
+            if cacheable:
+                response_cache.put(key, llm_response)
+            return result
+        finally:
+            if key is not None and inflight is not None:
+                inflight.resolve(key, llm_response if cacheable else None)
+
+    return pre_model_with_cache, after_model_with_cache
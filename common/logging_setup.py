@@ -1,9 +1,11 @@
 """Generic logging configuration for multiple applications."""
 
+import atexit
 import datetime
 import logging
 import logging.handlers
 import os
+import queue
 import sys
 import threading
 
@@ -57,6 +59,39 @@ class LoggerWriter:
         return -1
 
 
+class BackgroundHandler(logging.handlers.QueueHandler):
+    """Queue log records for a background thread that passes them to the wrapped handler.
+
+    Logging calls only enqueue, so file writes stay off the caller's thread (and the
+    event loop). flush() waits until every queued record has been written.
+    """
+
+    def __init__(self, handler):
+        super().__init__(queue.Queue(-1))
+        self.handler = handler
+        self.listener = logging.handlers.QueueListener(
+            self.queue, handler, respect_handler_level=True
+        )
+        self.listener.start()
+        self._stopped = False
+        atexit.register(self.close)
+
+    def flush(self):
+        """Wait until all queued records are handled, then flush the wrapped handler."""
+        if not self._stopped:
+            self.queue.join()
+        self.handler.flush()
+
+    def close(self):
+        """Write out the remaining records and stop the background thread."""
+        if not self._stopped:
+            self._stopped = True
+            atexit.unregister(self.close)  # Don't keep closed handlers alive until exit
+            self.listener.stop()
+            self.handler.close()
+        super().close()
+
+
 def setup_logging(
     app_name="application",
     log_filename_format=None,
@@ -119,18 +154,21 @@ def setup_logging(
     # Clear any existing handlers (helpful when reloading in development)
     for handler in list(logger.handlers):
         logger.removeHandler(handler)
+        handler.close()
 
     # Create formatters
     file_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(name)s - %(message)s")
     console_formatter = logging.Formatter("%(message)s")
 
-    # File handler for detailed logs
+    # File handler for detailed logs, written from a background thread
     file_handler = logging.handlers.RotatingFileHandler(
         log_file, maxBytes=log_max_bytes, backupCount=log_backup_count, encoding="utf-8"
     )
     file_handler.setFormatter(file_formatter)
     file_handler.setLevel(logging.INFO)
-    logger.addHandler(file_handler)
+    background_handler = BackgroundHandler(file_handler)
+    background_handler.setLevel(logging.INFO)
+    logger.addHandler(background_handler)
 
     # Console handler for regular output
     console_handler = logging.StreamHandler(sys.stdout)
@@ -11,18 +11,21 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+
 # --- Uvicorn Logging Configuration ---
 # Modify Uvicorn's default logging config to prevent 'isatty' error
 # by disabling color codes, as MCP's LoggerWriter for stdout/stderr
 # does not have an 'isatty' method.
+def _disable_uvicorn_colors(logging_config: dict) -> None:
+    """Turn off colored output for Uvicorn's default and access log formatters."""
+    formatters = logging_config.get("formatters", {})
+    for formatter_name in ("default", "access"):  # Also for access logs
+        if isinstance(formatters.get(formatter_name), dict):
+            formatters[formatter_name]["use_colors"] = False
+
+
 if hasattr(uvicorn.config, "LOGGING_CONFIG"):
-    if "formatters" in uvicorn.config.LOGGING_CONFIG:
-        if "default" in uvicorn.config.LOGGING_CONFIG["formatters"]:
-            if isinstance(uvicorn.config.LOGGING_CONFIG["formatters"]["default"], dict):
-                uvicorn.config.LOGGING_CONFIG["formatters"]["default"]["use_colors"] = False
-        if "access" in uvicorn.config.LOGGING_CONFIG["formatters"]:  # Also for access logs
-            if isinstance(uvicorn.config.LOGGING_CONFIG["formatters"]["access"], dict):
-                uvicorn.config.LOGGING_CONFIG["formatters"]["access"]["use_colors"] = False
+    _disable_uvicorn_colors(uvicorn.config.LOGGING_CONFIG)
 # --- End Uvicorn Logging Configuration ---
 
 """
@@ -0,0 +1,67 @@
+"""Content hashing of project trees - detects unchanged projects between runs."""
+
+import hashlib
+import os
+
+import gitignore_parser
+
+from common.logging_setup import logger
+
+# Read files in chunks so large artifacts don't have to fit in memory
+HASH_CHUNK_SIZE = 64 * 1024
+
+# Directories that never affect analysis results
+SKIPPED_DIRECTORIES = {".git", "__pycache__"}
+
+
+def _file_digest(file_path: str) -> bytes:
+    """Hash a single file's contents."""
+    file_hasher = hashlib.blake2b(digest_size=32)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            file_hasher.update(chunk)
+    return file_hasher.digest()
+
+
+def _matches_nothing(_path: str) -> bool:
+    """Gitignore matcher for projects without a .gitignore."""
+    return False
+
+
+def project_content_hash(root: str) -> str:
+    """Hash every non-ignored file under root into one digest.
+
+    Each file contributes its relative path and its own content digest, in a stable walk
+    order, so any added, removed, renamed or edited file changes the result. Files matched
+    by the root .gitignore are skipped.
+    """
+    root = os.path.abspath(root)
+    gitignore_path = os.path.join(root, ".gitignore")
+    if os.path.exists(gitignore_path):
+        matches_gitignore = gitignore_parser.parse_gitignore(gitignore_path, base_dir=root)
+    else:
+        matches_gitignore = _matches_nothing  # Keep all files if no .gitignore
+
+    project_hasher = hashlib.blake2b(digest_size=32)
+    for current_dir, dir_names, file_names in os.walk(root):
+        dir_names[:] = sorted(
+            name
+            for name in dir_names
+            if name not in SKIPPED_DIRECTORIES
+            and not matches_gitignore(os.path.join(current_dir, name))
+        )
+
+        for file_name in sorted(file_names):
+            file_path = os.path.join(current_dir, file_name)
+            if matches_gitignore(file_path):
+                continue
+
+            relative_path = os.path.relpath(file_path, root).replace(os.sep, "/")
+            project_hasher.update(relative_path.encode("utf-8") + b"\0")
+            try:
+                project_hasher.update(_file_digest(file_path))
+            except OSError as e:
+                logger.debug(f"Could not read {file_path} for hashing: {e}")
+                project_hasher.update(b"unreadable")
+
+    return project_hasher.hexdigest()
@@ -1,13 +1,29 @@
 """Rate limiting utility for MCP agents - Google ADK compatible."""
 
 import asyncio
+import datetime
+import random
 import re
 import time
 from collections import deque
+from email.utils import parsedate_to_datetime
 from typing import Any, Callable, Optional, Tuple
 
 from common.logging_setup import logger
 
+# Retry delay formats found in 429 errors, tried in order
+RETRY_DELAY_PATTERNS = (
+    re.compile(r"['\"]retryDelay['\"]:\s*['\"](\d+(?:\.\d+)?)s?['\"]"),  # "retryDelay":"5s"
+    re.compile(r"retryDelay:\s*(\d+(?:\.\d+)?)"),  # retryDelay: 5 (without quotes)
+    re.compile(r"[Rr]etry-[Aa]fter:\s*(\d+)"),  # Retry-After header
+)
+
+# Upper bound for the random spread added on top of an API-specified retry delay
+MAX_RETRY_JITTER = 2.0
+
+# Upper bound for the exponential backoff window while 429 errors keep repeating
+MAX_RETRY_BACKOFF = 60.0
+
 
 class RateLimiter:
     """Async-safe rate limiter using sliding window approach for MCP agents."""
@@ -18,69 +34,120 @@ class RateLimiter:
         self.call_history = deque()
         self.lock = asyncio.Lock()
         self._next_allowed_call_time = 0
+        self.consecutive_rate_limits = 0
         self.logger = logger_instance or logger
         self.logger.info(f"Rate limiter initialized: {max_calls} calls per {window_seconds}s")
 
     async def wait_if_needed(self):
-        """Wait until a call can be made without exceeding rate limits."""
+        """Wait until a call can be made without exceeding rate limits.
+
+        The call slot is reserved while holding the lock, but the sleep happens after
+        the lock is released so other callers can reserve their own slots meanwhile.
+        """
         async with self.lock:
-            while True:
-                current_time = time.time()
-
-                # Honor explicit delays first (from 429 errors)
-                if current_time < self._next_allowed_call_time:
-                    wait_time = self._next_allowed_call_time - current_time
-                    self.logger.info(f"Honoring API delay: {wait_time:.2f}s")
-                    await asyncio.sleep(wait_time)
-                    current_time = time.time()
-
-                # Clean old calls from sliding window
-                while (
-                    self.call_history and self.call_history[0] < current_time - self.window_seconds
-                ):
-                    self.call_history.popleft()
-
-                # Allow call if under limit
-                if len(self.call_history) < self.max_calls:
-                    self.call_history.append(current_time)
-                    break
-
-                # Wait for oldest call to expire
-                wait_time = (self.call_history[0] + self.window_seconds) - current_time + 0.01
+            current_time = time.monotonic()
+
+            # Evict calls that have left the sliding window (a call exactly one window old is out)
+            while self.call_history and current_time - self.call_history[0] >= self.window_seconds:
+                self.call_history.popleft()
+
+            # Honor explicit delays first (from 429 errors), never jump ahead of earlier slots
+            slot_time = max(current_time, self._next_allowed_call_time)
+            if self.call_history:
+                slot_time = max(slot_time, self.call_history[-1])
+
+            # Wait for the oldest call in the window to expire if we're at the limit
+            window_full = len(self.call_history) >= self.max_calls
+            if window_full:
+                oldest_in_window = self.call_history[-self.max_calls]
+                slot_time = max(slot_time, oldest_in_window + self.window_seconds + 0.01)
+
+            self.call_history.append(slot_time)
+
+        wait_time = slot_time - current_time
+        if wait_time > 0:
+            if window_full:
                 self.logger.info(f"Rate limit reached. Waiting {wait_time:.2f}s")
-                await asyncio.sleep(wait_time)
+            else:
+                self.logger.info(f"Honoring API delay: {wait_time:.2f}s")
+            await asyncio.sleep(wait_time)
 
     def update_next_allowed_call_time(self, delay_seconds: float):
         """Set minimum time for next call after 429 error."""
-        new_time = time.time() + delay_seconds
+        new_time = time.monotonic() + delay_seconds
         self._next_allowed_call_time = max(self._next_allowed_call_time, new_time)
         self.logger.info(f"Next call delayed by {delay_seconds:.2f}s")
 
+    def back_off(self, retry_delay: float) -> float:
+        """Delay the next call after a 429 error, backing off further while 429s repeat.
+
+        Returns the applied delay.
+        """
+        self.consecutive_rate_limits += 1
+        delay = _backoff_retry_delay(retry_delay, self.consecutive_rate_limits)
+        self.update_next_allowed_call_time(delay)
+        return delay
+
+    def reset_backoff(self):
+        """Start backing off from the API delay again after a successful call."""
+        self.consecutive_rate_limits = 0
+
 
 def _extract_retry_delay(error_content: str) -> float:
     """Extract retry delay from error message."""
     try:
-        # Pattern: "retryDelay":"5s" or 'retryDelay':'5s'
-        delay_match = re.search(
-            r"['\"]retryDelay['\"]:\s*['\"](\d+(?:\.\d+)?)s?['\"]", error_content
-        )
-        if delay_match:
-            return float(delay_match.group(1))
-
-        # Pattern: retryDelay: 5 (without quotes)
-        delay_match = re.search(r"retryDelay:\s*(\d+(?:\.\d+)?)", error_content)
-        if delay_match:
-            return float(delay_match.group(1))
-
-        # Pattern: Retry-After header
-        delay_match = re.search(r"[Rr]etry-[Aa]fter:\s*(\d+)", error_content)
-        if delay_match:
-            return float(delay_match.group(1))
+        for pattern in RETRY_DELAY_PATTERNS:
+            delay_match = pattern.search(error_content)
+            if delay_match:
+                return float(delay_match.group(1))
     except Exception as e:
         logger.debug(f"Could not parse retry delay: {e}")
     return 5.0  # Default delay
 
 
+def _retry_after_delay(error: Any) -> Optional[float]:
+    """Read the delay from the Retry-After header of the HTTP response behind an API error.
+
+    The header holds either seconds or an HTTP date. Returns None when the error carries
+    no response or header, or the value can't be parsed.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    try:
+        retry_after = headers.get("retry-after") if headers is not None else None
+    except Exception as e:
+        logger.debug(f"Could not read Retry-After header: {e}")
+        return None
+    if not isinstance(retry_after, str):
+        return None
+
+    retry_after = retry_after.strip()
+    if retry_after.isdigit():
+        return float(retry_after)
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:  # A "-0000" offset parses to a naive datetime in UTC
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+def _jittered_retry_delay(retry_delay: float) -> float:
+    """Add random jitter to a retry delay so concurrent agents don't retry in lockstep."""
+    return retry_delay + random.uniform(0, min(retry_delay, MAX_RETRY_JITTER))
+
+
+def _backoff_retry_delay(retry_delay: float, consecutive_rate_limits: int) -> float:
+    """Pick a retry delay with exponential backoff and full jitter for repeated 429 errors.
+
+    The backoff window doubles with each consecutive 429, up to MAX_RETRY_BACKOFF, and a
+    random point in it is used. The jittered API delay is always the lower bound.
+    """
+    window = min(MAX_RETRY_BACKOFF, retry_delay * 2 ** (consecutive_rate_limits - 1))
+    return max(_jittered_retry_delay(retry_delay), random.uniform(0, window))
+
+
 def create_rate_limit_callbacks(
     rate_limiter_instance: Optional[RateLimiter] = None,
     logger_instance: Optional[Any] = None,
@@ -110,12 +177,19 @@ def create_rate_limit_callbacks(
     async def handle_rate_limit_and_server_errors(callback_context, llm_response):
         """After-model callback to handle 429 errors."""
         # Check for rate limit errors
-        error_content = ""
+        error, error_content = None, ""
 
         if isinstance(llm_response, Exception):
-            error_content = str(llm_response)
+            status_code = getattr(llm_response, "code", None)  # Set on google.genai API errors
+            if isinstance(status_code, int) and status_code != 429:
+                return None  # Not a rate limit; skip stringifying a possibly large payload
+            error, error_content = llm_response, str(llm_response)
         elif hasattr(llm_response, "error"):
-            error_content = str(getattr(llm_response, "error", ""))
+            error = llm_response.error
+            if not error:
+                limiter.reset_backoff()  # Successful response, the common case
+                return None
+            error_content = str(error)
         elif hasattr(llm_response, "_raw_response") and hasattr(llm_response._raw_response, "text"):
             error_content = llm_response._raw_response.text
 
@@ -124,11 +198,15 @@ def create_rate_limit_callbacks(
         )
 
         if not is_rate_limited:
+            if not error_content:
+                limiter.reset_backoff()
             return None
 
         log.warning(f"Rate limit detected: {error_content[:100]}...")
-        retry_delay = _extract_retry_delay(error_content)
-        limiter.update_next_allowed_call_time(retry_delay + 0.5)
+        retry_delay = _retry_after_delay(error)
+        if retry_delay is None:
+            retry_delay = _extract_retry_delay(error_content)
+        limiter.back_off(retry_delay)
 
         # Return error response
         from google.genai import types
@@ -2,29 +2,18 @@
 
 import asyncio
 import random
-import re
 from typing import Any, Callable, Optional, Tuple
 
+from common.rate_limiting import RETRY_DELAY_PATTERNS
+
 
 def extract_retry_delay(error_content: str) -> float:
     """Extract retry delay from 429 error message."""
     try:
-        # Pattern: "retryDelay":"5s" or 'retryDelay':'5s'
-        delay_match = re.search(
-            r"['\"]retryDelay['\"]:\s*['\"](\d+(?:\.\d+)?)s?['\"]", error_content
-        )
-        if delay_match:
-            return float(delay_match.group(1))
-
-        # Pattern: retryDelay: 5 (without quotes)
-        delay_match = re.search(r"retryDelay:\s*(\d+(?:\.\d+)?)", error_content)
-        if delay_match:
-            return float(delay_match.group(1))
-
-        # Pattern: Retry-After header
-        delay_match = re.search(r"[Rr]etry-[Aa]fter:\s*(\d+)", error_content)
-        if delay_match:
-            return float(delay_match.group(1))
+        for pattern in RETRY_DELAY_PATTERNS:
+            delay_match = pattern.search(error_content)
+            if delay_match:
+                return float(delay_match.group(1))
     except Exception:
         pass
     return 5.0  # Default for 429
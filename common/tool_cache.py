@@ -0,0 +1,81 @@
+"""Memoization for agent tools - cached read-only results and one-time tool declarations."""
+
+import copy
+import functools
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+from google.adk.tools import FunctionTool
+
+from common.logging_setup import logger
+
+# Default number of tool results kept per memoized tool
+TOOL_CACHE_MAX_ENTRIES = 1024
+
+
+def _tool_cache_key(func_name: str, args: tuple, kwargs: dict) -> Tuple[Hashable, ...]:
+    """Build a key from the tool arguments, scoped to the current invocation.
+
+    tool_context itself is left out of the key; only its invocation id is used, so files
+    edited between runs are read again.
+    """
+    tool_context = kwargs.pop("tool_context", None)
+    arguments = json.dumps([args, kwargs], sort_keys=True, default=str)
+    return (func_name, getattr(tool_context, "invocation_id", None), arguments)
+
+
+def _is_error_result(result: Any) -> bool:
+    """Tools report failures as {"error": ...} or {"status": "error", ...}."""
+    return isinstance(result, dict) and ("error" in result or result.get("status") == "error")
+
+
+def memoize_tool(func: Callable = None, *, max_entries: int = TOOL_CACHE_MAX_ENTRIES) -> Callable:
+    """Cache results of a side-effect free tool, keyed on its arguments.
+
+    Only use this for read-only tools; never for tools that write files or session state.
+    Error results are not cached, and callers get a copy so they can't corrupt the cache.
+    The wrapper keeps the original signature, so ADK's FunctionTool sees the same schema.
+    """
+    if func is None:
+        return functools.partial(memoize_tool, max_entries=max_entries)
+
+    results: "OrderedDict[Tuple[Hashable, ...], Any]" = OrderedDict()
+    lock = threading.Lock()  # Tools may run on worker threads
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = _tool_cache_key(func.__name__, args, dict(kwargs))
+        with lock:
+            if key in results:
+                results.move_to_end(key)
+                logger.debug(f"Tool cache hit for {func.__name__}")
+                return copy.deepcopy(results[key])
+
+        result = func(*args, **kwargs)
+        if not _is_error_result(result):
+            with lock:
+                results[key] = copy.deepcopy(result)
+                while len(results) > max_entries:
+                    results.popitem(last=False)
+        return result
+
+    wrapper.cache_clear = results.clear
+    return wrapper
+
+
+class CachedFunctionTool(FunctionTool):
+    """FunctionTool that builds its function declaration once.
+
+    ADK rebuilds a tool's declaration from the function signature every time the tool is
+    added to a model request. A function's signature doesn't change, so the first
+    declaration is kept and reused.
+    """
+
+    def _get_declaration(self):
+        declaration = getattr(self, "_cached_declaration", None)
+        if declaration is None:
+            declaration = super()._get_declaration()
+            self._cached_declaration = declaration
+        return declaration
@@ -14,6 +14,9 @@ from google.adk.tools import ToolContext
 from common.constants import STATE_QUESTIONS, STATE_TARGET_DIRECTORY
 from common.logging_setup import logger
 
+# Structured state payloads at least this large are kept as the validated JSON text
+STRUCTURED_STATE_TEXT_THRESHOLD = 64 * 1024
+
 # --- Human Input Tools ---
 
 
@@ -499,16 +502,35 @@ def get_session_state_direct(
     return default_value
 
 
+def _is_json_text(value: Any) -> bool:
+    """Cheap check for strings that already hold a JSON object or array.
+
+    Agents with an output_key store their JSON answer as text, so re-encoding it would
+    only add a layer of escaping the next agent has to undo.
+    """
+    return isinstance(value, str) and value.lstrip()[:1] in ("{", "[")
+
+
 def set_structured_state(
     key: str, structured_data: str, tool_context: ToolContext | None = None
 ) -> Dict[str, str]:
-    """Store structured data in session state, accepting JSON string input."""
+    """Store structured data in session state, accepting JSON string input.
+
+    Large payloads are stored as the JSON text itself once validated: readers get it back
+    without re-serializing, and the session copies one string instead of a deep object tree.
+    """
     try:
         # Parse the JSON string to get the structured data
         value = json.loads(structured_data)
 
         if tool_context and hasattr(tool_context, "state"):
-            tool_context.state[key] = value
+            if (
+                isinstance(value, (dict, list))
+                and len(structured_data) >= STRUCTURED_STATE_TEXT_THRESHOLD
+            ):
+                tool_context.state[key] = structured_data.strip()
+            else:
+                tool_context.state[key] = value
             logger.info(
                 f"Structured state set for key '{key}' with {len(value) if isinstance(value, (dict, list)) else 'scalar'} items"
             )
@@ -531,6 +553,9 @@ def get_structured_state(
             logger.debug(
                 f"Structured state retrieved for key '{key}' with type {type(value).__name__}"
             )
+            # Already JSON text (e.g. an agent's output_key), hand it over as-is
+            if _is_json_text(value):
+                return value
             # Convert to JSON string for ADK compatibility
             if isinstance(value, (dict, list)):
                 try:
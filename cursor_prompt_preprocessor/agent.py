@@ -8,6 +8,7 @@ from google.adk.agents import LlmAgent, ParallelAgent, SequentialAgent
 from google.adk.agents.loop_agent import LoopAgent
 from google.adk.tools import FunctionTool
 
+from common.async_tools import run_tool_in_thread
 from common.logging_setup import logger
 from common.rate_limiting import RateLimiter, create_rate_limit_callbacks
 from common.tools import (
@@ -102,10 +103,12 @@ set_target_directory_tool = FunctionTool(func=set_target_directory)
 
 
 # Wrapper for ClarifierGenerator to ensure correct tool name registration
-def clarifier_generator_callable():
+def _ask_clarifier():
     return ClarifierGenerator().__call__()
 
 
+# Wait for the console on a worker thread so the event loop keeps serving other work
+clarifier_generator_callable = run_tool_in_thread(_ask_clarifier)
 clarifier_generator_callable.__name__ = "clarify_questions_tool"
 
 clarify_questions_tool = FunctionTool(func=clarifier_generator_callable)
@@ -4,11 +4,24 @@ This agent demonstrates a simple decision loop that requires human clarification
 to proceed. The agent asks the user to include 'potato' in their response to continue.
 """
 
-from typing import Optional
+import asyncio
+import atexit
+import functools
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
 
 from google.adk.agents import LlmAgent, LoopAgent, SequentialAgent
 from google.adk.tools import FunctionTool, ToolContext
 
+from common.llm_cache import (
+    LLMResponseCache,
+    create_cached_model_callbacks,
+    set_versioned_state,
+    versioned_cache_key,
+)
 from common.logging_setup import logger
 
 # Import from common modules
@@ -21,22 +34,55 @@ STATE_TEST_VARIABLE = "test_variable"
 STATE_CLARIFICATION = "clarification"
 STATE_NEEDS_CLARIFICATION = "needs_clarification"
 STATE_FINAL_SUMMARY = "final_summary"
+STATE_CLARIFICATION_ATTEMPTS = "clarification_attempts"
+STATE_CLARIFICATION_ABORTED = "clarification_aborted"
+STATE_DEFER_FINAL_SUMMARY = "defer_final_summary"
+
+# Stop asking once the human has clearly declined to cooperate
+MAX_CLARIFICATION_ATTEMPTS = 3
 
 # Use a modern Gemini model
 GEMINI_MODEL = "gemini-2.5-flash-preview-04-17"
 
+# Deferred final summaries are submitted through the Gemini Batch API at a lower price
+BATCH_SUMMARY_MODEL = "gemini-2.5-flash"
+FINAL_SUMMARY_BATCH_FILE = os.path.join(
+    os.path.expanduser("~"), ".cache", "potato_decision", "final_summary_batch.jsonl"
+)
+
 # Create rate limiter and callbacks
 rate_limiter = RateLimiter(logger_instance=logger)
 pre_model_rate_limit, handle_rate_limit_and_server_errors = create_rate_limit_callbacks(
     rate_limiter_instance=rate_limiter, logger_instance=logger
 )
 
+# One process-wide pool for blocking tool work (console input), shared by all sessions
+_EXECUTOR = ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2, thread_name_prefix="potato")
+atexit.register(_EXECUTOR.shutdown, wait=False)
+
+# Loop turns that find the session state unchanged reuse the previous turn's responses.
+# Tools write state through set_versioned_state, so any real change is a cache miss.
+response_cache = LLMResponseCache()
+pre_model_callback, after_model_callback = create_cached_model_callbacks(
+    pre_model_rate_limit,
+    handle_rate_limit_and_server_errors,
+    cache=response_cache,
+    key_func=versioned_cache_key,
+    logger_instance=logger,
+)
+
 
 # Factory function for creating rate-limited agents
 def create_rate_limited_agent(
-    name, model, instruction, tools=None, output_key=None, sub_agents=None
+    name,
+    model,
+    instruction,
+    tools=None,
+    output_key=None,
+    sub_agents=None,
+    before_agent_callback=None,
 ):
-    """Factory function to create LlmAgents with rate limiting."""
+    """Factory function to create LlmAgents with response caching and rate limiting."""
     return LlmAgent(
         name=name,
         model=model,
@@ -44,8 +90,9 @@ def create_rate_limited_agent(
         tools=tools or [],
         output_key=output_key,
         sub_agents=sub_agents or [],
-        before_model_callback=pre_model_rate_limit,
-        after_model_callback=handle_rate_limit_and_server_errors,
+        before_agent_callback=before_agent_callback,
+        before_model_callback=pre_model_callback,
+        after_model_callback=after_model_callback,
     )
 
 
@@ -55,7 +102,7 @@ def create_rate_limited_agent(
 def set_state_tool(key: str, value: str, tool_context: Optional[ToolContext] = None) -> dict:
     """Tool for setting state values."""
     if tool_context and hasattr(tool_context, "state"):
-        tool_context.state[key] = value
+        set_versioned_state(tool_context.state, key, value)
         logger.info(f"Potato decision state updated: {key}")
         return {"status": "success", "message": f"Stored value in state key '{key}'", "key": key}
 
@@ -74,49 +121,73 @@ def get_state_tool(key: str, tool_context: Optional[ToolContext] = None) -> dict
     return {"status": "error", "message": "No tool context available"}
 
 
+def _mentions_potato(value: Any) -> bool:
+    """Check a prompt or clarification (a string or a list of them) for 'potato'."""
+    if isinstance(value, list):
+        return any("potato" in str(item).lower() for item in value)
+    return isinstance(value, str) and "potato" in value.lower()
+
+
 def check_for_potato(tool_context: Optional[ToolContext] = None) -> dict:
     """Check if 'potato' is in the user prompt or any stored clarification."""
     if not tool_context or not hasattr(tool_context, "state"):
         return {"error": "No tool context available"}
 
-    user_prompt = tool_context.state.get(STATE_USER_PROMPT, "").lower()
-    clarifications_state = tool_context.state.get(STATE_CLARIFICATION, None)
-
-    # Check prompt first
-    has_potato_in_prompt = "potato" in user_prompt
-
-    # Check clarifications (handling list or string)
-    has_potato_in_clarifications = False
-    if isinstance(clarifications_state, list):
-        has_potato_in_clarifications = any(
-            "potato" in str(item).lower() for item in clarifications_state
-        )
-    elif isinstance(clarifications_state, str):
-        has_potato_in_clarifications = "potato" in clarifications_state.lower()
-
-    # Combine checks
-    has_potato = has_potato_in_prompt or has_potato_in_clarifications
+    # Check prompt first; clarifications are only scanned while no potato has been found
+    state = tool_context.state
+    has_potato = _mentions_potato(state.get(STATE_USER_PROMPT, "")) or _mentions_potato(
+        state.get(STATE_CLARIFICATION)
+    )
 
     # Set the needs_clarification state
-    tool_context.state[STATE_NEEDS_CLARIFICATION] = not has_potato
+    set_versioned_state(tool_context.state, STATE_NEEDS_CLARIFICATION, not has_potato)
+
+    # End the loop right away instead of burning the remaining iterations on LLM calls
+    if not has_potato and tool_context.state.get(STATE_CLARIFICATION_ABORTED):
+        tool_context.actions.escalate = True
+        logger.info("Clarification aborted, exiting potato loop")
+        return {"has_potato": False, "needs_clarification": True, "aborted": True}
 
     return {"has_potato": has_potato, "needs_clarification": not has_potato}
 
 
 def clarify_questions_tool_func(tool_context: Optional[ToolContext] = None) -> dict:
-    """Get clarification from the user via console input."""
+    """Get clarification from the user via console input.
+
+    Gives up after MAX_CLARIFICATION_ATTEMPTS per session and marks the clarification
+    as aborted, so check_for_potato can end the loop.
+    """
+    has_state = tool_context is not None and hasattr(tool_context, "state")
+    attempts = tool_context.state.get(STATE_CLARIFICATION_ATTEMPTS, 0) if has_state else 0
+    if attempts >= MAX_CLARIFICATION_ATTEMPTS:
+        set_versioned_state(tool_context.state, STATE_CLARIFICATION_ABORTED, True)
+        logger.info(f"No 'potato' after {attempts} clarification attempts, giving up")
+        return {"reply": "", "abort": True}
+
     print("--- CONSOLE INPUT REQUIRED ---")
     prompt_message = "Could you please include the word 'potato' in your clarification? This is required to proceed: "
     human_reply = input(prompt_message)
     print("--- CONSOLE INPUT RECEIVED ---")
+
+    if has_state:
+        # Bookkeeping no agent instruction reads, so it doesn't bump the state version
+        tool_context.state[STATE_CLARIFICATION_ATTEMPTS] = attempts + 1
     return {"reply": human_reply}
 
 
-# Set the function name for proper tool registration
+async def clarify_questions_tool_async(tool_context: Optional[ToolContext] = None) -> dict:
+    """Get clarification from the user via console input."""
+    # Wait for the console on the shared executor so other sessions keep running
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_EXECUTOR, clarify_questions_tool_func, tool_context)
+
+
+# Set the function names for proper tool registration
 clarify_questions_tool_func.__name__ = "clarify_questions_tool"
+clarify_questions_tool_async.__name__ = "clarify_questions_tool"
 
 # Create the FunctionTool
-clarify_questions_tool = FunctionTool(func=clarify_questions_tool_func)
+clarify_questions_tool = FunctionTool(func=clarify_questions_tool_async)
 
 
 def redirect_and_exit(tool_context: ToolContext) -> dict:
@@ -126,13 +197,126 @@ def redirect_and_exit(tool_context: ToolContext) -> dict:
     return {}
 
 
+# --- Batch Summaries ---
+
+
+def _final_summary_prompt(state: Dict[str, Any]) -> str:
+    """Build the summarization prompt the FinalizerAgent would otherwise send."""
+    return (
+        "Summarize what happened during this potato decision session and congratulate "
+        "the user on including 'potato' in their input.\n\n"
+        f"User prompt: {state.get(STATE_USER_PROMPT, '')}\n"
+        f"Clarifications: {state.get(STATE_CLARIFICATION, '')}"
+    )
+
+
+def queue_final_summary(
+    session_id: str, state: Dict[str, Any], batch_file: str = FINAL_SUMMARY_BATCH_FILE
+) -> dict:
+    """Queue a completed session's final state for a deferred Batch API summary.
+
+    The FinalizerAgent calls this instead of the model when the session state sets
+    STATE_DEFER_FINAL_SUMMARY.
+    """
+    contents = [{"role": "user", "parts": [{"text": _final_summary_prompt(state)}]}]
+    request = {"key": session_id, "request": {"contents": contents}}
+    os.makedirs(os.path.dirname(batch_file), exist_ok=True)
+    with open(batch_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(request) + "\n")
+
+    logger.info(f"Final summary queued for batch processing: {session_id}")
+    return {"status": "queued", "key": session_id, "batch_file": batch_file}
+
+
+def submit_final_summary_batch(client, batch_file: str = FINAL_SUMMARY_BATCH_FILE):
+    """Submit all queued final summaries as one Gemini batch job.
+
+    Meant to be called periodically (e.g. hourly). The queue is first moved aside to a
+    pending file, so sessions queued during the upload wait for the next submission.
+    A pending file left by a failed submission is submitted before the queue is moved.
+
+    Args:
+        client: google.genai Client instance
+        batch_file: JSONL file with queued summary requests
+
+    Returns:
+        The created batch job, or None if nothing was queued
+    """
+    pending_file = f"{batch_file}.pending"
+    if not os.path.exists(pending_file):
+        if not os.path.exists(batch_file) or os.path.getsize(batch_file) == 0:
+            return None
+        os.replace(batch_file, pending_file)
+
+    from google.genai import types
+
+    uploaded_file = client.files.upload(
+        file=pending_file,
+        config=types.UploadFileConfig(display_name="final-summaries", mime_type="jsonl"),
+    )
+    batch_job = client.batches.create(
+        model=BATCH_SUMMARY_MODEL,
+        src=uploaded_file.name,
+        config={"display_name": "potato-final-summaries"},
+    )
+    os.remove(pending_file)
+
+    logger.info(f"Final summary batch submitted: {batch_job.name}")
+    return batch_job
+
+
+def defer_final_summary(callback_context):
+    """Before-agent callback that queues the final summary instead of running the model.
+
+    Only applies when the caller set STATE_DEFER_FINAL_SUMMARY in the session state, i.e.
+    it doesn't need the summary within the same request.
+    """
+    if not callback_context.state.get(STATE_DEFER_FINAL_SUMMARY):
+        return None
+
+    session_id = callback_context._invocation_context.session.id
+    queue_final_summary(session_id, callback_context.state)
+
+    from google.genai import types
+
+    message = "Your session summary has been queued and will be ready later."
+    return types.Content(role="model", parts=[types.Part(text=message)])
+
+
+def collect_final_summaries(client, batch_job_name: str) -> Dict[str, str]:
+    """Collect summaries from a finished batch job, keyed by session id.
+
+    Callers store each summary in the session state under STATE_FINAL_SUMMARY.
+    Returns an empty dict while the job is still running.
+    """
+    batch_job = client.batches.get(name=batch_job_name)
+    if batch_job.state.name != "JOB_STATE_SUCCEEDED":
+        logger.info(f"Final summary batch {batch_job_name} is {batch_job.state.name}")
+        return {}
+
+    summaries = {}
+    content = client.files.download(file=batch_job.dest.file_name).decode("utf-8")
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        try:
+            parts = result["response"]["candidates"][0]["content"]["parts"]
+            summaries[result["key"]] = "".join(part.get("text", "") for part in parts)
+        except (KeyError, IndexError):
+            logger.warning(f"No summary returned for session {result.get('key')}")
+
+    return summaries
+
+
 # --- Agents ---
+# Agents are built lazily on first use, so importing this module (e.g. for its tools)
+# doesn't construct the whole agent graph.
 
-# Initial Agent - sets test_variable from user prompt
-initial_agent = create_rate_limited_agent(
-    name="InitialAgent",
-    model=GEMINI_MODEL,
-    instruction=f"""
+# Instructions are built once and interned, so every agent build and request shares
+# the same string objects
+INITIAL_INSTRUCTION = sys.intern(
+    f"""
     You are the Initial Agent. Your task is to:
     1. Extract the user prompt from '{STATE_USER_PROMPT}' in the state
     2. Store it in '{STATE_TEST_VARIABLE}' using the set_state tool
@@ -140,16 +324,10 @@ initial_agent = create_rate_limited_agent(
     
     If 'potato' is found, indicate that no clarification is needed.
     If 'potato' is not found, indicate that clarification will be needed.
-    """,
-    tools=[FunctionTool(func=set_state_tool), FunctionTool(func=check_for_potato)],
-    output_key=STATE_TEST_VARIABLE,
+    """
 )
-
-# Clarification Agent - asks for clarification if needed
-clarification_agent = create_rate_limited_agent(
-    name="ClarificationAgent",
-    model=GEMINI_MODEL,
-    instruction=f"""
+CLARIFICATION_INSTRUCTION = sys.intern(
+    f"""
     You are the Clarification Agent. Your task is to:
     1. Check the state key '{STATE_NEEDS_CLARIFICATION}' 
     2. If it's True, ask the user for clarification using the clarify_questions_tool
@@ -157,34 +335,21 @@ clarification_agent = create_rate_limited_agent(
     4. Call check_for_potato again to see if the clarification contains 'potato'
     
     Keep asking for clarification until 'potato' is found in the user's response.
-    """,
-    tools=[
-        clarify_questions_tool,
-        FunctionTool(func=set_state_tool),
-        FunctionTool(func=check_for_potato),
-    ],
+    If clarify_questions_tool returns "abort": true, stop asking and call check_for_potato.
+    """
 )
-
-# Decision Agent - makes the final decision
-decision_agent = create_rate_limited_agent(
-    name="DecisionAgent",
-    model=GEMINI_MODEL,
-    instruction=f"""
+DECISION_INSTRUCTION = sys.intern(
+    f"""
     You are the Decision Agent. Your task is to:
     1. Check if '{STATE_NEEDS_CLARIFICATION}' is False (meaning 'potato' was found)
     2. If so, congratulate the user and end the loop by calling redirect_and_exit
     3. If not, allow the loop to continue
     
     Only call redirect_and_exit when the clarification process is complete.
-    """,
-    tools=[FunctionTool(func=get_state_tool), FunctionTool(func=redirect_and_exit)],
+    """
 )
-
-# Finalizer Agent - provides the final response
-finalizer_agent = create_rate_limited_agent(
-    name="FinalizerAgent",
-    model=GEMINI_MODEL,
-    instruction=f"""
+FINALIZER_INSTRUCTION = sys.intern(
+    f"""
     You are the Finalizer Agent. You are called when the potato decision loop has completed successfully.
     
     Your task is to:
@@ -192,20 +357,97 @@ finalizer_agent = create_rate_limited_agent(
     2. Provide a summary of what happened during the process
     3. Congratulate the user on successfully including 'potato' in their input
     
+    If '{STATE_CLARIFICATION_ABORTED}' is True, the user never included 'potato'. In that case
+    summarize the attempts instead of congratulating the user.
+    
     Be friendly and summarize the interaction.
-    """,
-    tools=[FunctionTool(func=get_state_tool)],
+    """
 )
 
-# Create the loop agent that will repeatedly run until 'potato' is found
-potato_loop = LoopAgent(
-    name="PotatoLoop",
-    sub_agents=[initial_agent, clarification_agent, decision_agent],
-    max_iterations=5,  # Prevent infinite loops
-)
 
-# Main sequential agent that runs the loop then the finalizer
-root_agent = SequentialAgent(name="PotatoDecisionAgent", sub_agents=[potato_loop, finalizer_agent])
+@functools.cache
+def get_initial_agent() -> LlmAgent:
+    """Initial Agent - sets test_variable from user prompt."""
+    return create_rate_limited_agent(
+        name="InitialAgent",
+        model=GEMINI_MODEL,
+        instruction=INITIAL_INSTRUCTION,
+        tools=[FunctionTool(func=set_state_tool), FunctionTool(func=check_for_potato)],
+        output_key=STATE_TEST_VARIABLE,
+    )
+
+
+@functools.cache
+def get_clarification_agent() -> LlmAgent:
+    """Clarification Agent - asks for clarification if needed."""
+    return create_rate_limited_agent(
+        name="ClarificationAgent",
+        model=GEMINI_MODEL,
+        instruction=CLARIFICATION_INSTRUCTION,
+        tools=[
+            clarify_questions_tool,
+            FunctionTool(func=set_state_tool),
+            FunctionTool(func=check_for_potato),
+        ],
+    )
+
+
+@functools.cache
+def get_decision_agent() -> LlmAgent:
+    """Decision Agent - makes the final decision."""
+    return create_rate_limited_agent(
+        name="DecisionAgent",
+        model=GEMINI_MODEL,
+        instruction=DECISION_INSTRUCTION,
+        tools=[FunctionTool(func=get_state_tool), FunctionTool(func=redirect_and_exit)],
+    )
+
+
+@functools.cache
+def get_finalizer_agent() -> LlmAgent:
+    """Finalizer Agent - provides the final response."""
+    return create_rate_limited_agent(
+        name="FinalizerAgent",
+        model=GEMINI_MODEL,
+        instruction=FINALIZER_INSTRUCTION,
+        tools=[FunctionTool(func=get_state_tool)],
+        before_agent_callback=defer_final_summary,
+    )
+
+
+@functools.cache
+def get_potato_loop() -> LoopAgent:
+    """Loop agent that will repeatedly run until 'potato' is found."""
+    return LoopAgent(
+        name="PotatoLoop",
+        sub_agents=[get_initial_agent(), get_clarification_agent(), get_decision_agent()],
+        max_iterations=5,  # Prevent infinite loops
+    )
+
+
+@functools.cache
+def get_root_agent() -> SequentialAgent:
+    """Main sequential agent that runs the loop then the finalizer."""
+    return SequentialAgent(
+        name="PotatoDecisionAgent", sub_agents=[get_potato_loop(), get_finalizer_agent()]
+    )
+
+
+_AGENT_FACTORIES = {
+    "initial_agent": get_initial_agent,
+    "clarification_agent": get_clarification_agent,
+    "decision_agent": get_decision_agent,
+    "finalizer_agent": get_finalizer_agent,
+    "potato_loop": get_potato_loop,
+    "root_agent": get_root_agent,
+}
+
+
+def __getattr__(name: str):
+    """Keep `agent.root_agent` (used by ADK discovery) and friends working lazily."""
+    if name in _AGENT_FACTORIES:
+        return _AGENT_FACTORIES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def create_enhanced_potato_runner(session_service):
@@ -215,7 +457,7 @@ def create_enhanced_potato_runner(session_service):
     Google AI ClientError exceptions and retry them with proper delays.
     """
     return create_enhanced_runner(
-        agent=root_agent,
+        agent=get_root_agent(),
         app_name="PotatoDecisionWithRetry",
         session_service=session_service,
         max_retries=3,
@@ -4,13 +4,22 @@ This module contains all the LLM agents used in the Project Test Summarizer,
 defining their names, prompts, and tools for test analysis.
 """
 
+import functools
+import json
+import sys
+
 from google.adk.agents import LlmAgent, ParallelAgent, SequentialAgent
 from google.adk.agents.loop_agent import LoopAgent
-from google.adk.tools import FunctionTool
+from google.adk.models import Gemini
 
+from common.async_tools import run_tool_in_thread
+from common.inflight import InFlightDedup
+from common.llm_cache import SqliteLLMCache, create_cached_model_callbacks, request_cache_key
 from common.logging_setup import setup_logging
 from common.rate_limiting import RateLimiter, create_rate_limit_callbacks
+from common.tool_cache import CachedFunctionTool, memoize_tool
 from common.tools import (
+    STRUCTURED_STATE_TEXT_THRESHOLD,
     get_session_state,
     get_session_state_direct,
     get_structured_state,
@@ -24,25 +33,43 @@ from common.tools import (
 
 # Import from our modules
 from project_test_summarizer.config import (
-    GEMINI_MODEL,
+    ANALYSIS_WORKERS,
+    GEMINI_MODEL_FAST,
+    GEMINI_MODEL_PRO,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_FILE,
     NO_ISSUES_FOUND,
     RATE_LIMIT_MAX_CALLS,
     RATE_LIMIT_WINDOW,
     STATE_AI_REPORT,
+    STATE_ANALYSIS_CHUNK,
     STATE_EXTRACTED_TESTS,
+    STATE_FRAMEWORK_NOTES,
     STATE_HUMAN_REPORT,
+    STATE_PROJECT_HASH,
     STATE_PROJECT_SUMMARY,
     STATE_TARGET_PROJECT,
     STATE_TEST_ANALYSIS,
+    STATE_TEST_ANALYSIS_COMPACT,
     STATE_TEST_REPORTS,
 )
+from project_test_summarizer.instructions import specialize_analysis_instruction
+from project_test_summarizer.schemas import AIReport, HumanReport, ProjectSummary
 from project_test_summarizer.tools import (
+    analysis_progress_key,
     analyze_multiple_test_reports,
     analyze_test_report_content,
-    discover_test_files,
+    assemble_test_analysis,
+    compact_test_analysis,
+    dedupe_extracted_tests,
+    detected_test_framework,
+    discover_and_analyze_test_reports,
     discover_test_reports,
-    save_analysis_report,
+    export_analysis_report,
+    hash_target_project,
+    record_test_analysis,
     search_test_by_name,
+    split_extracted_tests,
 )
 
 # Set up logging and rate limiting for this module
@@ -56,68 +83,240 @@ pre_model_rate_limit, handle_rate_limit_and_server_errors = create_rate_limit_ca
     rate_limiter_instance=rate_limiter, logger_instance=logger
 )
 
+
+def project_request_cache_key(callback_context, llm_request) -> str:
+    """Exact-match request key, scoped to the analyzed project's content hash when known."""
+    request_key = request_cache_key(callback_context, llm_request)
+    project_hash = callback_context.state.get(STATE_PROJECT_HASH)
+    return f"{project_hash}:{request_key}" if project_hash else request_key
+
+
+# Re-runs on the same project send identical prompts, so optionally answer them from disk.
+# Concurrent identical requests (e.g. ParallelAgent branches) share one in-flight model call.
+if LLM_CACHE_ENABLED:
+    pre_model_callback, after_model_callback = create_cached_model_callbacks(
+        pre_model_rate_limit,
+        handle_rate_limit_and_server_errors,
+        cache=SqliteLLMCache(LLM_CACHE_FILE),
+        key_func=project_request_cache_key,
+        logger_instance=logger,
+        inflight=InFlightDedup(),
+    )
+else:
+    pre_model_callback, after_model_callback = (
+        pre_model_rate_limit,
+        handle_rate_limit_and_server_errors,
+    )
+
+
 # Universal constraint preamble for all agents
 AGENT_INSTRUCTION_PREAMBLE = """IMPORTANT: You are a test analysis specialist. Your capabilities are strictly limited to analyzing, understanding, and discovering existing test files and test reports using ONLY the tools explicitly provided to you. You CANNOT create, write, modify, or delete files or directories. You CANNOT execute code or terminal commands. You CANNOT run tests. Your role is purely analytical - to examine existing test artifacts and provide insights about test quality, consistency, and naming. If you believe files need to be created or modified, state this as a suggestion in your textual response, but DO NOT attempt to perform the action."""
 
 
+# Every agent's instruction starts with this exact prefix, so Gemini's implicit prefix
+# caching can reuse it across agents and requests
+AGENT_INSTRUCTION_PREFIX = sys.intern(AGENT_INSTRUCTION_PREAMBLE + "\n\n")
+
+
+# Shared input section of the report agents, placed right after the universal preamble so
+# all three send one longer identical prefix
+REPORT_AGENT_PREFIX = f"""
+    You are one of the report generators working from the completed test analysis.
+    The compact analysis below holds the summary, per-score counts with example tests, and
+    every test with issues:
+
+    {{{STATE_TEST_ANALYSIS_COMPACT}?}}
+
+    Your answer is returned as structured JSON and saved to session state automatically.
+"""
+
+
+def analysis_chunk_key(index):
+    """State key holding the tests assigned to one analysis worker."""
+    return f"{STATE_ANALYSIS_CHUNK}_{index}"
+
+
+def distribute_extracted_tests(callback_context):
+    """Before-agent callback that prepares the analysis workers' instruction inputs.
+
+    Each worker gets its own chunk of the extracted tests as JSON text in state, injected
+    into its instruction. If the extracted tests can't be parsed, the first worker gets them
+    unchanged. Notes for the detected test framework are shared by all workers.
+
+    Recorded results are only cleared once an analysis completes, so tests recorded by an
+    interrupted run (with a persistent session service) are skipped and merged as they are.
+    """
+    framework = detected_test_framework(callback_context.state.get(STATE_TEST_REPORTS))
+    callback_context.state[STATE_FRAMEWORK_NOTES] = specialize_analysis_instruction(framework)
+
+    analyzed_names = {
+        test.get("test_name")
+        for worker_name in ANALYSIS_WORKER_INDEX
+        for test in callback_context.state.get(analysis_progress_key(worker_name)) or []
+        if isinstance(test, dict)
+    }
+    if analyzed_names:
+        logger.info(f"Resuming test analysis, {len(analyzed_names)} tests already recorded")
+
+    extracted = callback_context.state.get(STATE_EXTRACTED_TESTS)
+    chunks = split_extracted_tests(extracted, ANALYSIS_WORKERS, analyzed_names)
+    if chunks is None:
+        chunks = [extracted] if extracted else []
+
+    for index in range(ANALYSIS_WORKERS):
+        chunk = chunks[index] if index < len(chunks) else None
+        callback_context.state[analysis_chunk_key(index)] = json.dumps(chunk) if chunk else ""
+    logger.info(f"Split extracted tests into {len(chunks)} analysis chunks")
+    return None
+
+
+def skip_empty_chunk(callback_context):
+    """Before-agent callback that skips analysis workers with no tests assigned."""
+    index = ANALYSIS_WORKER_INDEX[callback_context.agent_name]
+    if callback_context.state.get(analysis_chunk_key(index)):
+        return None
+
+    from google.genai import types
+
+    return types.Content(role="model", parts=[types.Part(text="No tests assigned.")])
+
+
+def finalize_test_analysis(callback_context):
+    """After-agent callback that merges the workers' results and condenses them for reports.
+
+    Tests recorded by each worker are concatenated, in chunk order, into the full analysis.
+    A large analysis is stored as compact JSON text, like large structured state, so the
+    session holds one string instead of a deep object tree; every reader accepts both.
+    The compact version is stored as JSON text, since ADK injects it verbatim into the report
+    agents' instructions, and falls back to the full analysis if that can't be parsed.
+    """
+    analyzed_tests = []
+    for worker_name in ANALYSIS_WORKER_INDEX:
+        progress_key = analysis_progress_key(worker_name)
+        analyzed_tests.extend(callback_context.state.get(progress_key) or [])
+        if progress_key in callback_context.state:
+            callback_context.state[progress_key] = []  # Start fresh on the next run
+
+    if analyzed_tests:
+        analysis = assemble_test_analysis(analyzed_tests)
+        analysis_text = json.dumps(analysis, separators=(",", ":"))
+        large = len(analysis_text) >= STRUCTURED_STATE_TEXT_THRESHOLD
+        callback_context.state[STATE_TEST_ANALYSIS] = analysis_text if large else analysis
+    else:
+        analysis = callback_context.state.get(STATE_TEST_ANALYSIS)
+
+    compact = compact_test_analysis(analysis)
+    if compact is not None:
+        callback_context.state[STATE_TEST_ANALYSIS_COMPACT] = json.dumps(compact)
+    elif analysis is not None:
+        callback_context.state[STATE_TEST_ANALYSIS_COMPACT] = str(analysis)
+    return None
+
+
+# Agents given a model name get a new Gemini instance, and so a new genai client with its own
+# connections, for every model call. Sharing one instance per model lets all agents reuse a
+# single client and its connection pool.
+_shared_models = {}
+
+
+def shared_model(model_name):
+    """Return the process-wide Gemini instance for a model name."""
+    if model_name not in _shared_models:
+        _shared_models[model_name] = Gemini(model=model_name)
+    return _shared_models[model_name]
+
+
 def create_rate_limited_agent(
-    name, model, instruction, tools=None, output_key=None, sub_agents=None
+    name,
+    model,
+    instruction,
+    tools=None,
+    output_key=None,
+    sub_agents=None,
+    instruction_prefix="",
+    after_agent_callback=None,
+    output_schema=None,
+    before_agent_callback=None,
+    include_contents="default",
 ):
-    """Create an LlmAgent with rate limiting and universal constraints applied."""
+    """Create an LlmAgent with rate limiting and universal constraints applied.
+
+    instruction_prefix is inserted between the universal preamble and the agent's own
+    instruction, for sections shared by a group of agents. With output_schema set, the
+    model answers in JSON mode and ADK stores the validated result under output_key;
+    such agents can't use tools. include_contents="none" leaves earlier conversation history
+    out of the agent's requests, for agents that get everything they need from state.
+    """
 
-    full_instruction = AGENT_INSTRUCTION_PREAMBLE + "\n\n" + instruction
+    full_instruction = sys.intern(AGENT_INSTRUCTION_PREFIX + instruction_prefix + instruction)
 
     # Create the base agent with enhanced callbacks
     return LlmAgent(
         name=name,
-        model=model,
+        model=shared_model(model) if isinstance(model, str) else model,
         instruction=full_instruction,
         tools=tools or [],
         output_key=output_key,
         sub_agents=sub_agents or [],
-        before_model_callback=pre_model_rate_limit,
-        after_model_callback=handle_rate_limit_and_server_errors,
+        before_model_callback=pre_model_callback,
+        after_model_callback=after_model_callback,
+        before_agent_callback=before_agent_callback,
+        after_agent_callback=after_agent_callback,
+        output_schema=output_schema,
+        include_contents=include_contents,
     )
 
 
 # --- Tool Wrappers ---
 
+
+def read_only_tool(func):
+    """Wrap a side-effect free filesystem tool for use by the agents.
+
+    Results are memoized, since the analysis agents repeat identical searches and reads
+    within a run, and calls run on a worker thread so one agent's directory walk doesn't
+    block the event loop (and the parallel report agents' model calls). Tools that write
+    files or session state must use a plain CachedFunctionTool.
+    """
+    return CachedFunctionTool(func=run_tool_in_thread(memoize_tool(func)))
+
+
 # Create tool wrappers for our specialized test analysis tools
-discover_test_reports_tool = FunctionTool(func=discover_test_reports)
-analyze_test_report_content_tool = FunctionTool(func=analyze_test_report_content)
-analyze_multiple_test_reports_tool = FunctionTool(func=analyze_multiple_test_reports)
-discover_test_files_tool = FunctionTool(func=discover_test_files)
-search_test_by_name_tool = FunctionTool(func=search_test_by_name)
-save_analysis_report_tool = FunctionTool(func=save_analysis_report)
+discover_test_reports_tool = read_only_tool(discover_test_reports)
+discover_and_analyze_test_reports_tool = read_only_tool(discover_and_analyze_test_reports)
+analyze_test_report_content_tool = read_only_tool(analyze_test_report_content)
+analyze_multiple_test_reports_tool = read_only_tool(analyze_multiple_test_reports)
+search_test_by_name_tool = read_only_tool(search_test_by_name)
+export_analysis_report_tool = CachedFunctionTool(func=export_analysis_report)
+record_test_analysis_tool = CachedFunctionTool(func=record_test_analysis)
+dedupe_extracted_tests_tool = CachedFunctionTool(func=dedupe_extracted_tests)
+hash_target_project_tool = CachedFunctionTool(func=run_tool_in_thread(hash_target_project))
 
 # Import common tools
-read_file_content_tool = FunctionTool(func=read_file_content)
-list_directory_contents_tool = FunctionTool(func=list_directory_contents)
-search_codebase_tool = FunctionTool(func=search_codebase)
-get_session_state_tool = FunctionTool(func=get_session_state)
-set_session_state_tool = FunctionTool(func=set_session_state)
+read_file_content_tool = read_only_tool(read_file_content)
+list_directory_contents_tool = read_only_tool(list_directory_contents)
+search_codebase_tool = read_only_tool(search_codebase)
+get_session_state_tool = CachedFunctionTool(func=get_session_state)
+set_session_state_tool = CachedFunctionTool(func=set_session_state)
 
 # Improved session state tools for structured data
-get_structured_state_tool = FunctionTool(func=get_structured_state)
-set_structured_state_tool = FunctionTool(func=set_structured_state)
-get_session_state_direct_tool = FunctionTool(func=get_session_state_direct)
-set_session_state_direct_tool = FunctionTool(func=set_session_state_direct)
+get_structured_state_tool = CachedFunctionTool(func=get_structured_state)
+set_structured_state_tool = CachedFunctionTool(func=set_structured_state)
+get_session_state_direct_tool = CachedFunctionTool(func=get_session_state_direct)
+set_session_state_direct_tool = CachedFunctionTool(func=set_session_state_direct)
 
 # --- LLM Agents ---
 
 # Test Report Discovery Agent
-test_report_discovery_agent = create_rate_limited_agent(
-    name="TestReportDiscoveryAgent",
-    model=GEMINI_MODEL,
-    instruction=f"""
+TEST_REPORT_DISCOVERY_INSTRUCTION = f"""
     You are a Test Report Discovery Agent.
     Your task is to discover and analyze test reports in the target project directory.
     
     Your workflow:
-    1. Get the target project directory from session state key '{STATE_TARGET_PROJECT}' using get_structured_state
-    2. Use the discover_test_reports tool to find test report files in the project
-    3. **IMPORTANT**: If you find many report files (10+), use analyze_multiple_test_reports with the list of absolute file paths for efficient batch processing
-    4. If you find only a few report files (<10), you may use analyze_test_report_content for individual files
+    1. The target project directory is: {{{STATE_TARGET_PROJECT}?}}
+    2. **IMPORTANT**: Call discover_and_analyze_test_reports with the target directory - it finds all test report files and extracts their tests in one call, returning 'discovery_result' and 'analysis_result'
+    3. Only if you need to re-check individual files, use discover_test_reports, analyze_multiple_test_reports or analyze_test_report_content
+    4. Identify the test framework from the report formats and test names
     5. **CRITICAL**: Store the COMPLETE STRUCTURED DATA as JSON string in session state key '{STATE_TEST_REPORTS}' using set_structured_state
     
     **Data Storage Guidelines**:
@@ -127,9 +326,8 @@ test_report_discovery_agent = create_rate_limited_agent(
     - The next agent needs the structured test data to extract test names
     
     **Batch Processing Guidelines**:
-    - For 10+ reports: Use analyze_multiple_test_reports with a list of absolute file paths
-    - This avoids making 100+ individual tool calls and is much more efficient
-    - The batch tool returns aggregated results with deduplication and summary statistics
+    - discover_and_analyze_test_reports avoids making 100+ individual tool calls and passing file lists around
+    - It returns aggregated results with deduplication and summary statistics
     
     **JSON Storage Format**:
     Use set_structured_state to store a JSON string like:
@@ -139,23 +337,30 @@ test_report_discovery_agent = create_rate_limited_agent(
         "framework_detected": "detected framework name",
         "summary": "brief summary for logging"
     }}
-    """,
-    tools=[
-        get_structured_state_tool,
-        discover_test_reports_tool,
-        analyze_test_report_content_tool,
-        analyze_multiple_test_reports_tool,
-        list_directory_contents_tool,
-        set_structured_state_tool,
-    ],
-    output_key=STATE_TEST_REPORTS,
-)
+    """
+
+
+@functools.cache
+def get_test_report_discovery_agent() -> LlmAgent:
+    """Test Report Discovery Agent - finds test reports and extracts their tests."""
+    return create_rate_limited_agent(
+        name="TestReportDiscoveryAgent",
+        model=GEMINI_MODEL_FAST,
+        instruction=TEST_REPORT_DISCOVERY_INSTRUCTION,
+        tools=[
+            discover_and_analyze_test_reports_tool,
+            discover_test_reports_tool,
+            analyze_test_report_content_tool,
+            analyze_multiple_test_reports_tool,
+            list_directory_contents_tool,
+            set_structured_state_tool,
+        ],
+        output_key=STATE_TEST_REPORTS,
+    )
+
 
 # Test Name Extraction Agent
-test_extraction_agent = create_rate_limited_agent(
-    name="TestExtractionAgent",
-    model=GEMINI_MODEL,
-    instruction=f"""
+TEST_EXTRACTION_INSTRUCTION = f"""
     You are a Test Name Extraction Agent.
     Your task is to extract and consolidate all unique test names from the discovered test reports.
     
@@ -165,7 +370,8 @@ test_extraction_agent = create_rate_limited_agent(
     3. Extract all unique test names from the structured test data
     4. Clean and normalize test names (handle duplicates, variations)
     5. Identify likely parameterized tests (tests with similar names but different parameters)
-    6. Store the extracted test list as JSON string in session state key '{STATE_EXTRACTED_TESTS}' using set_structured_state
+    6. Call dedupe_extracted_tests with your test list and keep only the returned unique_tests
+    7. Store the extracted test list as JSON string in session state key '{STATE_EXTRACTED_TESTS}' using set_structured_state
     
     **JSON Data Parsing Guidelines**:
     - Use get_structured_state to retrieve data as JSON string, then parse it
@@ -199,25 +405,39 @@ test_extraction_agent = create_rate_limited_agent(
             "parsing_issues": []
         }}
     }}
-    """,
-    tools=[get_structured_state_tool, set_structured_state_tool],
-    output_key=STATE_EXTRACTED_TESTS,
-)
+    """
+
+
+@functools.cache
+def get_test_extraction_agent() -> LlmAgent:
+    """Test Name Extraction Agent - consolidates unique test names."""
+    return create_rate_limited_agent(
+        name="TestExtractionAgent",
+        model=GEMINI_MODEL_FAST,
+        instruction=TEST_EXTRACTION_INSTRUCTION,
+        tools=[get_structured_state_tool, dedupe_extracted_tests_tool, set_structured_state_tool],
+        output_key=STATE_EXTRACTED_TESTS,
+    )
+
 
-# Individual Test Analysis Agent
-test_analysis_agent = create_rate_limited_agent(
-    name="TestAnalysisAgent",
-    model=GEMINI_MODEL,
-    instruction=f"""
-    You are a Test Analysis Agent.
-    Your task is to analyze each extracted test by finding it in the codebase and evaluating its quality.
+# Test Analysis Workers (map step; results are merged by finalize_test_analysis)
+TEST_ANALYSIS_INSTRUCTION = f"""
+    You are a Test Analysis Agent, one of several analyzing the extracted tests in parallel.
+    Your task is to analyze each test assigned to you by finding it in the codebase and evaluating its quality.
+    
+    Your assigned tests (JSON list, or the raw extracted tests if they couldn't be split):
+    
+    {{assigned_tests}}
+    
+    {{{STATE_FRAMEWORK_NOTES}?}}
     
     Your workflow:
-    1. Get the target project directory from session state key '{STATE_TARGET_PROJECT}' using get_structured_state
-    2. Retrieve extracted tests from session state key '{STATE_EXTRACTED_TESTS}' using get_structured_state
-    3. **IMPORTANT**: Parse the JSON string returned - look for 'extracted_tests' array
-    4. For each test, perform detailed analysis as described below
-    5. Store comprehensive results as JSON string in session state key '{STATE_TEST_ANALYSIS}' using set_structured_state
+    1. The target project directory is: {{{STATE_TARGET_PROJECT}?}}
+    2. For each assigned test (and only those), perform detailed analysis as described below
+    3. As soon as a test is analyzed, call record_test_analysis with its result object. You may make
+       that call in the same turn as the first search for the next test
+    4. When all your tests are recorded, reply with one short confirmation sentence. Do NOT repeat the
+       results - they are merged into '{STATE_TEST_ANALYSIS}' automatically, with summary counts
     
     **For each test, you must**:
     
@@ -229,7 +449,7 @@ test_analysis_agent = create_rate_limited_agent(
     2. **Analyze consistency**:
        - From the test code, determine the actual function/method name in code under test. Search it in the codebase using search_codebase tool.
        - Compare the test name from reports with the actual function/method name in code under test (NOT IN THE TEST CODE)
-       - Check if display name (docstring/@DisplayName) matches the test purpose
+       - Check if the test's display name (e.g. docstring or annotation) matches the test purpose
        - IMPORTANT: Flag any inconsistencies between report name and code implementation
     
     3. **Evaluate test meaningfulness**:
@@ -244,60 +464,80 @@ test_analysis_agent = create_rate_limited_agent(
        - Suggest improvements for unclear or misleading names (If the name is given as a human readable sentence don't suggest snake_case or camelCase. However you can suggest better human readable names)
     
     **Error Handling**:
-    - If extracted_tests data is missing or malformed, return detailed error information
-    - If no tests to analyze, return empty but valid structure as JSON
+    - If your assigned tests are missing or malformed, return detailed error information
+    - If no tests to analyze, say so and record nothing
     - Continue processing other tests if one fails
     
-    **JSON Storage Format**:
-    Use set_structured_state to store a JSON string like:
+    **Result Object Format** (one per record_test_analysis call):
     {{
-        "analyzed_tests": [
-            {{
-                "test_name": "original test name",
-                "test_location": {{
-                    "file_path": "path/to/test/file.py",
-                    "line_number": 123,
-                    "found": true
-                }},
-                "consistency_issues": ["list of issues"],
-                "meaningfulness_score": "high|medium|low", 
-                "meaningfulness_notes": "explanation of assessment",
-                "naming_clarity_score": "high|medium|low",
-                "naming_suggestions": ["suggested improvements"],
-                "code_under_test": "function/method being tested",
-                "issues_found": ["all problems identified"],
-                "recommendations": ["specific improvement suggestions"]
-            }}
-        ],
-        "analysis_summary": {{
-            "total_tests_analyzed": 0,
-            "tests_found_in_code": 0,
-            "critical_issues": 0,
-            "moderate_issues": 0,
-            "good_tests": 0
-        }}
+        "test_name": "original test name",
+        "test_location": {{
+            "file_path": "path/to/test/file.py",
+            "line_number": 123,
+            "found": true
+        }},
+        "consistency_issues": ["list of issues"],
+        "meaningfulness_score": "high|medium|low", 
+        "meaningfulness_notes": "explanation of assessment",
+        "naming_clarity_score": "high|medium|low",
+        "naming_suggestions": ["suggested improvements"],
+        "code_under_test": "function/method being tested",
+        "issues_found": ["all problems identified"],
+        "recommendations": ["specific improvement suggestions"]
     }}
-    """,
-    tools=[
-        get_structured_state_tool,
-        search_test_by_name_tool,
-        read_file_content_tool,
-        search_codebase_tool,
-        discover_test_files_tool,
-        set_structured_state_tool,
-    ],
-    output_key=STATE_TEST_ANALYSIS,
-)
+    """
+
+
+def test_analysis_worker_name(index):
+    """Agent name of the analysis worker for one chunk of the extracted tests."""
+    return f"TestAnalysisWorker{index}"
+
+
+ANALYSIS_WORKER_INDEX = {
+    test_analysis_worker_name(index): index for index in range(ANALYSIS_WORKERS)
+}
+
+
+def create_test_analysis_worker(index):
+    """Create the analysis worker for one chunk of the extracted tests.
+
+    Workers see only their own chunk, not the conversation so far, so each request stays
+    small no matter how many tests the project has.
+    """
+    return create_rate_limited_agent(
+        name=test_analysis_worker_name(index),
+        model=GEMINI_MODEL_PRO,
+        instruction=TEST_ANALYSIS_INSTRUCTION.replace(
+            "{assigned_tests}", f"{{{analysis_chunk_key(index)}?}}"
+        ),
+        tools=[
+            search_test_by_name_tool,
+            read_file_content_tool,
+            search_codebase_tool,
+            record_test_analysis_tool,
+        ],
+        before_agent_callback=skip_empty_chunk,
+        include_contents="none",
+    )
+
+
+@functools.cache
+def get_test_analysis() -> ParallelAgent:
+    """Parallel test analysis; the shared rate limiter still bounds the workers' model calls."""
+    return ParallelAgent(
+        name="TestAnalysis",
+        sub_agents=[create_test_analysis_worker(index) for index in range(ANALYSIS_WORKERS)],
+        before_agent_callback=distribute_extracted_tests,
+        after_agent_callback=finalize_test_analysis,
+    )
+
 
 # Human-Friendly Report Generator
-human_report_agent = create_rate_limited_agent(
-    name="HumanReportAgent",
-    model=GEMINI_MODEL,
-    instruction=f"""
+HUMAN_REPORT_INSTRUCTION = """
     You are a Human-Friendly Report Generator.
     Your task is to create a comprehensive, readable report for human developers.
     
-    Using data from session state key '{STATE_TEST_ANALYSIS}' (retrieved with get_structured_state and parsed as JSON), create a report with:
+    Using the test analysis, create a report with:
     
     **Executive Summary**:
     - Total tests analyzed
@@ -321,23 +561,28 @@ human_report_agent = create_rate_limited_agent(
     - Overall testing strategy improvements
     - Naming convention suggestions
     - Framework-specific best practices
-    
-    Format as a JSON structure that is human-readable but also structured.
-    Store as JSON string in session state key '{STATE_HUMAN_REPORT}' using set_structured_state.
-    """,
-    tools=[get_structured_state_tool, set_structured_state_tool],
-    output_key=STATE_HUMAN_REPORT,
-)
+    """
+
+
+@functools.cache
+def get_human_report_agent() -> LlmAgent:
+    """Human-Friendly Report Generator."""
+    return create_rate_limited_agent(
+        name="HumanReportAgent",
+        model=GEMINI_MODEL_PRO,
+        instruction=HUMAN_REPORT_INSTRUCTION,
+        output_key=STATE_HUMAN_REPORT,
+        instruction_prefix=REPORT_AGENT_PREFIX,
+        output_schema=HumanReport,
+    )
+
 
 # AI-Friendly Report Generator
-ai_report_agent = create_rate_limited_agent(
-    name="AIReportAgent",
-    model=GEMINI_MODEL,
-    instruction=f"""
+AI_REPORT_INSTRUCTION = """
     You are an AI-Friendly Report Generator.
     Your task is to create a structured report optimized for AI-assisted coding tools.
     
-    Using data from session state key '{STATE_TEST_ANALYSIS}' (retrieved with get_structured_state and parsed as JSON), create a report formatted as prompts for AI coding assistants.
+    Using the test analysis, create a report formatted as prompts for AI coding assistants.
     
     For each test with issues, generate:
     
@@ -366,23 +611,28 @@ ai_report_agent = create_rate_limited_agent(
     - Framework: [detected framework]
     - Should verify: [specific behavior]
     - Include: [specific assertions needed]"
-    
-    Format as a JSON structure optimized for programmatic consumption.
-    Store as JSON string in session state key '{STATE_AI_REPORT}' using set_structured_state.
-    """,
-    tools=[get_structured_state_tool, set_structured_state_tool],
-    output_key=STATE_AI_REPORT,
-)
+    """
+
+
+@functools.cache
+def get_ai_report_agent() -> LlmAgent:
+    """AI-Friendly Report Generator."""
+    return create_rate_limited_agent(
+        name="AIReportAgent",
+        model=GEMINI_MODEL_FAST,
+        instruction=AI_REPORT_INSTRUCTION,
+        output_key=STATE_AI_REPORT,
+        instruction_prefix=REPORT_AGENT_PREFIX,
+        output_schema=AIReport,
+    )
+
 
 # Project Test Summarizer Agent
-project_summary_agent = create_rate_limited_agent(
-    name="ProjectSummaryAgent",
-    model=GEMINI_MODEL,
-    instruction=f"""
+PROJECT_SUMMARY_INSTRUCTION = """
     You are a Project Test Summarizer.
     Your task is to create high-level summaries of the project's testing landscape.
     
-    Using data from all previous analysis stages, especially the {STATE_TEST_ANALYSIS} (retrieved with get_structured_state and parsed as JSON), create three different summary formats:
+    Using the test analysis, create three different summary formats:
     
     **3-Sentence Summary**:
     A concise overview of testing state, major frameworks used, and overall quality.
@@ -399,70 +649,87 @@ project_summary_agent = create_rate_limited_agent(
     - Comparison with testing best practices
     - Specific recommendations for improvement
     - Suggested next steps for the development team
-    
-    Store all three summaries as JSON string in session state key '{STATE_PROJECT_SUMMARY}' using set_structured_state.
-    """,
-    tools=[get_structured_state_tool, set_structured_state_tool],
-    output_key=STATE_PROJECT_SUMMARY,
-)
+    """
+
+
+@functools.cache
+def get_project_summary_agent() -> LlmAgent:
+    """Project Test Summarizer Agent - summarizes the testing landscape."""
+    return create_rate_limited_agent(
+        name="ProjectSummaryAgent",
+        model=GEMINI_MODEL_PRO,
+        instruction=PROJECT_SUMMARY_INSTRUCTION,
+        output_key=STATE_PROJECT_SUMMARY,
+        instruction_prefix=REPORT_AGENT_PREFIX,
+        output_schema=ProjectSummary,
+    )
+
 
 # Report Compilation and Export Agent
-report_export_agent = create_rate_limited_agent(
-    name="ReportExportAgent",
-    model=GEMINI_MODEL,
-    instruction=f"""
+REPORT_EXPORT_INSTRUCTION = f"""
     You are a Report Export Agent.
-    Your task is to compile all analysis results and export them to a JSON file.
+    Your task is to export all analysis results to a JSON file.
     
     Your workflow:
-    1. Gather all results from session state using get_structured_state and parse JSON strings:
-       - Test reports data from '{STATE_TEST_REPORTS}'
-       - Extracted tests from '{STATE_EXTRACTED_TESTS}'
-       - Analysis results from '{STATE_TEST_ANALYSIS}'
-       - Human report from '{STATE_HUMAN_REPORT}'
-       - AI report from '{STATE_AI_REPORT}'
-       - Project summary from '{STATE_PROJECT_SUMMARY}'
+    1. Call export_analysis_report exactly once. It compiles the test reports, extracted tests,
+       analysis results and all three generated reports from session state and saves them -
+       do NOT fetch or pass any of that data yourself
     
-    2. Compile into a comprehensive final report structure
+    2. Provide a final summary to the user about what was analyzed and where the report was saved,
+       using the analysis_summary counts and output_file returned by the tool
     
-    3. Use save_analysis_report tool to export the complete analysis
-    
-    4. Provide a final summary to the user about what was analyzed and where the report was saved
-    
-    The exported report should be a complete record of the entire test analysis process.
-    """,
-    tools=[get_structured_state_tool, save_analysis_report_tool],
-)
+    The exported report is a complete record of the entire test analysis process.
+    """
+
+
+@functools.cache
+def get_report_export_agent() -> LlmAgent:
+    """Report Compilation and Export Agent."""
+    return create_rate_limited_agent(
+        name="ReportExportAgent",
+        model=GEMINI_MODEL_FAST,
+        instruction=REPORT_EXPORT_INSTRUCTION,
+        tools=[export_analysis_report_tool],
+    )
+
 
 # --- Agent Pipeline Construction ---
 
-# Sequential analysis pipeline
-test_discovery_and_extraction = SequentialAgent(
-    name="TestDiscoveryAndExtraction",
-    sub_agents=[test_report_discovery_agent, test_extraction_agent],
-)
 
-# Parallel report generation
-report_generation = ParallelAgent(
-    name="ReportGeneration", sub_agents=[human_report_agent, ai_report_agent, project_summary_agent]
-)
+@functools.cache
+def get_test_discovery_and_extraction() -> SequentialAgent:
+    """Sequential analysis pipeline."""
+    return SequentialAgent(
+        name="TestDiscoveryAndExtraction",
+        sub_agents=[get_test_report_discovery_agent(), get_test_extraction_agent()],
+    )
+
+
+@functools.cache
+def get_report_generation() -> ParallelAgent:
+    """Parallel report generation."""
+    return ParallelAgent(
+        name="ReportGeneration",
+        sub_agents=[get_human_report_agent(), get_ai_report_agent(), get_project_summary_agent()],
+    )
+
+
+@functools.cache
+def get_analysis_pipeline() -> SequentialAgent:
+    """Complete analysis pipeline."""
+    return SequentialAgent(
+        name="AnalysisPipeline",
+        sub_agents=[
+            get_test_discovery_and_extraction(),
+            get_test_analysis(),
+            get_report_generation(),
+            get_report_export_agent(),
+        ],
+    )
 
-# Complete analysis pipeline
-analysis_pipeline = SequentialAgent(
-    name="AnalysisPipeline",
-    sub_agents=[
-        test_discovery_and_extraction,
-        test_analysis_agent,
-        report_generation,
-        report_export_agent,
-    ],
-)
 
 # The root agent (entry point)
-root_agent = create_rate_limited_agent(
-    name="TestSummarizerRoot",
-    model=GEMINI_MODEL,
-    instruction=f"""
+ROOT_INSTRUCTION = f"""
     You are the Project Test Summarizer - a framework-agnostic test analysis agent.
     
     Your mission is to analyze a software project's tests for quality, consistency, and naming clarity.
@@ -470,8 +737,10 @@ root_agent = create_rate_limited_agent(
     **Your workflow**:
     1. Welcome the user and confirm the target project directory
     2. Store the project path as JSON string in session state key '{STATE_TARGET_PROJECT}' using set_structured_state
-    3. Transfer control to the AnalysisPipeline to perform comprehensive test analysis
-    4. Present a final summary of findings and where the detailed report was saved
+    3. Call hash_target_project with the project path. If it returns a non-null cached_report, the project
+       is unchanged since that analysis: tell the user where the saved report is and do NOT run the AnalysisPipeline
+    4. Otherwise transfer control to the AnalysisPipeline to perform comprehensive test analysis
+    5. Present a final summary of findings and where the detailed report was saved
     
     **You analyze**:
     - Test reports (XML, JSON, HTML) to extract test names
@@ -487,7 +756,40 @@ root_agent = create_rate_limited_agent(
     **You are framework-agnostic**: Works with pytest, JUnit, Jest, and other testing frameworks.
     
     Keep your responses professional and focused on helping improve test quality.
-    """,
-    tools=[set_structured_state_tool, list_directory_contents_tool],
-    sub_agents=[analysis_pipeline],
-)
+    """
+
+
+@functools.cache
+def get_root_agent() -> LlmAgent:
+    """The root agent (entry point)."""
+    return create_rate_limited_agent(
+        name="TestSummarizerRoot",
+        model=GEMINI_MODEL_FAST,
+        instruction=ROOT_INSTRUCTION,
+        tools=[set_structured_state_tool, list_directory_contents_tool, hash_target_project_tool],
+        sub_agents=[get_analysis_pipeline()],
+    )
+
+
+# Agents are built on first access, so importing this module (e.g. to override config or
+# use its tools) doesn't construct the whole agent tree
+_AGENT_FACTORIES = {
+    "test_report_discovery_agent": get_test_report_discovery_agent,
+    "test_extraction_agent": get_test_extraction_agent,
+    "test_analysis": get_test_analysis,
+    "human_report_agent": get_human_report_agent,
+    "ai_report_agent": get_ai_report_agent,
+    "project_summary_agent": get_project_summary_agent,
+    "report_export_agent": get_report_export_agent,
+    "test_discovery_and_extraction": get_test_discovery_and_extraction,
+    "report_generation": get_report_generation,
+    "analysis_pipeline": get_analysis_pipeline,
+    "root_agent": get_root_agent,
+}
+
+
+def __getattr__(name: str):
+    """Keep `agent.root_agent` (used by ADK discovery) and friends working lazily."""
+    if name in _AGENT_FACTORIES:
+        return _AGENT_FACTORIES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,28 +1,78 @@
 """Configuration module for Project Test Summarizer."""
 
+import os
+
 # Application constants
 APP_NAME = "project_test_summarizer"
 USER_ID = "test_analyzer_user"
 SESSION_ID = "test_analysis_session"
 GEMINI_MODEL = "gemini-2.0-flash"
+# Model tiers: reasoning-heavy agents use the main model, mechanical routing/parsing agents
+# use the lighter and cheaper tier
+GEMINI_MODEL_PRO = GEMINI_MODEL
+GEMINI_MODEL_FAST = "gemini-2.0-flash-lite"
 
 # State keys for session state
 STATE_TARGET_PROJECT = "target_project_directory"
 STATE_TEST_REPORTS = "discovered_test_reports"
 STATE_EXTRACTED_TESTS = "extracted_test_names"
 STATE_TEST_ANALYSIS = "test_analysis_results"
+STATE_TEST_ANALYSIS_COMPACT = "test_analysis_compact"
+STATE_ANALYZED_TESTS = "analyzed_tests_progress"
+STATE_ANALYSIS_CHUNK = "analysis_chunk"
+STATE_FRAMEWORK_NOTES = "framework_analysis_notes"
 STATE_HUMAN_REPORT = "human_friendly_report"
 STATE_AI_REPORT = "ai_friendly_report"
 STATE_PROJECT_SUMMARY = "project_test_summary"
+STATE_PROJECT_HASH = "project_content_hash"
+
+# Pipeline results compiled into the exported report
+REPORT_STATE_KEYS = (
+    STATE_TEST_REPORTS,
+    STATE_EXTRACTED_TESTS,
+    STATE_TEST_ANALYSIS,
+    STATE_HUMAN_REPORT,
+    STATE_AI_REPORT,
+    STATE_PROJECT_SUMMARY,
+)
 
 # Test analysis constants
 NO_ISSUES_FOUND = "no_issues_found"
 REPORT_OUTPUT_FILE = "test_analysis_report.json"
 
+# Parallel test analysis workers; extracted tests are split evenly between them
+ANALYSIS_WORKERS = 8
+
+# Threads reading report files concurrently in analyze_multiple_test_reports
+REPORT_READ_WORKERS = 8
+
+# Text and HTML reports from this size up are scanned through a memory map, not read into a str
+REPORT_MMAP_MIN_BYTES = 1024 * 1024
+
+# Test file contents kept in memory between search_test_by_name calls (in characters)
+TEST_FILE_CACHE_MAX_CHARS = 64 * 1024 * 1024
+
+# Test file discovery results kept in memory, one per (directory, project hash)
+TEST_FILES_INDEX_MAX_ENTRIES = 16
+
+# Number of example tests kept per quality bucket in the compact analysis
+COMPACT_ANALYSIS_EXEMPLARS = 3
+
+# Reports saved per project content hash, so unchanged projects skip re-analysis
+REPORT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "test_summarizer")
+
+# Modules defining the prompts, models, tools and output schemas; a saved report is only
+# reused by the analyzer built from the same sources
+ANALYZER_SOURCE_FILES = ("agent.py", "config.py", "instructions.py", "schemas.py", "tools.py")
+
 # Rate limiting settings (reuse from common)
 RATE_LIMIT_MAX_CALLS = 10
 RATE_LIMIT_WINDOW = 60
 
+# Persistent LLM response cache, opt-in via TEST_SUMMARIZER_LLM_CACHE=1
+LLM_CACHE_ENABLED = os.environ.get("TEST_SUMMARIZER_LLM_CACHE") == "1"
+LLM_CACHE_FILE = os.path.join(os.path.dirname(__file__), "llm_cache.sqlite3")
+
 # Logging settings
 LOG_FILENAME_FORMAT = "test_summarizer_%Y%m%d_%H%M%S.log"
 LOG_MAX_BYTES = 10 * 1024 * 1024  # 10MB
@@ -63,3 +113,10 @@ TEST_FILE_PATTERNS = [
     "**/src/test/**/*.java",  # Java Maven structure
     "**/src/test/**/*.kt",  # Kotlin test structure
 ]
+
+# Dependency, virtualenv and cache directories never searched for tests or reports. Hidden
+# directories (.git, .venv, .tox, ...) are skipped anyway; build and target are kept
+# because reports live there.
+DISCOVERY_SKIPPED_DIRECTORIES = frozenset(
+    {"node_modules", "bower_components", "venv", "site-packages", "__pycache__"}
+)
@@ -0,0 +1,41 @@
+"""Framework-specific sections of the test analysis instruction.
+
+The analysis instruction itself is framework-agnostic. Once discovery has detected the
+project's test framework, only the notes for that framework are added to it.
+"""
+
+from typing import Dict
+
+# Analysis notes per framework, keyed by a lowercase name found in the detected framework
+FRAMEWORK_ANALYSIS_NOTES: Dict[str, str] = {
+    "pytest": """
+    - Tests are functions or methods named test_*; the docstring is the display name
+    - @pytest.mark.parametrize runs one test function once per parameter set - analyze it once
+    - Fixtures may come from conftest.py files in parent directories; check the real setup there
+    - Bare assert statements are the assertions; pytest.raises checks expected exceptions""",
+    "junit": """
+    - Tests are methods annotated with @Test or @ParameterizedTest; @DisplayName is the display name
+    - Parameterized tests take their data from @ValueSource, @CsvSource or @MethodSource
+    - Setup and teardown live in @BeforeEach/@AfterEach and @BeforeAll/@AfterAll methods
+    - Assertions come from Assertions.* (JUnit 5), Assert.* (JUnit 4) or AssertJ assertThat""",
+    "jest": """
+    - Tests are it(...) or test(...) blocks; the reported name joins the enclosing describe titles
+    - test.each / it.each runs one test per data row - analyze it once
+    - Setup and teardown live in beforeEach/afterEach and beforeAll/afterAll
+    - Assertions are expect(...) matchers; snapshot-only tests rarely verify behavior""",
+}
+FRAMEWORK_ANALYSIS_NOTES["mocha"] = FRAMEWORK_ANALYSIS_NOTES["jest"]
+
+
+def specialize_analysis_instruction(framework: str) -> str:
+    """Build the instruction section with analysis notes for the detected framework(s).
+
+    Returns an empty string for unknown or undetected frameworks, so the generic
+    instruction is used as-is.
+    """
+    framework = (framework or "").lower()
+    notes = [text for name, text in FRAMEWORK_ANALYSIS_NOTES.items() if name in framework]
+    if not notes:
+        return ""
+
+    return f"**Framework notes ({framework})**:" + "".join(dict.fromkeys(notes))
@@ -0,0 +1,61 @@
+"""Structured output schemas for Project Test Summarizer report agents.
+
+Agents configured with one of these as output_schema answer in JSON mode, so the model
+returns validated data and ADK stores it in state as a dict.
+"""
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ExecutiveSummary(BaseModel):
+    """Headline numbers and findings of the human-friendly report."""
+
+    total_tests_analyzed: int
+    overall_quality: str = Field(description="Overall test quality assessment")
+    major_issues: List[str]
+    frameworks_detected: List[str]
+
+
+class TestFinding(BaseModel):
+    """Problems and fixes for a single test."""
+
+    test_name: str
+    location: str = Field(default="", description="Test file path and line, if known")
+    problems: List[str]
+    solutions: List[str]
+    suggestions: List[str]
+    better_name: Optional[str] = Field(default=None, description="Improved test name, if any")
+
+
+class HumanReport(BaseModel):
+    """Readable report for developers, grouped by severity."""
+
+    executive_summary: ExecutiveSummary
+    critical_issues: List[TestFinding]
+    moderate_issues: List[TestFinding]
+    good_tests: List[TestFinding]
+    recommendations: List[str]
+
+
+class CodingPrompt(BaseModel):
+    """A ready-to-use prompt for an AI coding assistant."""
+
+    test_name: str = Field(description="Test to improve, or the suggested name of a new test")
+    prompt: str
+
+
+class AIReport(BaseModel):
+    """Report formatted as prompts for AI coding assistants."""
+
+    improvement_prompts: List[CodingPrompt]
+    creation_prompts: List[CodingPrompt]
+
+
+class ProjectSummary(BaseModel):
+    """Three summaries of the project's testing landscape at different lengths."""
+
+    three_sentence_summary: str
+    paragraph_summary: str
+    full_summary: str = Field(description="A4 page equivalent analysis")
@@ -1,6 +1,6 @@
 """Session management for Project Test Summarizer."""
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict
 
 from google.adk.sessions import InMemorySessionService
 
@@ -17,13 +17,32 @@ class SessionManager:
     Provides access to the current session and helper methods for working with test analysis state.
     """
 
-    def __init__(self):
-        """Initialize the session manager with a new session."""
-        self.session_service = InMemorySessionService()
-        self.session = self.session_service.create_session(
-            app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
-        )
-        logger.info(f"Test analysis session created: {APP_NAME}/{USER_ID}/{SESSION_ID}")
+    def __init__(self, session_id: str = SESSION_ID, session_service=None):
+        """Initialize the session manager; the session is created on first use.
+
+        Args:
+            session_id: ID of the session to create; pass a unique ID per request so
+                concurrent runs don't share one state dict
+            session_service: Session service to create the session in (defaults to a
+                new InMemorySessionService)
+        """
+        self.session_service = session_service or InMemorySessionService()
+        self.session_id = session_id
+        self._session = None
+
+    @property
+    def session(self):
+        """The managed session, created in the session service the first time it is needed.
+
+        Creating it lazily keeps importing the module (which builds the default manager)
+        free of session setup.
+        """
+        if self._session is None:
+            self._session = self.session_service.create_session(
+                app_name=APP_NAME, user_id=USER_ID, session_id=self.session_id
+            )
+            logger.info(f"Test analysis session created: {APP_NAME}/{USER_ID}/{self.session_id}")
+        return self._session
 
     def get_state(self, key: str, default: Any = None) -> Any:
         """Get a value from the session state.
@@ -81,5 +100,6 @@ class SessionManager:
         return self.session
 
 
-# Create a global session manager instance
+# Default session manager for single-run usage; create a SessionManager per request
+# (with its own session_id) when running several analyses concurrently
 session_manager = SessionManager()
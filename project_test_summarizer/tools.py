@@ -1,26 +1,125 @@
 """Specialized tools for Project Test Summarizer - Test analysis and discovery."""
 
-import glob
+import contextlib
+import copy
+import functools
+import hashlib
 import json
+import mmap
 import os
 import re
+import threading
 import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Collection, Dict, Iterator, List, Optional, Tuple, Union
 
 from google.adk.tools import ToolContext
 
 from common.logging_setup import setup_logging
+from common.project_hash import project_content_hash
 from project_test_summarizer.config import (
+    ANALYZER_SOURCE_FILES,
+    COMPACT_ANALYSIS_EXEMPLARS,
+    DISCOVERY_SKIPPED_DIRECTORIES,
+    REPORT_CACHE_DIR,
+    REPORT_MMAP_MIN_BYTES,
     REPORT_OUTPUT_FILE,
+    REPORT_READ_WORKERS,
+    REPORT_STATE_KEYS,
+    STATE_ANALYZED_TESTS,
+    STATE_PROJECT_HASH,
     STATE_TARGET_PROJECT,
+    STATE_TEST_ANALYSIS,
+    TEST_FILE_CACHE_MAX_CHARS,
     TEST_FILE_PATTERNS,
+    TEST_FILES_INDEX_MAX_ENTRIES,
     TEST_REPORT_PATTERNS,
 )
 
+try:
+    import orjson
+except ImportError:  # Optional, speeds up writing large reports
+    orjson = None
+
 # Set up logging for this module
 logger = setup_logging("project_test_summarizer", redirect_stdout=False)
 
+# Parameterization suffixes like test_add[1-2] or test_login[chrome]
+_PARAMETERIZATION_PATTERN = re.compile(r"\[.*?\]")
+
+# Regex escapes whose meaning narrows to ASCII in a bytes pattern
+_UNICODE_CLASS_PATTERN = re.compile(r"\\[wWbBdDsS]")
+
+# Opening/closing markdown code fences around JSON written by an agent
+_CODE_FENCE_PATTERN = re.compile(r"^```[a-zA-Z]*\s*|\s*```$")
+
+
+def _combine_patterns(patterns: Tuple[str, ...], flags: int = 0) -> re.Pattern:
+    """Join regex patterns into one alternation, so content is scanned once for all of them.
+
+    Each pattern is wrapped in a named group g<i>; see _first_capture.
+    """
+    return re.compile("|".join(f"(?P<g{i}>{pattern})" for i, pattern in enumerate(patterns)), flags)
+
+
+# Test name patterns for plain text reports
+_TEXT_TEST_PATTERN = _combine_patterns(
+    (
+        r"test_(\w+)",  # Python pytest style
+        r"def test_(\w+)",  # Python function definitions
+        r"class Test(\w+)",  # Python test classes
+        r"@Test.*?(\w+)",  # Java @Test annotations
+        r'it\(["\']([^"\']+)',  # JavaScript/TypeScript it() blocks
+        r'describe\(["\']([^"\']+)',  # JavaScript/TypeScript describe blocks
+        r'test\(["\']([^"\']+)',  # JavaScript/TypeScript test() blocks
+    ),
+    re.IGNORECASE,
+)
+
+# Test name patterns for HTML reports
+_HTML_TEST_PATTERN = _combine_patterns(
+    (
+        r'<td[^>]*class="test[^"]*"[^>]*>([^<]+)',
+        r'<span[^>]*class="test[^"]*"[^>]*>([^<]+)',
+        r'<div[^>]*class="test[^"]*"[^>]*>([^<]+)',
+        r'data-test-name="([^"]+)"',
+        r'id="test_([^"]+)"',
+    ),
+    re.IGNORECASE,
+)
+
+# Test function definition patterns per language, "generic" for anything else
+_TEST_FUNCTION_PATTERN_SOURCES = {
+    "python": (
+        r'def\s+(test_\w+)\s*\([^)]*\):\s*"""([^"]*?)"""',  # With docstring
+        r"def\s+(test_\w+)\s*\([^)]*\):",  # Without docstring
+        r"class\s+(Test\w+).*?:",  # Test classes
+    ),
+    "java": (r"@Test.*?public\s+void\s+(\w+)\s*\([^)]*\)", r"@Test.*?(\w+)\s*\([^)]*\)"),
+    "javascript": (
+        r'it\s*\(\s*["\']([^"\']+)["\']',
+        r'test\s*\(\s*["\']([^"\']+)["\']',
+        r'describe\s*\(\s*["\']([^"\']+)["\']',
+    ),
+    "generic": (r"test\w*\s+(\w+)", r"(\w*test\w*)\s*\("),
+}
+_TEST_FUNCTION_PATTERN_SOURCES["typescript"] = _TEST_FUNCTION_PATTERN_SOURCES["javascript"]
+_TEST_FUNCTION_PATTERNS = {
+    language: _combine_patterns(patterns, re.IGNORECASE | re.MULTILINE)
+    for language, patterns in _TEST_FUNCTION_PATTERN_SOURCES.items()
+}
+
+# Test file contents keyed by (path, size, mtime), least recently used first
+_test_file_contents: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_test_file_contents_lock = threading.Lock()  # Tools may run on worker threads
+_test_file_cache_chars = 0
+
+# Test file discovery results keyed by (directory, project hash), least recently used first
+_test_files_index: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_test_files_index_lock = threading.Lock()
+
 # --- Test Report Discovery Tools ---
 
 
@@ -35,37 +134,22 @@ def discover_test_reports(
         logger.info(f"Discovering test reports in: {target_directory}")
         discovered_reports = []
 
-        for pattern in TEST_REPORT_PATTERNS:
-            # Convert glob pattern to work from target directory
-            full_pattern = os.path.join(target_directory, pattern.lstrip("**/"))
-            matches = glob.glob(full_pattern, recursive=True)
-
-            for match in matches:
-                if os.path.isfile(match):
-                    relative_path = os.path.relpath(match, target_directory)
-                    file_size = os.path.getsize(match)
-
-                    discovered_reports.append(
-                        {
-                            "file_path": relative_path,
-                            "absolute_path": match,
-                            "file_size": file_size,
-                            "pattern_matched": pattern,
-                            "file_extension": os.path.splitext(match)[1],
-                        }
-                    )
-
-        # Remove duplicates based on absolute path
-        unique_reports = []
-        seen_paths = set()
-        for report in discovered_reports:
-            if report["absolute_path"] not in seen_paths:
-                unique_reports.append(report)
-                seen_paths.add(report["absolute_path"])
+        for match, relative_path, pattern, file_size in _find_matching_files(
+            target_directory, TEST_REPORT_PATTERNS
+        ):
+            discovered_reports.append(
+                {
+                    "file_path": relative_path,
+                    "absolute_path": match,
+                    "file_size": file_size,
+                    "pattern_matched": pattern,
+                    "file_extension": os.path.splitext(match)[1],
+                }
+            )
 
         return {
-            "discovered_reports": unique_reports,
-            "total_reports_found": len(unique_reports),
+            "discovered_reports": discovered_reports,
+            "total_reports_found": len(discovered_reports),
             "search_directory": target_directory,
             "patterns_used": TEST_REPORT_PATTERNS,
         }
@@ -87,70 +171,28 @@ def analyze_test_report_content(
         logger.info(f"Analyzing test report: {report_file_path}")
         file_extension = os.path.splitext(report_file_path)[1].lower()
 
-        with open(report_file_path, "r", encoding="utf-8", errors="ignore") as f:
-            content = f.read()
-
         extracted_tests = []
         report_metadata = {
             "file_path": report_file_path,
-            "file_size": len(content),
+            "file_size": os.path.getsize(report_file_path),
             "format_detected": "unknown",
         }
 
         if file_extension == ".xml":
-            # Try to parse as XML (JUnit format)
+            # Stream-parse as XML (JUnit format), without loading the whole document
             try:
-                root = ET.fromstring(content)
+                extracted_tests, test_suites, total_tests = _parse_junit_xml(report_file_path)
                 report_metadata["format_detected"] = "xml"
-
-                # Look for JUnit-style test cases
-                test_cases = root.findall(".//testcase")
-                for test_case in test_cases:
-                    test_name = test_case.get("name", "")
-                    class_name = test_case.get("classname", "")
-                    time_taken = test_case.get("time", "")
-
-                    # Check for failure or error elements
-                    status = "passed"
-                    failure_msg = ""
-                    if test_case.find("failure") is not None:
-                        status = "failed"
-                        failure_elem = test_case.find("failure")
-                        failure_msg = (
-                            failure_elem.get("message", "") if failure_elem is not None else ""
-                        )
-                    elif test_case.find("error") is not None:
-                        status = "error"
-                        error_elem = test_case.find("error")
-                        failure_msg = (
-                            error_elem.get("message", "") if error_elem is not None else ""
-                        )
-
-                    extracted_tests.append(
-                        {
-                            "test_name": test_name,
-                            "class_name": class_name,
-                            "full_name": f"{class_name}.{test_name}" if class_name else test_name,
-                            "status": status,
-                            "execution_time": time_taken,
-                            "failure_message": failure_msg,
-                        }
-                    )
-
-                # Get test suite information
-                test_suites = root.findall(".//testsuite")
-                report_metadata["test_suites"] = len(test_suites)
-                report_metadata["total_tests"] = sum(
-                    int(suite.get("tests", "0")) for suite in test_suites
-                )
-
+                report_metadata["test_suites"] = test_suites
+                report_metadata["total_tests"] = total_tests
             except ET.ParseError:
                 # Fallback to text parsing for malformed XML
                 report_metadata["format_detected"] = "malformed_xml"
-                extracted_tests = _extract_tests_from_text(content)
+                extracted_tests = _extract_tests_from_text(_read_report_text(report_file_path))
 
         elif file_extension == ".json":
             # Try to parse as JSON
+            content = _read_report_text(report_file_path)
             try:
                 json_data = json.loads(content)
                 report_metadata["format_detected"] = "json"
@@ -161,10 +203,11 @@ def analyze_test_report_content(
 
         elif file_extension == ".html":
             report_metadata["format_detected"] = "html"
-            extracted_tests = _extract_tests_from_html(content)
+            with _report_content(report_file_path) as content:
+                extracted_tests = _extract_tests_from_html(content)
         else:
-            # Generic text parsing
-            extracted_tests = _extract_tests_from_text(content)
+            # Generic text parsing; its \w patterns need decoded text to match non-ASCII names
+            extracted_tests = _extract_tests_from_text(_read_report_text(report_file_path))
 
         return {
             "extracted_tests": extracted_tests,
@@ -191,7 +234,14 @@ def analyze_multiple_test_reports(
         tool_context: Tool context (optional)
 
     Returns:
-        Dict containing aggregated results from all reports
+        Dict containing aggregated results from all reports:
+        - extracted_tests: every test as reported, each with its 'source_report'
+        - unique_tests: the tests collapsed by canonicalize_and_dedupe_tests. Parameterized
+          cases (test_add[1-2], test_add[3-4]) and reruns of a test across reports become one
+          entry, which lists every report it came from in 'source_reports' (instead of
+          'source_report') and the number of merged entries in 'occurrences'
+        - processing_summary: counts, where unique_tests_found counts the collapsed tests
+          and so is lower than one per parameterization
     """
     try:
         logger.info(f"Analyzing {len(report_files)} test reports in batch")
@@ -201,23 +251,19 @@ def analyze_multiple_test_reports(
         processing_errors = []
         total_tests_extracted = 0
 
-        # Process each report file
-        for i, report_file_path in enumerate(report_files):
-            try:
-                if not os.path.exists(report_file_path):
-                    processing_errors.append(
-                        {
-                            "file_path": report_file_path,
-                            "error": f"File does not exist: {report_file_path}",
-                        }
-                    )
-                    continue
-
-                logger.debug(f"Processing report {i+1}/{len(report_files)}: {report_file_path}")
-
-                # Use the existing single-file analysis logic
-                result = analyze_test_report_content(report_file_path, tool_context)
+        # Read and parse the reports concurrently, largest first so a big report doesn't
+        # start last and hold up the batch; results are still aggregated in input order
+        max_workers = max(1, min(REPORT_READ_WORKERS, len(report_files)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            sizes = [_report_file_size(path) for path in report_files]
+            futures = [None] * len(report_files)
+            for index in sorted(range(len(report_files)), key=sizes.__getitem__, reverse=True):
+                futures[index] = executor.submit(
+                    _analyze_report_in_batch, report_files[index], tool_context
+                )
 
+            for report_file_path, future in zip(report_files, futures):
+                result = future.result()
                 if "error" in result:
                     processing_errors.append(
                         {"file_path": report_file_path, "error": result["error"]}
@@ -236,11 +282,6 @@ def analyze_multiple_test_reports(
                 all_report_metadata.append(report_metadata)
                 total_tests_extracted += len(extracted_tests)
 
-            except Exception as e:
-                error_msg = f"Error processing {report_file_path}: {str(e)}"
-                logger.error(error_msg)
-                processing_errors.append({"file_path": report_file_path, "error": error_msg})
-
         # Generate summary statistics
         format_counts = {}
         for metadata in all_report_metadata:
@@ -248,15 +289,7 @@ def analyze_multiple_test_reports(
             format_counts[format_type] = format_counts.get(format_type, 0) + 1
 
         # Deduplicate tests (same test might appear in multiple reports)
-        unique_tests = []
-        seen_test_signatures = set()
-
-        for test in all_extracted_tests:
-            # Create a signature for deduplication
-            signature = f"{test.get('full_name', test.get('test_name', ''))}"
-            if signature not in seen_test_signatures:
-                unique_tests.append(test)
-                seen_test_signatures.add(signature)
+        unique_tests = canonicalize_and_dedupe_tests(all_extracted_tests)
 
         return {
             "extracted_tests": all_extracted_tests,  # All tests including duplicates
@@ -279,53 +312,278 @@ def analyze_multiple_test_reports(
         return {"error": error_msg}
 
 
+def discover_and_analyze_test_reports(
+    target_directory: str, tool_context: ToolContext | None = None
+) -> Dict[str, Any]:
+    """Discover test reports in the target project and extract their tests in one call.
+
+    Same as discover_test_reports followed by analyze_multiple_test_reports on every
+    discovered report, without passing the file list through the model in between.
+    """
+    discovery_result = discover_test_reports(target_directory, tool_context)
+    if "error" in discovery_result:
+        return discovery_result
+
+    report_files = [report["absolute_path"] for report in discovery_result["discovered_reports"]]
+    analysis_result = analyze_multiple_test_reports(report_files, tool_context)
+    if "error" in analysis_result:
+        return analysis_result
+
+    return {"discovery_result": discovery_result, "analysis_result": analysis_result}
+
+
+def _report_file_size(report_file_path: str) -> int:
+    """Size of a report file in bytes, 0 if it can't be read."""
+    try:
+        return os.path.getsize(report_file_path)
+    except OSError:
+        return 0
+
+
+def _analyze_report_in_batch(
+    report_file_path: str, tool_context: ToolContext | None = None
+) -> Dict[str, Any]:
+    """Analyze one report of a batch, turning any failure into an error result."""
+    try:
+        if not os.path.exists(report_file_path):
+            return {"error": f"File does not exist: {report_file_path}"}
+
+        logger.debug(f"Processing report: {report_file_path}")
+        return analyze_test_report_content(report_file_path, tool_context)
+
+    except Exception as e:
+        error_msg = f"Error processing {report_file_path}: {str(e)}"
+        logger.error(error_msg)
+        return {"error": error_msg}
+
+
+def canonicalize_and_dedupe_tests(tests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Collapse tests re-reported across CI shards, reruns and parameterizations.
+
+    Tests are matched on lowercased class name and test name with parameterization
+    brackets stripped. The first occurrence is kept, with every report it came from
+    collected in 'source_reports' and the number of merged entries in 'occurrences'.
+    """
+    unique_tests: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    for test in tests:
+        key = _canonical_test_key(test)
+        sources = list(test.get("source_reports") or [])
+        if test.get("source_report"):
+            sources.append(test["source_report"])
+
+        existing = unique_tests.get(key)
+        if existing is None:
+            entry = {k: v for k, v in test.items() if k != "source_report"}
+            entry["source_reports"] = list(dict.fromkeys(sources))
+            entry["occurrences"] = 1
+            unique_tests[key] = entry
+            continue
+
+        existing["occurrences"] += 1
+        for source in sources:
+            if source not in existing["source_reports"]:
+                existing["source_reports"].append(source)
+
+    return list(unique_tests.values())
+
+
+def dedupe_extracted_tests(
+    tests: List[Dict[str, Any]], tool_context: ToolContext | None = None
+) -> Dict[str, Any]:
+    """Deduplicate extracted tests so each test is analyzed only once."""
+    try:
+        unique_tests = canonicalize_and_dedupe_tests(tests)
+        logger.info(f"Deduplicated {len(tests)} extracted tests to {len(unique_tests)}")
+        return {
+            "unique_tests": unique_tests,
+            "total_tests": len(tests),
+            "unique_tests_found": len(unique_tests),
+        }
+
+    except Exception as e:
+        error_msg = f"Error deduplicating extracted tests: {str(e)}"
+        logger.error(error_msg)
+        return {"error": error_msg}
+
+
+def split_extracted_tests(
+    extracted: Any, chunk_count: int, analyzed_names: Collection[str] = ()
+) -> Optional[List[List[Dict[str, Any]]]]:
+    """Split the extracted tests into at most chunk_count contiguous, near-equal chunks.
+
+    Accepts the extraction agent's output as stored in state. Tests named in analyzed_names
+    (already recorded by an interrupted run) are left out. Returns None if the output can't
+    be read, and an empty list if there are no tests left.
+    """
+    extracted = _load_state_json(extracted)
+    tests = extracted.get("extracted_tests") if isinstance(extracted, dict) else extracted
+    if not isinstance(tests, list):
+        return None
+
+    if analyzed_names:
+        tests = [test for test in tests if _extracted_test_name(test) not in analyzed_names]
+
+    chunk_size = max(1, -(-len(tests) // chunk_count))
+    return [tests[i : i + chunk_size] for i in range(0, len(tests), chunk_size)]
+
+
+def detected_test_framework(test_reports: Any) -> str:
+    """Read the framework the discovery agent detected from its stored results."""
+    test_reports = _load_state_json(test_reports)
+    if not isinstance(test_reports, dict):
+        return ""
+
+    framework = test_reports.get("framework_detected") or ""
+    return ", ".join(map(str, framework)) if isinstance(framework, list) else str(framework)
+
+
+def analysis_progress_key(agent_name: str) -> str:
+    """State key holding the tests recorded by one analysis agent."""
+    return f"{STATE_ANALYZED_TESTS}_{agent_name}"
+
+
+def record_test_analysis(
+    analyzed_test: Dict[str, Any], tool_context: ToolContext | None = None
+) -> Dict[str, Any]:
+    """Record the analysis of one test as soon as it is finished."""
+    if not tool_context or not hasattr(tool_context, "state"):
+        return {"status": "error", "message": "No tool context available"}
+
+    # One key per agent, so parallel workers never overwrite each other's results.
+    # Reassign rather than append in place, so ADK records the state change
+    key = analysis_progress_key(tool_context.agent_name)
+    recorded = list(tool_context.state.get(key) or []) + [analyzed_test]
+    tool_context.state[key] = recorded
+    logger.debug(f"Recorded analysis for test '{analyzed_test.get('test_name', '')}'")
+    return {"status": "success", "tests_recorded": len(recorded)}
+
+
+def assemble_test_analysis(analyzed_tests: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the full analysis structure, including summary counts, from recorded tests.
+
+    Tests scored low on meaningfulness count as critical, tests scored high with no issues
+    count as good, and everything else as moderate.
+    """
+    summary = {
+        "total_tests_analyzed": len(analyzed_tests),
+        "tests_found_in_code": 0,
+        "critical_issues": 0,
+        "moderate_issues": 0,
+        "good_tests": 0,
+    }
+    for test in analyzed_tests:
+        if (test.get("test_location") or {}).get("found"):
+            summary["tests_found_in_code"] += 1
+
+        score = str(test.get("meaningfulness_score") or "").lower()
+        if score == "low":
+            summary["critical_issues"] += 1
+        elif score == "high" and not test.get("issues_found"):
+            summary["good_tests"] += 1
+        else:
+            summary["moderate_issues"] += 1
+
+    return {"analyzed_tests": analyzed_tests, "analysis_summary": summary}
+
+
+def compact_test_analysis(
+    analysis: Any, exemplars_per_bucket: int = COMPACT_ANALYSIS_EXEMPLARS
+) -> Optional[Dict[str, Any]]:
+    """Condense the full test analysis into what the report agents need.
+
+    Tests are grouped by meaningfulness score into counts plus a few exemplars each, and
+    every test with problems keeps its issues. Returns None if the analysis can't be read.
+    """
+    analysis = _load_state_json(analysis)
+    if not isinstance(analysis, dict):
+        return None
+
+    buckets: Dict[str, Dict[str, Any]] = {}
+    tests_with_issues = []
+    for test in analysis.get("analyzed_tests", []):
+        if not isinstance(test, dict):
+            continue
+        bucket = buckets.setdefault(
+            str(test.get("meaningfulness_score") or "unknown").lower(),
+            {"count": 0, "exemplars": []},
+        )
+        bucket["count"] += 1
+        if len(bucket["exemplars"]) < exemplars_per_bucket:
+            bucket["exemplars"].append(test)
+
+        issues = test.get("issues_found") or test.get("consistency_issues")
+        if issues:
+            tests_with_issues.append(
+                {
+                    "test_name": test.get("test_name"),
+                    "file_path": (test.get("test_location") or {}).get("file_path"),
+                    "issues_found": issues,
+                    "naming_suggestions": test.get("naming_suggestions", []),
+                }
+            )
+
+    return {
+        "analysis_summary": analysis.get("analysis_summary", {}),
+        "meaningfulness_buckets": buckets,
+        "tests_with_issues": tests_with_issues,
+    }
+
+
 def discover_test_files(
     target_directory: str, tool_context: ToolContext | None = None
 ) -> Dict[str, Any]:
-    """Discover test files in the target project using pattern matching."""
+    """Discover test files in the target project using pattern matching.
+
+    Once the project has been hashed, results are indexed in memory by directory and
+    project hash, so later calls for the same unchanged project (e.g. from
+    search_test_by_name) skip the filesystem walk. Session state is never written.
+    """
     try:
         if not os.path.exists(target_directory):
             return {"error": f"Target directory does not exist: {target_directory}"}
 
+        state = tool_context.state if tool_context and hasattr(tool_context, "state") else None
+        project_hash = state.get(STATE_PROJECT_HASH) if state is not None else None
+        index_key = (target_directory, project_hash)
+        if project_hash is not None:
+            with _test_files_index_lock:
+                if index_key in _test_files_index:
+                    _test_files_index.move_to_end(index_key)
+                    logger.debug(f"Using indexed test files for: {target_directory}")
+                    return copy.deepcopy(_test_files_index[index_key])
+
         logger.info(f"Discovering test files in: {target_directory}")
         discovered_test_files = []
 
-        for pattern in TEST_FILE_PATTERNS:
-            # Convert glob pattern to work from target directory
-            full_pattern = os.path.join(target_directory, pattern.lstrip("**/"))
-            matches = glob.glob(full_pattern, recursive=True)
-
-            for match in matches:
-                if os.path.isfile(match):
-                    relative_path = os.path.relpath(match, target_directory)
-                    file_size = os.path.getsize(match)
-
-                    discovered_test_files.append(
-                        {
-                            "file_path": relative_path,
-                            "absolute_path": match,
-                            "file_size": file_size,
-                            "pattern_matched": pattern,
-                            "language": _detect_language_from_extension(match),
-                        }
-                    )
-
-        # Remove duplicates and sort by path
-        unique_files = []
-        seen_paths = set()
-        for test_file in discovered_test_files:
-            if test_file["absolute_path"] not in seen_paths:
-                unique_files.append(test_file)
-                seen_paths.add(test_file["absolute_path"])
+        for match, relative_path, pattern, file_size in _find_matching_files(
+            target_directory, TEST_FILE_PATTERNS
+        ):
+            discovered_test_files.append(
+                {
+                    "file_path": relative_path,
+                    "absolute_path": match,
+                    "file_size": file_size,
+                    "pattern_matched": pattern,
+                    "language": _detect_language_from_extension(match),
+                }
+            )
 
-        unique_files.sort(key=lambda x: x["file_path"])
+        unique_files = sorted(discovered_test_files, key=lambda x: x["file_path"])
 
-        return {
+        result = {
             "discovered_test_files": unique_files,
             "total_test_files_found": len(unique_files),
             "search_directory": target_directory,
             "languages_detected": list(set(f["language"] for f in unique_files)),
+            "project_hash": project_hash,
         }
+        if project_hash is not None:
+            with _test_files_index_lock:
+                _test_files_index[index_key] = copy.deepcopy(result)
+                while len(_test_files_index) > TEST_FILES_INDEX_MAX_ENTRIES:
+                    _test_files_index.popitem(last=False)
+        return result
 
     except Exception as e:
         error_msg = f"Error discovering test files in {target_directory}: {str(e)}"
@@ -356,8 +614,7 @@ def search_test_by_name(
 
         for test_file in test_files:
             try:
-                with open(test_file["absolute_path"], "r", encoding="utf-8", errors="ignore") as f:
-                    content = f.read()
+                content = _read_test_file(test_file["absolute_path"])
 
                 # Look for exact matches first
                 if _find_test_in_content(content, test_name, exact=True):
@@ -402,6 +659,52 @@ def search_test_by_name(
         return {"error": error_msg}
 
 
+@functools.cache
+def analyzer_fingerprint() -> str:
+    """Digest of the analyzer's own sources, so prompt, model or schema changes show up."""
+    hasher = hashlib.blake2b(digest_size=8)
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for file_name in ANALYZER_SOURCE_FILES:
+        with open(os.path.join(package_dir, file_name), "rb") as f:
+            hasher.update(f.read())
+    return hasher.hexdigest()
+
+
+def _cached_report_path(project_hash: str) -> str:
+    """Location of the saved report for a project content hash and the current analyzer."""
+    return os.path.join(REPORT_CACHE_DIR, f"{project_hash}-{analyzer_fingerprint()}.json")
+
+
+def hash_target_project(
+    target_directory: str, tool_context: ToolContext | None = None
+) -> Dict[str, Any]:
+    """Hash the target project's contents and look for a report saved for that exact hash."""
+    try:
+        if not os.path.isdir(target_directory):
+            return {"status": "error", "message": f"Directory not found: {target_directory}"}
+
+        project_hash = project_content_hash(target_directory)
+        if tool_context and hasattr(tool_context, "state"):
+            tool_context.state[STATE_PROJECT_HASH] = project_hash
+
+        cached_report = _cached_report_path(project_hash)
+        has_cached_report = os.path.exists(cached_report)
+        logger.info(
+            f"Project hash {project_hash[:12]} for {target_directory}, "
+            f"cached report {'found' if has_cached_report else 'not found'}"
+        )
+        return {
+            "status": "success",
+            "project_hash": project_hash,
+            "cached_report": cached_report if has_cached_report else None,
+        }
+
+    except Exception as e:
+        error_msg = f"Error hashing project {target_directory}: {str(e)}"
+        logger.error(error_msg)
+        return {"status": "error", "message": error_msg}
+
+
 def save_analysis_report(
     report_data: Dict[str, Any], target_directory: str, tool_context: ToolContext | None = None
 ) -> Dict[str, str]:
@@ -410,6 +713,11 @@ def save_analysis_report(
         # Save in the project_test_summarizer directory, not the target project
         current_dir = os.path.dirname(os.path.abspath(__file__))
         output_file = os.path.join(current_dir, REPORT_OUTPUT_FILE)
+        project_hash = (
+            tool_context.state.get(STATE_PROJECT_HASH)
+            if tool_context and hasattr(tool_context, "state")
+            else None
+        )
 
         # Add metadata to the report
         enhanced_report = {
@@ -417,12 +725,22 @@ def save_analysis_report(
                 "analyzed_project": target_directory,
                 "analysis_timestamp": __import__("datetime").datetime.now().isoformat(),
                 "analyzer_version": "1.0.0",
+                "analyzer_fingerprint": analyzer_fingerprint(),
+                "project_hash": project_hash,
             },
             "analysis_results": report_data,
         }
 
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(enhanced_report, f, indent=2, ensure_ascii=False)
+        # Serialize once; the same bytes go to both files
+        report_bytes = _dump_report_json(enhanced_report)
+        with open(output_file, "wb") as f:
+            f.write(report_bytes)
+
+        # Keep a copy per project hash so a rerun on the unchanged project can reuse it
+        if project_hash:
+            os.makedirs(REPORT_CACHE_DIR, exist_ok=True)
+            with open(_cached_report_path(project_hash), "wb") as f:
+                f.write(report_bytes)
 
         logger.info(f"Analysis report saved to: {output_file}")
         return {
@@ -437,38 +755,313 @@ def save_analysis_report(
         return {"status": "error", "message": error_msg}
 
 
+def export_analysis_report(tool_context: ToolContext | None = None) -> Dict[str, Any]:
+    """Compile all pipeline results from session state and save them as the analysis report.
+
+    The results are read straight from state, so the calling agent never has to fetch them
+    and send them back. Returns the save result plus the analysis summary counts.
+    """
+    if not tool_context or not hasattr(tool_context, "state"):
+        return {"status": "error", "message": "No tool context available"}
+
+    state = tool_context.state
+    report_data = {}
+    for key in REPORT_STATE_KEYS:
+        value = state.get(key)
+        parsed = _load_state_json(value)
+        report_data[key] = value if parsed is None else parsed
+
+    target_directory = _load_state_json(state.get(STATE_TARGET_PROJECT)) or ""
+    result = save_analysis_report(report_data, str(target_directory), tool_context)
+    analysis = report_data[STATE_TEST_ANALYSIS]
+    if result["status"] == "success" and isinstance(analysis, dict):
+        result["analysis_summary"] = analysis.get("analysis_summary")
+    return result
+
+
 # --- Helper Functions ---
 
 
+def _glob_to_regex(pattern: str) -> str:
+    """Translate a glob pattern into a regex over /-separated relative paths.
+
+    A leading or inner **/ matches any number of directories, including none. Like glob,
+    wildcards never match a leading dot, so hidden files and directories only match
+    pattern parts that spell the dot out.
+    """
+    regex = []
+    i = 0
+    while i < len(pattern):
+        visible = "" if i and pattern[i - 1] != "/" else r"(?!\.)"
+        if pattern.startswith("**/", i):
+            regex.append(r"(?:(?!\.)[^/]+/)*")
+            i += 3
+        elif pattern.startswith("**", i):
+            regex.append(r"(?!\.)[^/]*(?:/(?!\.)[^/]*)*")
+            i += 2
+        elif pattern[i] == "*":
+            regex.append(visible + "[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            regex.append(visible + "[^/]")
+            i += 1
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(regex)
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_glob_patterns(
+    patterns: Tuple[str, ...],
+) -> Tuple[re.Pattern, frozenset, Optional[Tuple[str, ...]]]:
+    """Compile glob patterns into one alternation regex, one named group per pattern.
+
+    Also returns the hidden directory names the patterns spell out, the only hidden
+    directories worth descending into (like glob, ** alone skips them), and the literal
+    file name endings one of which every match must have (None if a pattern allows any).
+    """
+    matcher = re.compile(
+        "|".join(f"(?P<p{i}>{_glob_to_regex(pattern)})" for i, pattern in enumerate(patterns))
+    )
+    hidden_dirs = frozenset(
+        part
+        for pattern in patterns
+        for part in pattern.split("/")[:-1]
+        if part.startswith(".") and not any(c in part for c in "*?[")
+    )
+    suffixes = tuple(re.split(r"[*?]", pattern.rsplit("/", 1)[-1])[-1] for pattern in patterns)
+    return matcher, hidden_dirs, None if "" in suffixes else suffixes
+
+
+def _find_matching_files(root: str, patterns: List[str]) -> List[Tuple[str, str, str, int]]:
+    """Walk root once and match every file against all glob patterns at the same time.
+
+    Directories in DISCOVERY_SKIPPED_DIRECTORIES are pruned, and files without one of the
+    literal endings the patterns require are rejected before the regex runs. Returns
+    (absolute path, relative path, first matching pattern, size) for each match, in sorted
+    walk order. Sizes come from the directory scan, so matches need no extra stat call.
+    """
+    matcher, hidden_dirs, suffixes = _compile_glob_patterns(tuple(patterns))
+    matches = []
+    pending = [(root, "")]
+    while pending:
+        directory, relative_dir = pending.pop()
+        try:
+            with os.scandir(directory) as scan:
+                entries = sorted(scan, key=lambda entry: entry.name)
+        except OSError as e:
+            logger.debug(f"Skipping unreadable directory {directory}: {e}")
+            continue
+
+        sub_dirs = []
+        for entry in entries:
+            if entry.is_dir():
+                # Like os.walk, don't descend into symlinked directories
+                visible = not entry.name.startswith(".") or entry.name in hidden_dirs
+                skipped = entry.name in DISCOVERY_SKIPPED_DIRECTORIES
+                if visible and not skipped and not entry.is_symlink():
+                    sub_dirs.append((entry.path, relative_dir + entry.name + os.sep))
+                continue
+            if suffixes is not None and not entry.name.endswith(suffixes):
+                continue
+
+            relative_path = relative_dir + entry.name
+            match = matcher.fullmatch(relative_path.replace(os.sep, "/"))
+            if match:
+                try:
+                    file_size = entry.stat().st_size
+                except OSError as e:
+                    logger.debug(f"Skipping unreadable file {entry.path}: {e}")
+                    continue
+                pattern = patterns[int(match.lastgroup[1:])]
+                matches.append((entry.path, relative_path, pattern, file_size))
+
+        pending.extend(reversed(sub_dirs))  # Pop subdirectories in sorted order
+    return matches
+
+
+def _read_test_file(file_path: str) -> str:
+    """Read a test file, reusing the cached content while its size and mtime are unchanged.
+
+    The cache is bounded by TEST_FILE_CACHE_MAX_CHARS; least recently used files go first.
+    """
+    global _test_file_cache_chars
+    stat = os.stat(file_path)
+    key = (file_path, stat.st_size, stat.st_mtime_ns)
+    with _test_file_contents_lock:
+        if key in _test_file_contents:
+            _test_file_contents.move_to_end(key)
+            return _test_file_contents[key]
+
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        content = f.read()
+
+    with _test_file_contents_lock:
+        if key not in _test_file_contents:
+            _test_file_contents[key] = content
+            _test_file_cache_chars += len(content)
+        while _test_file_cache_chars > TEST_FILE_CACHE_MAX_CHARS and len(_test_file_contents) > 1:
+            _, evicted = _test_file_contents.popitem(last=False)
+            _test_file_cache_chars -= len(evicted)
+    return content
+
+
+def _dump_report_json(report: Dict[str, Any]) -> bytes:
+    """Serialize a report as indented UTF-8 JSON, using orjson when it is installed.
+
+    The stdlib encoder falls back to pure Python whenever indent is set.
+    """
+    if orjson is not None:
+        return orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(report, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _extracted_test_name(test: Any) -> str:
+    """Name an extracted test the way the analysis records it (its original report name)."""
+    if not isinstance(test, dict):
+        return str(test)
+    return str(test.get("original_name") or test.get("test_name") or test.get("full_name"))
+
+
+def _load_state_json(value: Any) -> Any:
+    """Parse JSON text stored in state by an agent; other values are returned unchanged.
+
+    Returns None for text that isn't valid JSON.
+    """
+    if not isinstance(value, str):
+        return value
+
+    # Agent output may wrap the JSON in a markdown code fence
+    try:
+        return json.loads(_CODE_FENCE_PATTERN.sub("", value.strip()))
+    except json.JSONDecodeError:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def _bytes_pattern(pattern: re.Pattern) -> re.Pattern:
+    """Compile the bytes twin of an ASCII text pattern, for scanning memory-mapped files.
+
+    Character classes like \\w only match ASCII in a bytes pattern and would cut non-ASCII
+    names short, so patterns using them are rejected.
+    """
+    if _UNICODE_CLASS_PATTERN.search(pattern.pattern):
+        raise ValueError(f"Pattern needs decoded text to match Unicode: {pattern.pattern}")
+    return re.compile(pattern.pattern.encode("ascii"), pattern.flags & ~re.UNICODE)
+
+
+def _pattern_for(pattern: re.Pattern, content: Union[str, mmap.mmap]) -> re.Pattern:
+    """Pick the text pattern for str content and its bytes twin for a memory map."""
+    return pattern if isinstance(content, str) else _bytes_pattern(pattern)
+
+
+def _first_capture(match: re.Match) -> str:
+    """Return the first capture group of the alternative that matched a combined pattern."""
+    value = match.group(match.re.groupindex[match.lastgroup] + 1)
+    return value if isinstance(value, str) else value.decode("utf-8", errors="ignore")
+
+
+def _canonical_test_key(test: Dict[str, Any]) -> Tuple[str, str]:
+    """Build the (class, test name) identity used to spot re-reported tests."""
+    class_name = str(test.get("class_name") or "").strip().lower()
+    test_name = str(test.get("test_name") or test.get("full_name") or "")
+    return class_name, _PARAMETERIZATION_PATTERN.sub("", test_name).strip().lower()
+
+
 def _extract_tests_from_text(content: str) -> List[Dict[str, Any]]:
     """Extract test names from plain text content using regex patterns."""
     tests = []
 
-    # Common test name patterns
-    patterns = [
-        r"test_(\w+)",  # Python pytest style
-        r"def test_(\w+)",  # Python function definitions
-        r"class Test(\w+)",  # Python test classes
-        r"@Test.*?(\w+)",  # Java @Test annotations
-        r'it\(["\']([^"\']+)',  # JavaScript/TypeScript it() blocks
-        r'describe\(["\']([^"\']+)',  # JavaScript/TypeScript describe blocks
-        r'test\(["\']([^"\']+)',  # JavaScript/TypeScript test() blocks
-    ]
+    for match in _TEXT_TEST_PATTERN.finditer(content):
+        test_name = _first_capture(match)
+        tests.append(
+            {
+                "test_name": test_name,
+                "full_name": test_name,
+                "status": "unknown",
+                "extraction_method": "regex_text",
+            }
+        )
+
+    return tests
+
+
+def _read_report_text(report_file_path: str) -> str:
+    """Read a report file as text, ignoring undecodable bytes."""
+    with open(report_file_path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+@contextlib.contextmanager
+def _report_content(report_file_path: str) -> Iterator[Union[str, mmap.mmap]]:
+    """Provide a report's content for regex scanning.
+
+    Reports of REPORT_MMAP_MIN_BYTES and up are memory-mapped read-only instead of being
+    decoded into one large str; matched names are decoded individually. Only for patterns
+    _bytes_pattern accepts, which match the same names in both forms.
+    """
+    if os.path.getsize(report_file_path) < REPORT_MMAP_MIN_BYTES:
+        yield _read_report_text(report_file_path)
+        return
+
+    with open(report_file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            yield content
+
+
+def _parse_junit_xml(report_file_path: str) -> Tuple[List[Dict[str, Any]], int, int]:
+    """Stream-parse a JUnit-style XML report into (tests, test suite count, total tests).
+
+    Each testcase and testsuite element is cleared as soon as it has been read, so memory
+    stays bounded by one test case rather than the whole document. Total tests come from
+    the outermost suites, whose counts include their nested suites.
+    """
+    tests = []
+    test_suites = 0
+    total_tests = 0
+    suite_depth = 0
+    for event, element in ET.iterparse(report_file_path, events=("start", "end")):
+        if event == "start":
+            if element.tag == "testsuite":
+                suite_depth += 1
+        elif element.tag == "testcase":
+            test_name = element.get("name", "")
+            class_name = element.get("classname", "")
+
+            # Check for failure or error elements
+            status = "passed"
+            failure_msg = ""
+            failure_elem = element.find("failure")
+            error_elem = element.find("error")
+            if failure_elem is not None:
+                status = "failed"
+                failure_msg = failure_elem.get("message", "")
+            elif error_elem is not None:
+                status = "error"
+                failure_msg = error_elem.get("message", "")
 
-    for pattern in patterns:
-        matches = re.finditer(pattern, content, re.IGNORECASE)
-        for match in matches:
-            test_name = match.group(1)
             tests.append(
                 {
                     "test_name": test_name,
-                    "full_name": test_name,
-                    "status": "unknown",
-                    "extraction_method": "regex_text",
+                    "class_name": class_name,
+                    "full_name": f"{class_name}.{test_name}" if class_name else test_name,
+                    "status": status,
+                    "execution_time": element.get("time", ""),
+                    "failure_message": failure_msg,
                 }
             )
+            element.clear()
+        elif element.tag == "testsuite":
+            test_suites += 1
+            suite_depth -= 1
+            suite_tests = element.get("tests")
+            # An outer suite's count already includes the tests of its nested suites
+            if suite_tests and suite_depth == 0:
+                total_tests += int(suite_tests)
+            element.clear()
 
-    return tests
+    return tests, test_suites, total_tests
 
 
 def _extract_tests_from_json(json_data: Any) -> List[Dict[str, Any]]:
@@ -507,32 +1100,21 @@ def _extract_tests_from_json(json_data: Any) -> List[Dict[str, Any]]:
     return tests
 
 
-def _extract_tests_from_html(content: str) -> List[Dict[str, Any]]:
+def _extract_tests_from_html(content: Union[str, mmap.mmap]) -> List[Dict[str, Any]]:
     """Extract test names from HTML test report content."""
     tests = []
 
-    # Common HTML report patterns
-    patterns = [
-        r'<td[^>]*class="test[^"]*"[^>]*>([^<]+)',
-        r'<span[^>]*class="test[^"]*"[^>]*>([^<]+)',
-        r'<div[^>]*class="test[^"]*"[^>]*>([^<]+)',
-        r'data-test-name="([^"]+)"',
-        r'id="test_([^"]+)"',
-    ]
-
-    for pattern in patterns:
-        matches = re.finditer(pattern, content, re.IGNORECASE)
-        for match in matches:
-            test_name = match.group(1).strip()
-            if test_name and len(test_name) > 2:  # Filter out very short matches
-                tests.append(
-                    {
-                        "test_name": test_name,
-                        "full_name": test_name,
-                        "status": "unknown",
-                        "extraction_method": "html_parsing",
-                    }
-                )
+    for match in _pattern_for(_HTML_TEST_PATTERN, content).finditer(content):
+        test_name = _first_capture(match).strip()
+        if test_name and len(test_name) > 2:  # Filter out very short matches
+            tests.append(
+                {
+                    "test_name": test_name,
+                    "full_name": test_name,
+                    "status": "unknown",
+                    "extraction_method": "html_parsing",
+                }
+            )
 
     return tests
 
@@ -557,56 +1139,50 @@ def _detect_language_from_extension(file_path: str) -> str:
     return language_map.get(ext, "unknown")
 
 
+@functools.lru_cache(maxsize=1024)
+def _exact_test_name_pattern(test_name: str) -> re.Pattern:
+    """Compile the patterns that mark an exact definition of test_name, once per name."""
+    name = re.escape(test_name)
+    patterns = (
+        rf"\bdef\s+{name}\b",  # Python function
+        rf"\btest_{name}\b",  # Python pytest style
+        rf"\b{name}_test\b",  # Python test suffix
+        rf"\bclass\s+{name}\b",  # Test class
+        rf"@Test.*{name}",  # Java @Test
+        rf'it\s*\(\s*["\'].*{name}.*["\']',  # JS/TS it()
+        rf'test\s*\(\s*["\'].*{name}.*["\']',  # JS/TS test()
+    )
+    return _combine_patterns(patterns, re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=1024)
+def _fuzzy_test_name_pattern(test_name: str) -> re.Pattern:
+    """Compile a case-insensitive literal match for test_name, so files aren't lowercased."""
+    return re.compile(re.escape(test_name), re.IGNORECASE)
+
+
 def _find_test_in_content(content: str, test_name: str, exact: bool = True) -> bool:
     """Find test name in file content."""
     if exact:
         # Look for exact matches with common test patterns
-        patterns = [
-            rf"\bdef\s+{re.escape(test_name)}\b",  # Python function
-            rf"\btest_{re.escape(test_name)}\b",  # Python pytest style
-            rf"\b{re.escape(test_name)}_test\b",  # Python test suffix
-            rf"\bclass\s+{re.escape(test_name)}\b",  # Test class
-            rf"@Test.*{re.escape(test_name)}",  # Java @Test
-            rf'it\s*\(\s*["\'].*{re.escape(test_name)}.*["\']',  # JS/TS it()
-            rf'test\s*\(\s*["\'].*{re.escape(test_name)}.*["\']',  # JS/TS test()
-        ]
-        return any(re.search(pattern, content, re.IGNORECASE) for pattern in patterns)
+        return _exact_test_name_pattern(test_name).search(content) is not None
     else:
-        # Fuzzy matching - check if test_name appears anywhere
-        return test_name.lower() in content.lower()
+        # Fuzzy matching - check if test_name appears anywhere, ignoring case
+        return _fuzzy_test_name_pattern(test_name).search(content) is not None
 
 
 def _extract_test_functions_from_content(content: str, language: str) -> List[Dict[str, str]]:
     """Extract test function definitions from content based on language."""
     functions = []
 
-    if language == "python":
-        # Python test functions
-        patterns = [
-            r'def\s+(test_\w+)\s*\([^)]*\):\s*"""([^"]*?)"""',  # With docstring
-            r"def\s+(test_\w+)\s*\([^)]*\):",  # Without docstring
-            r"class\s+(Test\w+).*?:",  # Test classes
-        ]
-    elif language == "java":
-        # Java test methods
-        patterns = [r"@Test.*?public\s+void\s+(\w+)\s*\([^)]*\)", r"@Test.*?(\w+)\s*\([^)]*\)"]
-    elif language in ["javascript", "typescript"]:
-        # JavaScript/TypeScript test functions
-        patterns = [
-            r'it\s*\(\s*["\']([^"\']+)["\']',
-            r'test\s*\(\s*["\']([^"\']+)["\']',
-            r'describe\s*\(\s*["\']([^"\']+)["\']',
-        ]
-    else:
-        # Generic patterns
-        patterns = [r"test\w*\s+(\w+)", r"(\w*test\w*)\s*\("]
-
-    for pattern in patterns:
-        matches = re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE)
-        for match in matches:
-            func_name = match.group(1)
-            functions.append(
-                {"function_name": func_name, "language": language, "line_context": match.group(0)}
-            )
+    pattern = _TEST_FUNCTION_PATTERNS.get(language, _TEST_FUNCTION_PATTERNS["generic"])
+    for match in pattern.finditer(content):
+        functions.append(
+            {
+                "function_name": _first_capture(match),
+                "language": language,
+                "line_context": match.group(0),
+            }
+        )
 
     return functions
@@ -1,5 +1,6 @@
 """Shared pytest fixtures for the entire test suite."""
 
+import logging
 import os
 import shutil
 import tempfile
@@ -17,20 +18,39 @@ class MockSession:
         self.state = {}
 
 
-@pytest.fixture
-def temp_dir():
-    """Create a temporary directory for testing file operations.
+class ListHandler(logging.Handler):
+    """Logging handler that keeps formatted records in memory."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(self.format(record))
+
 
-    Provides a clean temporary directory that gets automatically cleaned up
-    after the test completes.
+@pytest.fixture(scope="session")
+def temp_root():
+    """Create the base directory holding every test's temporary directory.
+
+    Created once per test run and removed, with all test directories, at the end of it.
     """
-    # Arrange
-    temp_path = tempfile.mkdtemp()
+    root_path = tempfile.mkdtemp()
 
-    yield temp_path
+    yield root_path
 
     # Cleanup
-    shutil.rmtree(temp_path, ignore_errors=True)
+    shutil.rmtree(root_path, ignore_errors=True)
+
+
+@pytest.fixture
+def temp_dir(temp_root):
+    """Create a temporary directory for testing file operations.
+
+    Provides a clean temporary directory of its own for each test, inside the run's
+    temp_root, so setting it up is a single mkdir and cleanup happens once per run.
+    """
+    return tempfile.mkdtemp(dir=temp_root)
 
 
 @pytest.fixture
@@ -70,17 +90,38 @@ def sample_project_structure(temp_dir):
     return str(project_root)
 
 
+@pytest.fixture
+def captured_log(temp_dir):
+    """Set up a logger whose file output is captured in memory.
+
+    The file handler installed by setup_logging is swapped for a ListHandler with the same
+    formatter, so tests read log output from a list instead of a file on disk.
+    Yields the logger and the list of formatted records.
+    """
+    from common.logging_setup import BackgroundHandler, setup_logging
+
+    logger = setup_logging("captured_app", log_dir=temp_dir, redirect_stdout=False)
+    memory_handler = ListHandler()
+    for handler in list(logger.handlers):
+        if isinstance(handler, BackgroundHandler):
+            memory_handler.setFormatter(handler.handler.formatter)
+            logger.removeHandler(handler)
+            handler.close()
+    logger.addHandler(memory_handler)
+
+    yield logger, memory_handler.records
+
+    logger.removeHandler(memory_handler)
+
+
 @pytest.fixture
 def mock_logger():
-    """Create a mock logger for testing logging functionality."""
-    # Arrange
-    logger = Mock()
-    logger.info = Mock()
-    logger.warning = Mock()
-    logger.error = Mock()
-    logger.debug = Mock()
+    """Create a mock logger for testing logging functionality.
 
-    return logger
+    Specced on logging.Logger, so its methods are created on first use and a misspelled
+    logging call fails the test.
+    """
+    return Mock(spec=logging.Logger)
 
 
 @pytest.fixture
@@ -0,0 +1,40 @@
+"""Tests for async wrappers around blocking tools."""
+
+import inspect
+import threading
+
+import pytest
+
+from common.async_tools import run_tool_in_thread
+
+
+def blocking_tool(path: str, tool_context=None) -> dict:
+    """Report which thread ran the tool."""
+    return {"path": path, "thread": threading.get_ident()}
+
+
+class TestRunToolInThread:
+    """Test running blocking tools off the event loop."""
+
+    @pytest.mark.asyncio
+    async def test_should_run_tool_on_worker_thread(self):
+        """Should return the tool's result computed on another thread."""
+        # Arrange
+        tool = run_tool_in_thread(blocking_tool)
+
+        # Act
+        result = await tool("src", tool_context=None)
+
+        # Assert
+        assert result["path"] == "src"
+        assert result["thread"] != threading.get_ident()
+
+    def test_should_keep_tool_name_and_signature(self):
+        """Should look like the original function to ADK's FunctionTool."""
+        # Arrange
+        tool = run_tool_in_thread(blocking_tool)
+
+        # Act & Assert
+        assert inspect.iscoroutinefunction(tool)
+        assert tool.__name__ == "blocking_tool"
+        assert list(inspect.signature(tool).parameters) == ["path", "tool_context"]
@@ -0,0 +1,52 @@
+"""Tests for in-flight request deduplication."""
+
+import asyncio
+
+import pytest
+
+from common.inflight import InFlightDedup
+
+
+class TestInFlightDedup:
+    """Test leader/waiter coordination for identical concurrent requests."""
+
+    @pytest.mark.asyncio
+    async def test_should_make_first_caller_leader_and_share_result(self):
+        """Should hand later callers the leader's future and resolve it for all."""
+        # Arrange
+        dedup = InFlightDedup()
+
+        # Act
+        leader = dedup.claim("key")
+        waiter = dedup.claim("key")
+        dedup.resolve("key", "response")
+
+        # Assert
+        assert leader is None
+        assert await waiter == "response"
+        assert len(dedup) == 0
+
+    @pytest.mark.asyncio
+    async def test_should_treat_different_keys_independently(self):
+        """Should make the first caller for each key a leader."""
+        # Arrange
+        dedup = InFlightDedup()
+
+        # Act & Assert
+        assert dedup.claim("a") is None
+        assert dedup.claim("b") is None
+
+    @pytest.mark.asyncio
+    async def test_should_drop_stale_entry_when_wait_times_out(self):
+        """Should return None and let the next caller lead when the leader never resolves."""
+        # Arrange
+        dedup = InFlightDedup()
+        dedup.claim("key")
+        waiter = dedup.claim("key")
+
+        # Act
+        result = await dedup.wait("key", waiter, timeout=0.01)
+
+        # Assert
+        assert result is None
+        assert dedup.claim("key") is None
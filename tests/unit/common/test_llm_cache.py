@@ -0,0 +1,326 @@
+"""Tests for LLM response caching functionality."""
+
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from common.inflight import InFlightDedup
+from common.llm_cache import (
+    STATE_VERSION_KEY,
+    LLMResponseCache,
+    SqliteLLMCache,
+    create_cached_model_callbacks,
+    request_cache_key,
+    set_versioned_state,
+    versioned_cache_key,
+)
+
+
+class MockState(dict):
+    """Dict-backed stand-in for ADK session state."""
+
+    def to_dict(self):
+        return dict(self)
+
+
+def make_context(agent_name="TestAgent", state=None, invocation_id="inv-1", session_id=None):
+    """Create a minimal callback context."""
+    return SimpleNamespace(
+        agent_name=agent_name,
+        state=MockState(state or {}),
+        invocation_id=invocation_id,
+        _invocation_context=SimpleNamespace(session=SimpleNamespace(id=session_id)),
+    )
+
+
+def make_request(instruction="Do the thing", last_parts=None):
+    """Create a minimal LLM request."""
+    contents = [SimpleNamespace(parts=last_parts)] if last_parts is not None else []
+    return SimpleNamespace(
+        config=SimpleNamespace(system_instruction=instruction), contents=contents
+    )
+
+
+def make_response(text="answer", **overrides):
+    """Create a minimal successful LLM response."""
+    response = SimpleNamespace(content=text, error_code=None, partial=False)
+    response.__dict__.update(overrides)
+    return response
+
+
+class JsonResponse:
+    """Minimal stand-in for a pydantic LlmResponse."""
+
+    def __init__(self, text):
+        self.text = text
+
+    def model_dump_json(self, **kwargs):
+        return json.dumps({"text": self.text})
+
+    @classmethod
+    def model_validate_json(cls, data):
+        return cls(json.loads(data)["text"])
+
+
+class TestLLMResponseCache:
+    """Test the bounded in-memory response cache."""
+
+    def test_should_return_none_on_miss(self):
+        """Should return None for keys that were never stored."""
+        # Arrange
+        cache = LLMResponseCache()
+
+        # Act & Assert
+        assert cache.get("missing") is None
+
+    def test_should_evict_least_recently_used_entry(self):
+        """Should drop the least recently used entry once over capacity."""
+        # Arrange
+        cache = LLMResponseCache(max_entries=2)
+        cache.put("a", make_response("a"))
+        cache.put("b", make_response("b"))
+        cache.get("a")
+
+        # Act
+        cache.put("c", make_response("c"))
+
+        # Assert
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a").content == "a"
+
+
+class TestSqliteLLMCache:
+    """Test the persistent SQLite response cache."""
+
+    def test_should_persist_responses_across_instances(self, temp_dir):
+        """Should serve responses stored by an earlier cache on the same file."""
+        # Arrange
+        db_path = os.path.join(temp_dir, "cache.sqlite3")
+        SqliteLLMCache(db_path, response_type=JsonResponse).put("key", JsonResponse("answer"))
+
+        # Act
+        cached = SqliteLLMCache(db_path, response_type=JsonResponse).get("key")
+
+        # Assert
+        assert cached.text == "answer"
+
+    def test_should_return_none_on_miss_and_replace_on_put(self, temp_dir):
+        """Should miss on unknown keys and keep one row per key."""
+        # Arrange
+        cache = SqliteLLMCache(os.path.join(temp_dir, "cache.sqlite3"), JsonResponse)
+
+        # Act
+        cache.put("key", JsonResponse("first"))
+        cache.put("key", JsonResponse("second"))
+
+        # Assert
+        assert cache.get("missing") is None
+        assert cache.get("key").text == "second"
+        assert len(cache) == 1
+
+
+class TestRequestCacheKey:
+    """Test exact-match cache keys over the full request."""
+
+    def test_should_include_request_contents(self):
+        """Should change the key when the conversation contents change."""
+        # Arrange
+        context = make_context()
+        first = make_request(last_parts=[SimpleNamespace(text="a")])
+        second = make_request(last_parts=[SimpleNamespace(text="b")])
+
+        # Act & Assert
+        assert request_cache_key(context, first) == request_cache_key(context, first)
+        assert request_cache_key(context, first) != request_cache_key(context, second)
+
+
+class TestVersionedCacheKey:
+    """Test O(1) cache keys based on a state version counter."""
+
+    def test_should_bump_version_only_when_value_changes(self):
+        """Should leave the version alone when the same value is written again."""
+        # Arrange
+        state = MockState()
+
+        # Act
+        set_versioned_state(state, "needs_clarification", True)
+        set_versioned_state(state, "needs_clarification", True)
+        set_versioned_state(state, "needs_clarification", False)
+
+        # Assert
+        assert state == {"needs_clarification": False, STATE_VERSION_KEY: 2}
+
+    def test_should_key_on_session_agent_name_and_version(self):
+        """Should build the key from the state version instead of the state contents."""
+        # Arrange
+        context = make_context(state={STATE_VERSION_KEY: 3, "large": list(range(1000))})
+
+        # Act
+        key = versioned_cache_key(context, make_request())
+
+        # Assert
+        assert key == (None, "TestAgent", 3)
+
+    def test_should_match_across_loop_turns_while_state_is_unchanged(self):
+        """Should ignore the growing conversation so a repeated loop turn hits the cache."""
+        # Arrange
+        context = make_context(state={STATE_VERSION_KEY: 3})
+        next_turn = make_request(
+            last_parts=[SimpleNamespace(text="DecisionAgent said: keep going")]
+        )
+
+        # Act & Assert
+        assert versioned_cache_key(context, next_turn) == versioned_cache_key(
+            context, make_request()
+        )
+
+    @pytest.mark.parametrize(
+        "context",
+        [
+            make_context(state={STATE_VERSION_KEY: 3}, session_id="other"),
+            make_context(state={STATE_VERSION_KEY: 4}),
+            make_context(state={STATE_VERSION_KEY: 3}, agent_name="OtherAgent"),
+        ],
+    )
+    def test_should_separate_sessions_agents_and_versions(self, context):
+        """Should not reuse a key from another session, agent or state version."""
+        # Arrange
+        baseline = versioned_cache_key(make_context(state={STATE_VERSION_KEY: 3}), make_request())
+
+        # Act & Assert
+        assert versioned_cache_key(context, make_request()) != baseline
+
+    def test_should_skip_requests_continuing_after_tool_call(self):
+        """Should not cache requests that carry fresh tool output."""
+        # Arrange
+        tool_output = SimpleNamespace(function_response={"reply": "potato"})
+
+        # Act
+        key = versioned_cache_key(make_context(), make_request(last_parts=[tool_output]))
+
+        # Assert
+        assert key is None
+
+    def test_should_start_at_version_zero_before_first_versioned_write(self):
+        """Should key the first turn of a session on version 0."""
+        # Act
+        key = versioned_cache_key(make_context(state={"user_prompt": "hi"}), make_request())
+
+        # Assert
+        assert key == (None, "TestAgent", 0)
+
+
+class TestCachedModelCallbacks:
+    """Test the cache-aware callback wrappers."""
+
+    @pytest.mark.asyncio
+    async def test_should_call_wrapped_callbacks_and_store_response_on_miss(self):
+        """Should run the wrapped callbacks on a miss and cache the response."""
+        # Arrange
+        cache = LLMResponseCache()
+        pre_callback, after_callback = AsyncMock(return_value=None), AsyncMock(return_value=None)
+        cached_pre, cached_after = create_cached_model_callbacks(
+            pre_callback, after_callback, cache=cache
+        )
+        context, request = make_context(), make_request()
+
+        # Act
+        pre_result = await cached_pre(context, request)
+        await cached_after(context, make_response())
+
+        # Assert
+        assert pre_result is None
+        pre_callback.assert_awaited_once()
+        after_callback.assert_awaited_once()
+        assert len(cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_should_return_cached_response_without_calling_wrapped_callback(self):
+        """Should short-circuit the model call with the cached response on a hit."""
+        # Arrange
+        pre_callback, after_callback = AsyncMock(return_value=None), AsyncMock(return_value=None)
+        cached_pre, cached_after = create_cached_model_callbacks(pre_callback, after_callback)
+        await cached_pre(make_context(), make_request())
+        await cached_after(make_context(), make_response("cached answer"))
+        pre_callback.reset_mock()
+
+        # Act
+        result = await cached_pre(make_context(invocation_id="inv-2"), make_request())
+
+        # Assert
+        assert result.content == "cached answer"
+        pre_callback.assert_not_awaited()
+
+    @pytest.mark.parametrize(
+        "response,after_result",
+        [
+            (make_response(error_code="RESOURCE_EXHAUSTED"), None),
+            (make_response(partial=True), None),
+            (make_response(content=None), None),
+            (make_response(), "rate limit replacement response"),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_should_not_cache_failed_or_partial_responses(self, response, after_result):
+        """Should only cache complete, successful responses."""
+        # Arrange
+        cache = LLMResponseCache()
+        cached_pre, cached_after = create_cached_model_callbacks(
+            AsyncMock(return_value=None), AsyncMock(return_value=after_result), cache=cache
+        )
+
+        # Act
+        await cached_pre(make_context(), make_request())
+        await cached_after(make_context(), response)
+
+        # Assert
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_should_share_in_flight_response_between_concurrent_duplicates(self):
+        """Should let a duplicate request await the original instead of calling the model."""
+        # Arrange
+        pre_callback = AsyncMock(return_value=None)
+        cached_pre, cached_after = create_cached_model_callbacks(
+            pre_callback, AsyncMock(return_value=None), inflight=InFlightDedup()
+        )
+        await cached_pre(make_context(invocation_id="leader"), make_request())
+
+        # Act
+        duplicate = asyncio.create_task(
+            cached_pre(make_context(invocation_id="duplicate"), make_request())
+        )
+        await asyncio.sleep(0)
+        await cached_after(make_context(invocation_id="leader"), make_response("shared"))
+        result = await duplicate
+
+        # Assert
+        assert result.content == "shared"
+        pre_callback.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_should_let_duplicate_call_model_when_original_fails(self):
+        """Should fall back to a real call when the in-flight request yields no usable response."""
+        # Arrange
+        pre_callback = AsyncMock(return_value=None)
+        cached_pre, cached_after = create_cached_model_callbacks(
+            pre_callback, AsyncMock(return_value=None), inflight=InFlightDedup()
+        )
+        await cached_pre(make_context(invocation_id="leader"), make_request())
+
+        # Act
+        duplicate = asyncio.create_task(
+            cached_pre(make_context(invocation_id="duplicate"), make_request())
+        )
+        await asyncio.sleep(0)
+        await cached_after(make_context(invocation_id="leader"), make_response(error_code="500"))
+        result = await duplicate
+
+        # Assert
+        assert result is None
+        assert pre_callback.await_count == 2
@@ -13,6 +13,7 @@ from common.logging_setup import (
     DEFAULT_LOG_BACKUP_COUNT,
     DEFAULT_LOG_FILENAME_FORMAT,
     DEFAULT_LOG_MAX_BYTES,
+    BackgroundHandler,
     LoggerWriter,
     setup_logging,
 )
@@ -76,41 +77,42 @@ class TestLoggingSetup:
         assert logger is not None
         assert os.path.exists(log_dir)
 
+    def test_should_write_log_messages_to_file(self, temp_dir):
+        """Should write log messages to the timestamped log file."""
+        # Arrange
+        logger = setup_logging("test_app", log_dir=temp_dir, redirect_stdout=False)
+
+        # Act
+        logger.info("Test message")
+
+        # Assert
+        for handler in logger.handlers:
+            handler.flush()
+        log_files = [f for f in os.listdir(temp_dir) if f.endswith(".log")]
+        assert len(log_files) == 1
+        with open(os.path.join(temp_dir, log_files[0]), encoding="utf-8") as f:
+            assert "INFO - test_app - Test message" in f.read()
+
     @pytest.mark.parametrize(
-        "message_content,should_have_content",
+        "message_content",
         [
-            ("Test message", True),
-            ("测试 unicode content 🚀 café", True),  # Unicode
-            ("A" * 10000, True),  # Very long message
+            "Test message",
+            "测试 unicode content 🚀 café",  # Unicode
+            "A" * 10000,  # Very long message
         ],
     )
-    def test_should_write_various_log_messages_to_file(
-        self, temp_dir, message_content, should_have_content
-    ):
-        """Should write various types of log messages to file."""
+    def test_should_log_various_messages(self, captured_log, message_content):
+        """Should log various types of messages in full."""
         # Arrange
-        logger = setup_logging("test_app", log_dir=temp_dir, redirect_stdout=False)
+        logger, records = captured_log
 
         # Act
         logger.info(message_content)
         logger.warning("Warning: " + message_content[:50])  # Truncate for very long messages
 
         # Assert
-        # Force flush
-        for handler in logger.handlers:
-            if hasattr(handler, "flush"):
-                handler.flush()
-
-        # Check that log files were created
-        log_files = [f for f in os.listdir(temp_dir) if f.endswith(".log")]
-        assert len(log_files) > 0
-
-        # Check content
-        log_file_path = os.path.join(temp_dir, log_files[0])
-        with open(log_file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-            if should_have_content:
-                assert message_content[:100] in content  # Check first 100 chars for long messages
+        assert f"INFO - captured_app - {message_content}" in records[-2]
+        assert f"WARNING - captured_app - Warning: {message_content[:50]}" in records[-1]
 
 
 class TestLoggerWriter:
@@ -175,19 +177,17 @@ class TestLoggingConfiguration:
         assert DEFAULT_LOG_BACKUP_COUNT == 5
 
     def test_should_clear_existing_handlers(self, temp_dir):
-        """Should clear existing handlers when setting up new logger."""
+        """Should replace handlers left on the logger by an earlier setup."""
         # Arrange
-        # First setup
-        logger1 = setup_logging("test_app", log_dir=temp_dir)
-        initial_handler_count = len(logger1.handlers)
+        stale_handler = logging.NullHandler()
+        logging.getLogger("test_app").addHandler(stale_handler)
 
-        # Act - Second setup with same name
-        logger2 = setup_logging("test_app", log_dir=temp_dir)
+        # Act
+        logger = setup_logging("test_app", log_dir=temp_dir)
 
         # Assert
-        assert logger1 is logger2  # Same logger instance
-        # Should not have accumulated handlers
-        assert len(logger2.handlers) == initial_handler_count
+        assert stale_handler not in logger.handlers
+        assert len(logger.handlers) == 2  # File and console handlers
 
     @patch("common.logging_setup.datetime")
     def test_should_use_timestamped_log_filename(self, mock_datetime, temp_dir):
@@ -233,3 +233,41 @@ class TestLoggingConfiguration:
 
         # Cleanup - restore original stdout
         sys.stdout = original_stdout
+
+
+class TestBackgroundHandler:
+    """Test file logging from a background thread."""
+
+    def test_should_write_queued_records_when_closed(self, temp_dir):
+        """Should hand every queued record to the wrapped handler before closing."""
+        # Arrange
+        log_file = os.path.join(temp_dir, "background.log")
+        handler = BackgroundHandler(logging.FileHandler(log_file, encoding="utf-8"))
+        logger = logging.getLogger("test_background_handler")
+        logger.addHandler(handler)
+
+        # Act
+        for index in range(100):
+            logger.warning(f"record {index}")
+        logger.removeHandler(handler)
+        handler.close()
+
+        # Assert
+        with open(log_file, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert lines == [f"record {index}" for index in range(100)]
+
+    def test_should_drop_exit_hook_when_closed(self, temp_dir):
+        """Should not keep a closed handler registered for interpreter exit."""
+        # Arrange
+        log_file = os.path.join(temp_dir, "background.log")
+
+        # Act
+        with patch("common.logging_setup.atexit") as mock_atexit:
+            handler = BackgroundHandler(logging.FileHandler(log_file, encoding="utf-8"))
+            handler.close()
+            handler.close()
+
+        # Assert
+        mock_atexit.register.assert_called_once_with(handler.close)
+        mock_atexit.unregister.assert_called_once_with(handler.close)
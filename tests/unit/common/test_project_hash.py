@@ -0,0 +1,71 @@
+"""Tests for project content hashing."""
+
+import os
+from unittest.mock import patch
+
+from common.project_hash import project_content_hash
+
+
+def write_file(root, relative_path, content):
+    """Write a file under root, creating parent directories."""
+    path = os.path.join(root, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+class TestProjectContentHash:
+    """Test hashing of project directory contents."""
+
+    def test_should_be_stable_for_unchanged_project(self, sample_project_structure):
+        """Should produce the same digest for the same tree."""
+        # Act
+        first = project_content_hash(str(sample_project_structure))
+        second = project_content_hash(str(sample_project_structure))
+
+        # Assert
+        assert first == second
+        assert len(first) == 64
+
+    def test_should_change_when_file_content_changes(self, temp_dir):
+        """Should produce a new digest after a file edit."""
+        # Arrange
+        write_file(temp_dir, "src/app.py", "print('a')")
+        before = project_content_hash(temp_dir)
+
+        # Act
+        write_file(temp_dir, "src/app.py", "print('b')")
+
+        # Assert
+        assert project_content_hash(temp_dir) != before
+
+    def test_should_change_when_file_is_renamed(self, temp_dir):
+        """Should include relative paths, not just contents."""
+        # Arrange
+        write_file(temp_dir, "a.py", "same")
+        before = project_content_hash(temp_dir)
+
+        # Act
+        os.rename(os.path.join(temp_dir, "a.py"), os.path.join(temp_dir, "b.py"))
+
+        # Assert
+        assert project_content_hash(temp_dir) != before
+
+    def test_should_ignore_gitignored_and_git_files(self, temp_dir):
+        """Should not be affected by ignored files or the .git directory."""
+        # Arrange
+        write_file(temp_dir, "app.py", "code")
+        write_file(temp_dir, ".gitignore", "*.log")
+        ignore_logs = lambda path: path.endswith(".log")
+        with patch(
+            "common.project_hash.gitignore_parser.parse_gitignore", return_value=ignore_logs
+        ):
+            before = project_content_hash(temp_dir)
+
+            # Act
+            write_file(temp_dir, "debug.log", "noise")
+            write_file(temp_dir, ".git/HEAD", "ref: refs/heads/main")
+            after = project_content_hash(temp_dir)
+
+        # Assert
+        assert after == before
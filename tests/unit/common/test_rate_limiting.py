@@ -2,11 +2,22 @@
 
 import asyncio
 import time
+from email.utils import formatdate
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
-from common.rate_limiting import RateLimiter, _extract_retry_delay, create_rate_limit_callbacks
+from common.rate_limiting import (
+    MAX_RETRY_BACKOFF,
+    MAX_RETRY_JITTER,
+    RateLimiter,
+    _backoff_retry_delay,
+    _extract_retry_delay,
+    _jittered_retry_delay,
+    _retry_after_delay,
+    create_rate_limit_callbacks,
+)
 
 
 class TestRateLimiterInitialization:
@@ -115,6 +126,37 @@ class TestRateLimiterWaitLogic:
         assert end_time - start_time < 0.1  # Should be immediate since old calls expired
         assert len(limiter.call_history) == 1  # Old calls should be cleaned up
 
+    @pytest.mark.asyncio
+    async def test_should_evict_call_exactly_one_window_old(self, mock_logger):
+        """Should treat a call exactly window_seconds old as outside the window."""
+        # Arrange
+        limiter = RateLimiter(max_calls=1, window_seconds=10, logger_instance=mock_logger)
+        limiter.call_history.append(100.0)
+
+        # Act
+        with patch("common.rate_limiting.time.monotonic", return_value=110.0):
+            await limiter.wait_if_needed()
+
+        # Assert
+        assert list(limiter.call_history) == [110.0]
+
+    @pytest.mark.asyncio
+    async def test_should_release_lock_while_waiting_for_slot(self, mock_logger):
+        """Should reserve a slot under the lock and sleep without holding it."""
+        # Arrange
+        limiter = RateLimiter(max_calls=1, window_seconds=0.3, logger_instance=mock_logger)
+        await limiter.wait_if_needed()
+
+        # Act
+        waiting_call = asyncio.create_task(limiter.wait_if_needed())
+        await asyncio.sleep(0.05)
+        lock_held_while_waiting = limiter.lock.locked()
+        await waiting_call
+
+        # Assert
+        assert lock_held_while_waiting is False
+        assert len(limiter.call_history) == 2
+
 
 class TestRateLimiterDelayUpdate:
     """Test RateLimiter delay update functionality."""
@@ -124,7 +166,7 @@ class TestRateLimiterDelayUpdate:
         # Arrange
         limiter = RateLimiter(logger_instance=mock_logger)
         delay_seconds = 10.0
-        current_time = time.time()
+        current_time = time.monotonic()
 
         # Act
         limiter.update_next_allowed_call_time(delay_seconds)
@@ -148,6 +190,84 @@ class TestRateLimiterDelayUpdate:
         assert limiter._next_allowed_call_time == first_delay_time  # Should keep longer delay
 
 
+class TestRetryDelayParsing:
+    """Test retry delay extraction and jitter for 429 errors."""
+
+    @pytest.mark.parametrize(
+        "error_content,expected_delay",
+        [
+            ('{"retryDelay":"12s"}', 12.0),
+            ("{'retryDelay': '7s'}", 7.0),
+            ("retryDelay: 3.5", 3.5),
+            ("Retry-After: 9", 9.0),
+            ("429 without any delay hint", 5.0),
+        ],
+    )
+    def test_should_extract_retry_delay_from_error_content(self, error_content, expected_delay):
+        """Should extract the API-specified delay, falling back to the default."""
+        # Act
+        delay = _extract_retry_delay(error_content)
+
+        # Assert
+        assert delay == expected_delay
+
+    def test_should_read_retry_after_seconds_from_response_headers(self):
+        """Should prefer the Retry-After header of the response behind an API error."""
+        # Arrange
+        error = SimpleNamespace(response=SimpleNamespace(headers={"retry-after": "12"}))
+
+        # Act & Assert
+        assert _retry_after_delay(error) == 12.0
+        assert _retry_after_delay(Exception("retryDelay: 3")) is None
+
+    @pytest.mark.parametrize("usegmt", [True, False])  # "GMT" and "-0000" zone spellings
+    def test_should_read_retry_after_http_date(self, usegmt):
+        """Should turn an HTTP-date Retry-After into the seconds left until that time."""
+        # Arrange
+        retry_at = formatdate(time.time() + 30, usegmt=usegmt)
+        error = SimpleNamespace(response=SimpleNamespace(headers={"retry-after": retry_at}))
+
+        # Act
+        delay = _retry_after_delay(error)
+
+        # Assert
+        assert 25.0 <= delay <= 30.0
+
+    @pytest.mark.parametrize("retry_delay", [0.5, 5.0, 30.0])
+    def test_should_add_bounded_jitter_to_retry_delay(self, retry_delay):
+        """Should never retry earlier than requested and cap the added spread."""
+        # Act
+        delays = [_jittered_retry_delay(retry_delay) for _ in range(50)]
+
+        # Assert
+        max_delay = retry_delay + min(retry_delay, MAX_RETRY_JITTER)
+        assert all(retry_delay <= delay <= max_delay for delay in delays)
+
+    @patch("common.rate_limiting.random.uniform", side_effect=lambda low, high: high)
+    def test_should_back_off_exponentially_up_to_cap(self, _uniform):
+        """Should double the backoff window per consecutive 429 without exceeding the cap."""
+        # Act
+        delays = [_backoff_retry_delay(5.0, attempt) for attempt in range(1, 7)]
+
+        # Assert
+        assert delays == [7.0, 10.0, 20.0, 40.0, MAX_RETRY_BACKOFF, MAX_RETRY_BACKOFF]
+
+    def test_should_restart_backoff_after_successful_response(self, mock_logger):
+        """Should count consecutive 429s and reset the count on reset_backoff."""
+        # Arrange
+        limiter = RateLimiter(logger_instance=mock_logger)
+
+        # Act
+        limiter.back_off(1.0)
+        limiter.back_off(1.0)
+        count_after_limits = limiter.consecutive_rate_limits
+        limiter.reset_backoff()
+
+        # Assert
+        assert count_after_limits == 2
+        assert limiter.consecutive_rate_limits == 0
+
+
 class TestRateLimitCallbacks:
     """Test rate limit callback creation and functionality."""
 
@@ -252,6 +372,46 @@ class TestRateLimitCallbacks:
         # Assert
         assert result is None  # Should not handle non-429 errors
 
+    @pytest.mark.asyncio
+    async def test_after_callback_should_skip_errors_with_non_429_status_code(self, mock_logger):
+        """After-model callback should trust an API error's status code over its text."""
+        # Arrange
+        _, after_callback = create_rate_limit_callbacks(
+            rate_limiter_instance=RateLimiter(logger_instance=mock_logger),
+            logger_instance=mock_logger,
+        )
+
+        class ServerError(Exception):
+            code = 500
+
+            def __str__(self):
+                raise AssertionError("error payload should not be stringified")
+
+        # Act
+        result = await after_callback(None, ServerError())
+
+        # Assert
+        assert result is None
+        mock_logger.warning.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_after_callback_should_not_stringify_missing_error(self, mock_logger):
+        """After-model callback should return early for responses without an error."""
+        # Arrange
+        _, after_callback = create_rate_limit_callbacks(
+            rate_limiter_instance=RateLimiter(logger_instance=mock_logger),
+            logger_instance=mock_logger,
+        )
+        success_response = Mock(error=None)
+        success_response._raw_response.text = "429 RESOURCE_EXHAUSTED"
+
+        # Act
+        result = await after_callback(None, success_response)
+
+        # Assert
+        assert result is None
+        mock_logger.warning.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_after_callback_should_handle_resource_exhausted_error(self, mock_logger):
         """After-model callback should handle RESOURCE_EXHAUSTED errors but may fail due to Google AI dependencies."""
@@ -299,7 +459,7 @@ class TestRateLimiterEdgeCases:
         limiter = RateLimiter(max_calls=60, window_seconds=60)
 
         # Mock time to avoid timing race conditions
-        with patch("time.time") as mock_time:
+        with patch("time.monotonic") as mock_time:
             current_time = 1234567890.0
             mock_time.return_value = current_time
 
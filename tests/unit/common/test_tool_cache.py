@@ -0,0 +1,125 @@
+"""Tests for read-only tool memoization."""
+
+import inspect
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+from google.adk.tools import FunctionTool
+
+from common.tool_cache import CachedFunctionTool, memoize_tool
+
+
+def make_tool(return_value):
+    """Create a memoized tool backed by a mock so calls can be counted."""
+    implementation = Mock(return_value=return_value)
+
+    def read_thing(path: str, tool_context=None):
+        """Read a thing."""
+        return implementation(path, tool_context=tool_context)
+
+    return memoize_tool(read_thing, max_entries=2), implementation
+
+
+class TestMemoizeTool:
+    """Test memoization of tool results."""
+
+    def test_should_reuse_result_for_identical_arguments(self):
+        """Should call the tool once for repeated identical arguments."""
+        # Arrange
+        tool, implementation = make_tool({"status": "success", "items": [1]})
+        context = SimpleNamespace(invocation_id="inv-1")
+
+        # Act
+        first = tool("a", tool_context=context)
+        second = tool("a", tool_context=context)
+
+        # Assert
+        assert first == second
+        implementation.assert_called_once()
+
+    def test_should_hand_out_copies(self):
+        """Should protect cached results from mutation by callers."""
+        # Arrange
+        tool, _ = make_tool({"status": "success", "items": [1]})
+        tool("a")["items"].append(2)
+
+        # Act
+        result = tool("a")
+
+        # Assert
+        assert result["items"] == [1]
+
+    @pytest.mark.parametrize(
+        "error_result", [{"status": "error", "message": "missing"}, {"error": "missing"}]
+    )
+    def test_should_not_cache_error_results(self, error_result):
+        """Should retry tools whose previous call returned an error."""
+        # Arrange
+        tool, implementation = make_tool(error_result)
+
+        # Act
+        tool("a")
+        tool("a")
+
+        # Assert
+        assert implementation.call_count == 2
+
+    def test_should_scope_results_to_invocation(self):
+        """Should call the tool again for a new invocation."""
+        # Arrange
+        tool, implementation = make_tool({"status": "success"})
+
+        # Act
+        tool("a", tool_context=SimpleNamespace(invocation_id="inv-1"))
+        tool("a", tool_context=SimpleNamespace(invocation_id="inv-2"))
+
+        # Assert
+        assert implementation.call_count == 2
+
+    def test_should_evict_least_recently_used_results(self):
+        """Should drop the oldest result once over capacity."""
+        # Arrange
+        tool, implementation = make_tool({"status": "success"})
+        tool("a")
+        tool("b")
+        tool("c")
+
+        # Act
+        tool("a")
+
+        # Assert
+        assert implementation.call_count == 4
+
+    def test_should_keep_tool_name_and_signature(self):
+        """Should look like the original function to ADK's FunctionTool."""
+        # Arrange
+        tool, _ = make_tool({})
+
+        # Act & Assert
+        assert tool.__name__ == "read_thing"
+        assert list(inspect.signature(tool).parameters) == ["path", "tool_context"]
+
+
+class TestCachedFunctionTool:
+    """Test one-time construction of tool declarations."""
+
+    def test_should_build_declaration_once(self):
+        """Should reuse the first declaration for every later model request."""
+
+        # Arrange
+        def read_thing(path: str):
+            """Read a thing."""
+            return path
+
+        build_declaration = Mock(return_value="declaration")
+        tool = CachedFunctionTool(func=read_thing)
+
+        # Act
+        with patch.object(FunctionTool, "_get_declaration", build_declaration, create=True):
+            first = tool._get_declaration()
+            second = tool._get_declaration()
+
+        # Assert
+        assert first == second == "declaration"
+        build_declaration.assert_called_once()
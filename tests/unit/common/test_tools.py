@@ -9,6 +9,7 @@ from unittest.mock import Mock, mock_open, patch
 import pytest
 
 from common.tools import (
+    STRUCTURED_STATE_TEXT_THRESHOLD,
     ClarifierGenerator,
     _handle_tool_error,
     _resolve_path,
@@ -20,6 +21,7 @@ from common.tools import (
     get_dependencies,
     get_project_structure,
     get_session_state,
+    get_structured_state,
     get_target_directory_from_state,
     list_directory_contents,
     read_file_content,
@@ -28,6 +30,7 @@ from common.tools import (
     search_codebase,
     search_tests_with_prompt,
     set_session_state,
+    set_structured_state,
     set_target_directory,
 )
 
@@ -325,6 +328,42 @@ class TestSessionStateManagement:
         # Assert
         assert result == expected_result
 
+    @pytest.mark.parametrize(
+        "stored_value,expected_result",
+        [
+            ({"score": 1}, '{"score": 1}'),
+            ('{"score": 1}', '{"score": 1}'),  # JSON text is not encoded twice
+            ("plain", '"plain"'),
+        ],
+    )
+    def test_should_get_structured_state_as_json(self, stored_value, expected_result):
+        """Should return state as JSON text without double-encoding JSON strings."""
+        # Arrange
+        mock_context = Mock()
+        mock_context.state = {"key": stored_value}
+
+        # Act
+        result = get_structured_state("key", tool_context=mock_context)
+
+        # Assert
+        assert result == expected_result
+
+    def test_should_keep_large_structured_state_as_json_text(self):
+        """Should store large payloads as their JSON text and small ones as parsed objects."""
+        # Arrange
+        mock_context = Mock()
+        mock_context.state = {}
+        large_json = json.dumps({"tests": ["x" * STRUCTURED_STATE_TEXT_THRESHOLD]})
+
+        # Act
+        set_structured_state("small", '{"score": 1}', mock_context)
+        set_structured_state("large", large_json, mock_context)
+
+        # Assert
+        assert mock_context.state["small"] == {"score": 1}
+        assert mock_context.state["large"] == large_json
+        assert get_structured_state("large", tool_context=mock_context) == large_json
+
     def test_should_get_target_directory_from_state(self):
         """Should get target directory from session state or return default."""
         # Arrange - Test with target directory set
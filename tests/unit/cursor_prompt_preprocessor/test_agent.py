@@ -146,7 +146,8 @@ class TestClarifierGeneratorIntegration:
         assert clarifier_generator_callable.__name__ == "clarify_questions_tool"
 
     @patch("cursor_prompt_preprocessor.agent.ClarifierGenerator")
-    def test_given_clarifier_generator_when_calling_tool_then_it_instantiates_generator_and_returns_response(
+    @pytest.mark.asyncio
+    async def test_given_clarifier_generator_when_calling_tool_then_it_instantiates_generator_and_returns_response(
         self, mock_clarifier_class
     ):
         """Given clarifier generator, when calling tool, then it instantiates ClarifierGenerator, calls it, and returns the response."""
@@ -158,7 +159,7 @@ class TestClarifierGeneratorIntegration:
         mock_clarifier_class.return_value = mock_instance
 
         # Act
-        result = clarifier_generator_callable()
+        result = await clarifier_generator_callable()
 
         # Assert
         mock_clarifier_class.assert_called_once()
@@ -6,7 +6,11 @@ decision process requiring 'potato' to be included in user responses.
 
 # type: ignore
 
+import json
+import os
+import threading
 import unittest.mock as mock
+from importlib import import_module
 from unittest.mock import MagicMock, Mock
 
 import pytest
@@ -20,17 +24,29 @@ except ImportError:
 
 from potato_decison_with_human_in_the_loop.agent import (
     GEMINI_MODEL,
+    INITIAL_INSTRUCTION,
+    MAX_CLARIFICATION_ATTEMPTS,
     STATE_CLARIFICATION,
+    STATE_CLARIFICATION_ABORTED,
+    STATE_CLARIFICATION_ATTEMPTS,
+    STATE_DEFER_FINAL_SUMMARY,
     STATE_FINAL_SUMMARY,
     STATE_NEEDS_CLARIFICATION,
     STATE_TEST_VARIABLE,
     STATE_USER_PROMPT,
     check_for_potato,
+    clarify_questions_tool_async,
     clarify_questions_tool_func,
+    collect_final_summaries,
     create_rate_limited_agent,
+    defer_final_summary,
+    get_initial_agent,
+    get_root_agent,
     get_state_tool,
+    queue_final_summary,
     redirect_and_exit,
     set_state_tool,
+    submit_final_summary_batch,
 )
 
 
@@ -260,6 +276,92 @@ class TestClarifyQuestionsTool:
         assert result == {"reply": ""}
 
 
+class TestClarificationAbort:
+    """Test that the loop stops once the human won't include 'potato'."""
+
+    @mock.patch("builtins.input", return_value="carrots")
+    def test_counts_clarification_attempts(self, mock_input):
+        """Test each answered prompt increments the session's attempt counter."""
+        # Arrange
+        mock_context = MockToolContext()
+
+        # Act
+        clarify_questions_tool_func(mock_context)
+        clarify_questions_tool_func(mock_context)
+
+        # Assert
+        assert mock_context.state[STATE_CLARIFICATION_ATTEMPTS] == 2
+
+    @mock.patch("builtins.input")
+    def test_aborts_without_prompting_after_max_attempts(self, mock_input):
+        """Test no more console prompts once the attempt limit is reached."""
+        # Arrange
+        mock_context = MockToolContext()
+        mock_context.state[STATE_CLARIFICATION_ATTEMPTS] = MAX_CLARIFICATION_ATTEMPTS
+
+        # Act
+        result = clarify_questions_tool_func(mock_context)
+
+        # Assert
+        assert result == {"reply": "", "abort": True}
+        assert mock_context.state[STATE_CLARIFICATION_ABORTED] is True
+        mock_input.assert_not_called()
+
+    def test_check_for_potato_escalates_when_aborted(self):
+        """Test an aborted clarification ends the loop via escalation."""
+        # Arrange
+        mock_context = MockToolContext()
+        mock_context.state[STATE_USER_PROMPT] = "I like vegetables"
+        mock_context.state[STATE_CLARIFICATION_ABORTED] = True
+
+        # Act
+        result = check_for_potato(mock_context)
+
+        # Assert
+        assert result["aborted"] is True
+        assert mock_context.actions.escalate is True
+
+    def test_check_for_potato_ignores_abort_when_potato_found(self):
+        """Test a found 'potato' wins over an earlier abort flag."""
+        # Arrange
+        mock_context = MockToolContext()
+        mock_context.state[STATE_USER_PROMPT] = "potato"
+        mock_context.state[STATE_CLARIFICATION_ABORTED] = True
+
+        # Act
+        result = check_for_potato(mock_context)
+
+        # Assert
+        assert result == {"has_potato": True, "needs_clarification": False}
+
+
+class TestClarifyQuestionsToolAsync:
+    """Test the non-blocking clarify_questions_tool_async wrapper."""
+
+    @pytest.mark.asyncio
+    async def test_reads_input_on_shared_executor(self):
+        """Test console input runs on the shared pool, not the event loop thread."""
+        # Arrange
+        input_threads = []
+
+        def fake_input(prompt):
+            input_threads.append(threading.current_thread().name)
+            return "potato please"
+
+        # Act
+        with mock.patch("builtins.input", side_effect=fake_input):
+            result = await clarify_questions_tool_async()
+
+        # Assert
+        assert result == {"reply": "potato please"}
+        assert input_threads[0].startswith("potato")
+
+    def test_registers_under_clarify_tool_name(self):
+        """Test the async wrapper keeps the ADK tool name."""
+        # Act & Assert
+        assert clarify_questions_tool_async.__name__ == "clarify_questions_tool"
+
+
 class TestRedirectAndExit:
     """Test the redirect_and_exit function."""
 
@@ -319,3 +421,193 @@ class TestCreateRateLimitedAgent:
         call_args = mock_llm_agent.call_args.kwargs
         assert call_args["tools"] == tools
         assert call_args["sub_agents"] == sub_agents
+
+
+class TestLazyAgentConstruction:
+    """Test that agents are built lazily and only once."""
+
+    def test_factory_returns_same_agent_instance(self):
+        """Test repeated factory calls reuse the constructed agent."""
+        # Act & Assert
+        assert get_root_agent() is get_root_agent()
+
+    def test_module_attribute_resolves_to_factory_agent(self):
+        """Test `agent.root_agent` still works for ADK agent discovery."""
+        # Arrange
+        agent_module = import_module("potato_decison_with_human_in_the_loop.agent")
+
+        # Act & Assert
+        assert agent_module.root_agent is get_root_agent()
+        assert agent_module.finalizer_agent in get_root_agent().sub_agents
+
+    def test_unknown_module_attribute_raises(self):
+        """Test unknown attributes still raise AttributeError."""
+        # Arrange
+        agent_module = import_module("potato_decison_with_human_in_the_loop.agent")
+
+        # Act & Assert
+        with pytest.raises(AttributeError):
+            agent_module.not_an_agent
+
+    def test_agent_uses_interned_instruction_constant(self):
+        """Test agents share the interned module-level instruction string."""
+        # Act
+        instruction = get_initial_agent().instruction
+
+        # Assert
+        assert instruction is INITIAL_INSTRUCTION
+        assert STATE_USER_PROMPT in instruction
+
+
+class TestBatchFinalSummaries:
+    """Test deferred final summaries through the Gemini Batch API."""
+
+    def test_queues_session_state_as_jsonl_request(self, temp_dir):
+        """Test queueing appends one keyed batch request per session."""
+        # Arrange
+        batch_file = os.path.join(temp_dir, "batch.jsonl")
+        state = {STATE_USER_PROMPT: "hello", STATE_CLARIFICATION: "potato"}
+
+        # Act
+        queue_final_summary("session-1", state, batch_file)
+        result = queue_final_summary("session-2", state, batch_file)
+
+        # Assert
+        with open(batch_file, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        assert result["status"] == "queued"
+        assert [line["key"] for line in lines] == ["session-1", "session-2"]
+        prompt = lines[0]["request"]["contents"][0]["parts"][0]["text"]
+        assert "hello" in prompt and "potato" in prompt
+
+    def test_skips_submission_when_nothing_queued(self, temp_dir):
+        """Test no batch job is created for an empty queue."""
+        # Arrange
+        client = Mock()
+
+        # Act
+        result = submit_final_summary_batch(client, os.path.join(temp_dir, "missing.jsonl"))
+
+        # Assert
+        assert result is None
+        client.batches.create.assert_not_called()
+
+    def test_submits_queued_requests_and_clears_queue(self, temp_dir):
+        """Test queued requests are uploaded and submitted as one batch job."""
+        # Arrange
+        batch_file = os.path.join(temp_dir, "batch.jsonl")
+        queue_final_summary("session-1", {STATE_USER_PROMPT: "potato"}, batch_file)
+        client = Mock()
+
+        # Act
+        result = submit_final_summary_batch(client, batch_file)
+
+        # Assert
+        client.files.upload.assert_called_once()
+        assert client.files.upload.call_args.kwargs["file"] == f"{batch_file}.pending"
+        client.batches.create.assert_called_once()
+        assert result is client.batches.create.return_value
+        assert not os.path.exists(batch_file)
+        assert not os.path.exists(f"{batch_file}.pending")
+
+    def test_keeps_sessions_queued_during_upload(self, temp_dir):
+        """Test sessions queued while the batch uploads stay queued for the next batch."""
+        # Arrange
+        batch_file = os.path.join(temp_dir, "batch.jsonl")
+        queue_final_summary("session-1", {STATE_USER_PROMPT: "potato"}, batch_file)
+        client = Mock()
+
+        def upload_while_another_session_finishes(**kwargs):
+            queue_final_summary("session-2", {STATE_USER_PROMPT: "potato"}, batch_file)
+            return Mock()
+
+        client.files.upload.side_effect = upload_while_another_session_finishes
+
+        # Act
+        submit_final_summary_batch(client, batch_file)
+
+        # Assert
+        with open(batch_file, encoding="utf-8") as f:
+            assert [json.loads(line)["key"] for line in f] == ["session-2"]
+
+    def test_retries_pending_batch_left_by_failed_submission(self, temp_dir):
+        """Test a failed submission keeps its sessions and submits them on the next call."""
+        # Arrange
+        batch_file = os.path.join(temp_dir, "batch.jsonl")
+        queue_final_summary("session-1", {STATE_USER_PROMPT: "potato"}, batch_file)
+        client = Mock()
+        client.batches.create.side_effect = [RuntimeError("quota"), Mock()]
+        with pytest.raises(RuntimeError):
+            submit_final_summary_batch(client, batch_file)
+        queue_final_summary("session-2", {STATE_USER_PROMPT: "potato"}, batch_file)
+
+        # Act
+        submit_final_summary_batch(client, batch_file)
+
+        # Assert
+        assert client.files.upload.call_count == 2
+        assert not os.path.exists(f"{batch_file}.pending")
+        with open(batch_file, encoding="utf-8") as f:
+            assert [json.loads(line)["key"] for line in f] == ["session-2"]
+
+    def test_defers_final_summary_when_requested(self):
+        """Test the finalizer queues the summary and skips the model when deferral is set."""
+        # Arrange
+        callback_context = Mock()
+        callback_context.state = {STATE_DEFER_FINAL_SUMMARY: True, STATE_USER_PROMPT: "potato"}
+        callback_context._invocation_context.session.id = "session-1"
+
+        # Act
+        with mock.patch(
+            "potato_decison_with_human_in_the_loop.agent.queue_final_summary"
+        ) as mock_queue:
+            result = defer_final_summary(callback_context)
+
+        # Assert
+        mock_queue.assert_called_once_with("session-1", callback_context.state)
+        assert result is not None
+
+    def test_runs_finalizer_model_by_default(self):
+        """Test the finalizer keeps the synchronous summary unless deferral is requested."""
+        # Arrange
+        callback_context = Mock()
+        callback_context.state = {STATE_USER_PROMPT: "potato"}
+
+        # Act
+        with mock.patch(
+            "potato_decison_with_human_in_the_loop.agent.queue_final_summary"
+        ) as mock_queue:
+            result = defer_final_summary(callback_context)
+
+        # Assert
+        assert result is None
+        mock_queue.assert_not_called()
+
+    def test_collects_summaries_keyed_by_session(self):
+        """Test summaries of a finished job are mapped back to their sessions."""
+        # Arrange
+        client = Mock()
+        client.batches.get.return_value.state.name = "JOB_STATE_SUCCEEDED"
+        response = {"candidates": [{"content": {"parts": [{"text": "All done"}]}}]}
+        client.files.download.return_value = json.dumps(
+            {"key": "session-1", "response": response}
+        ).encode("utf-8")
+
+        # Act
+        summaries = collect_final_summaries(client, "batches/123")
+
+        # Assert
+        assert summaries == {"session-1": "All done"}
+
+    def test_returns_nothing_while_job_is_running(self):
+        """Test no summaries are returned before the job succeeds."""
+        # Arrange
+        client = Mock()
+        client.batches.get.return_value.state.name = "JOB_STATE_RUNNING"
+
+        # Act
+        summaries = collect_final_summaries(client, "batches/123")
+
+        # Assert
+        assert summaries == {}
+        client.files.download.assert_not_called()
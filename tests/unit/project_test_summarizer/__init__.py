@@ -0,0 +1 @@
+"""Tests for project_test_summarizer module."""
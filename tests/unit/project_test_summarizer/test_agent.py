@@ -0,0 +1,191 @@
+"""Tests for the project_test_summarizer.agent analysis callbacks."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from project_test_summarizer.agent import (
+    ANALYSIS_WORKER_INDEX,
+    analysis_chunk_key,
+    distribute_extracted_tests,
+    finalize_test_analysis,
+    skip_empty_chunk,
+)
+from project_test_summarizer.config import (
+    ANALYSIS_WORKERS,
+    STATE_EXTRACTED_TESTS,
+    STATE_FRAMEWORK_NOTES,
+    STATE_TEST_ANALYSIS,
+    STATE_TEST_ANALYSIS_COMPACT,
+    STATE_TEST_REPORTS,
+)
+from project_test_summarizer.tools import analysis_progress_key
+
+WORKER_NAMES = list(ANALYSIS_WORKER_INDEX)
+
+
+def make_context(state, agent_name="TestAnalysisPhase"):
+    """Create a minimal callback context over a plain state dict."""
+    return SimpleNamespace(state=state, agent_name=agent_name)
+
+
+def extracted_tests(count):
+    """Extraction output in the shape the extraction agent stores it."""
+    return json.dumps({"extracted_tests": [{"test_name": f"test_{i}"} for i in range(count)]})
+
+
+def assigned_names(state):
+    """Test names assigned to each worker, empty for workers with no chunk."""
+    return [
+        [test["test_name"] for test in json.loads(state[analysis_chunk_key(index)] or "[]")]
+        for index in range(ANALYSIS_WORKERS)
+    ]
+
+
+class TestDistributeExtractedTests:
+    """Test handing out the extracted tests to the analysis workers."""
+
+    def test_should_assign_one_chunk_per_worker_and_blank_the_rest(self):
+        """Should give each test to one worker and leave extra workers without a chunk."""
+        # Arrange
+        state = {
+            STATE_TEST_REPORTS: json.dumps({"framework_detected": "pytest"}),
+            STATE_EXTRACTED_TESTS: extracted_tests(3),
+        }
+
+        # Act
+        result = distribute_extracted_tests(make_context(state))
+
+        # Assert
+        assert result is None
+        assert assigned_names(state) == [["test_0"], ["test_1"], ["test_2"]] + [[]] * (
+            ANALYSIS_WORKERS - 3
+        )
+        assert state[STATE_FRAMEWORK_NOTES]
+
+    def test_should_blank_every_chunk_when_nothing_was_extracted(self):
+        """Should leave every worker without tests when extraction found none."""
+        # Arrange
+        state = {STATE_EXTRACTED_TESTS: extracted_tests(0)}
+
+        # Act
+        distribute_extracted_tests(make_context(state))
+
+        # Assert
+        assert all(state[analysis_chunk_key(index)] == "" for index in range(ANALYSIS_WORKERS))
+
+    def test_should_skip_tests_recorded_by_an_interrupted_run(self):
+        """Should not hand out tests a worker already recorded."""
+        # Arrange
+        state = {
+            STATE_EXTRACTED_TESTS: extracted_tests(2),
+            analysis_progress_key(WORKER_NAMES[3]): [{"test_name": "test_0"}],
+        }
+
+        # Act
+        distribute_extracted_tests(make_context(state))
+
+        # Assert
+        assert assigned_names(state)[0] == ["test_1"]
+        assert sum(assigned_names(state), []) == ["test_1"]
+
+    def test_should_give_unreadable_output_to_first_worker(self):
+        """Should pass extraction output it can't split to the first worker unchanged."""
+        # Arrange
+        state = {STATE_EXTRACTED_TESTS: "test_a, test_b"}
+
+        # Act
+        distribute_extracted_tests(make_context(state))
+
+        # Assert
+        assert json.loads(state[analysis_chunk_key(0)]) == "test_a, test_b"
+        assert state[analysis_chunk_key(1)] == ""
+
+
+class TestSkipEmptyChunk:
+    """Test skipping analysis workers that have no tests assigned."""
+
+    @pytest.mark.parametrize("chunk", ["", None])
+    def test_should_skip_worker_without_chunk(self, chunk):
+        """Should answer for a worker with an empty chunk so its model is never called."""
+        # Arrange
+        state = {analysis_chunk_key(1): chunk} if chunk is not None else {}
+
+        # Act
+        result = skip_empty_chunk(make_context(state, agent_name=WORKER_NAMES[1]))
+
+        # Assert
+        assert result is not None
+
+    def test_should_run_worker_with_chunk(self):
+        """Should let a worker with assigned tests run."""
+        # Arrange
+        state = {analysis_chunk_key(1): json.dumps([{"test_name": "test_0"}])}
+
+        # Act
+        result = skip_empty_chunk(make_context(state, agent_name=WORKER_NAMES[1]))
+
+        # Assert
+        assert result is None
+
+
+class TestFinalizeTestAnalysis:
+    """Test merging the workers' recorded tests once the analysis phase ends."""
+
+    def test_should_merge_recorded_tests_in_chunk_order(self):
+        """Should concatenate every worker's tests in chunk order and reset their progress."""
+        # Arrange
+        state = {
+            analysis_progress_key(WORKER_NAMES[2]): [{"test_name": "test_2"}],
+            analysis_progress_key(WORKER_NAMES[0]): [
+                {"test_name": "test_0"},
+                {"test_name": "test_1"},
+            ],
+        }
+
+        # Act
+        result = finalize_test_analysis(make_context(state))
+
+        # Assert
+        assert result is None
+        analysis = state[STATE_TEST_ANALYSIS]
+        assert [test["test_name"] for test in analysis["analyzed_tests"]] == [
+            "test_0",
+            "test_1",
+            "test_2",
+        ]
+        assert analysis["analysis_summary"]["total_tests_analyzed"] == 3
+        assert state[analysis_progress_key(WORKER_NAMES[0])] == []
+        assert state[analysis_progress_key(WORKER_NAMES[2])] == []
+        compact = json.loads(state[STATE_TEST_ANALYSIS_COMPACT])
+        assert compact["analysis_summary"] == analysis["analysis_summary"]
+
+    def test_should_store_large_analysis_as_json_text(self):
+        """Should store an analysis over the structured state threshold as JSON text."""
+        # Arrange
+        state = {analysis_progress_key(WORKER_NAMES[0]): [{"test_name": "test_0"}]}
+
+        # Act
+        with patch("project_test_summarizer.agent.STRUCTURED_STATE_TEXT_THRESHOLD", 0):
+            finalize_test_analysis(make_context(state))
+
+        # Assert
+        analysis = json.loads(state[STATE_TEST_ANALYSIS])
+        assert [test["test_name"] for test in analysis["analyzed_tests"]] == ["test_0"]
+
+    def test_should_compact_existing_analysis_when_nothing_was_recorded(self):
+        """Should keep an analysis stored directly in state and still condense it."""
+        # Arrange
+        analysis = {"analyzed_tests": [], "analysis_summary": {"total_tests_analyzed": 0}}
+        state = {STATE_TEST_ANALYSIS: analysis}
+
+        # Act
+        finalize_test_analysis(make_context(state))
+
+        # Assert
+        assert state[STATE_TEST_ANALYSIS] is analysis
+        assert json.loads(state[STATE_TEST_ANALYSIS_COMPACT])["analysis_summary"] == {
+            "total_tests_analyzed": 0
+        }
@@ -0,0 +1,545 @@
+"""Tests for project_test_summarizer.tools file discovery and report parsing."""
+
+import glob
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from project_test_summarizer.config import (
+    STATE_PROJECT_HASH,
+    TEST_FILE_PATTERNS,
+    TEST_REPORT_PATTERNS,
+)
+from project_test_summarizer.tools import (
+    _TEXT_TEST_PATTERN,
+    _bytes_pattern,
+    _cached_report_path,
+    _find_matching_files,
+    _parse_junit_xml,
+    analysis_progress_key,
+    analyze_multiple_test_reports,
+    analyze_test_report_content,
+    assemble_test_analysis,
+    canonicalize_and_dedupe_tests,
+    compact_test_analysis,
+    discover_test_files,
+    hash_target_project,
+    record_test_analysis,
+    split_extracted_tests,
+)
+
+# Files covering every discovery pattern, plus hidden files and directories that glob skips
+DISCOVERY_TREE = [
+    "app.py",
+    "test_root.py",
+    "testing.py",
+    "docs/readme.md",
+    "pkg/module_test.py",
+    "pkg/.test_hidden.py",
+    "src/main.py",
+    "src/test/java/com/AppTest.java",
+    "src/test/java/com/AppTests.java",
+    "src/test/java/com/TestHelper.java",
+    "src/test/kotlin/AppSpec.kt",
+    "tests/test_models.py",
+    "tests/unit/conftest.py",
+    "tests/unit/.hidden_helper.py",
+    "tests/.hidden/test_secret.py",
+    "web/app.test.js",
+    "web/app.spec.ts",
+    "web/.eslintrc.test.js",
+    "test-results/junit/TEST-suite.xml",
+    "test-results/report.json",
+    "test-results/index.html",
+    "target/surefire-reports/TEST-App.xml",
+    "target/failsafe-reports/TEST-AppIT.xml",
+    "build/test-results/test/TEST-Gradle.xml",
+    "build/reports/tests/test/index.html",
+    "pytest-report.xml",
+    "sub/pytest-report.html",
+    "sub/coverage.xml",
+    "junit.xml",
+    "test_results.xml",
+    "test-report.json",
+    ".pytest_cache/README.md",
+    ".pytest_cache/.gitignore",
+    ".pytest_cache/v/cache/nodeids",
+    ".pytest_cache/v/test_cached.py",
+]
+
+
+def write_file(root, relative_path, content=""):
+    """Write a file under root, creating parent directories."""
+    path = os.path.join(root, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def glob_matches(root, patterns):
+    """Relative paths of the files glob.glob finds for any of the patterns."""
+    return {
+        os.path.relpath(path, root).replace(os.sep, "/")
+        for pattern in patterns
+        for path in glob.glob(os.path.join(glob.escape(root), pattern), recursive=True)
+        if os.path.isfile(path)
+    }
+
+
+def discovered_paths(root, patterns):
+    """Relative paths _find_matching_files reports for the patterns."""
+    matches = _find_matching_files(root, patterns)
+    return {relative.replace(os.sep, "/") for _, relative, _, _ in matches}
+
+
+class TestFindMatchingFiles:
+    """Test the single-walk replacement for recursive glob."""
+
+    @pytest.mark.parametrize(
+        "patterns", [TEST_FILE_PATTERNS, TEST_REPORT_PATTERNS], ids=["test_files", "reports"]
+    )
+    def test_should_find_same_files_as_glob(self, temp_dir, patterns):
+        """Should match exactly the files recursive glob matches for the real patterns."""
+        # Arrange
+        for relative_path in DISCOVERY_TREE:
+            write_file(temp_dir, relative_path)
+
+        # Act
+        found = discovered_paths(temp_dir, patterns)
+
+        # Assert
+        assert found == glob_matches(temp_dir, patterns)
+        assert found  # The tree must exercise the patterns
+
+    def test_should_report_first_matching_pattern_and_size(self, temp_dir):
+        """Should attribute each file to its first matching pattern and keep its size."""
+        # Arrange
+        write_file(temp_dir, "tests/test_models.py", "def test_a(): pass\n")
+
+        # Act
+        matches = _find_matching_files(temp_dir, TEST_FILE_PATTERNS)
+
+        # Assert
+        assert matches == [
+            (
+                os.path.join(temp_dir, "tests", "test_models.py"),
+                os.path.join("tests", "test_models.py"),
+                "**/test_*.py",
+                19,
+            )
+        ]
+
+    @pytest.mark.parametrize("skipped_dir", ["node_modules", "venv", "__pycache__"])
+    def test_should_skip_dependency_directories(self, temp_dir, skipped_dir):
+        """Should not search dependency and cache directories that glob would walk."""
+        # Arrange
+        write_file(temp_dir, f"{skipped_dir}/pkg/test_vendored.py")
+        write_file(temp_dir, "tests/test_own.py")
+
+        # Act
+        found = discovered_paths(temp_dir, TEST_FILE_PATTERNS)
+
+        # Assert
+        assert found == {"tests/test_own.py"}
+
+    def test_should_not_follow_symlinked_directories(self, temp_dir):
+        """Should not descend into symlinked directories, unlike glob."""
+        # Arrange
+        write_file(temp_dir, "tests/test_own.py")
+        try:
+            os.symlink(os.path.join(temp_dir, "tests"), os.path.join(temp_dir, "linked"))
+        except (OSError, NotImplementedError):
+            pytest.skip("Symlinks are not available on this platform")
+
+        # Act
+        found = discovered_paths(temp_dir, TEST_FILE_PATTERNS)
+
+        # Assert
+        assert found == {"tests/test_own.py"}
+
+
+class TestReportExtraction:
+    """Test test name extraction from text and HTML reports."""
+
+    @pytest.mark.parametrize(
+        "file_name,content,expected_names",
+        [
+            (
+                "results.txt",
+                "PASSED test_café_login\nFAILED test_加算\n",
+                ["café_login", "加算"],
+            ),
+            (
+                "index.html",
+                '<td class="test-name">Tést ünïcode</td><span data-test-name="проверка"></span>',
+                ["Tést ünïcode", "проверка"],
+            ),
+        ],
+    )
+    @pytest.mark.parametrize("mmap_min_bytes", [0, 1024 * 1024], ids=["mmap", "text"])
+    def test_should_extract_unicode_names_whatever_the_report_size(
+        self, temp_dir, file_name, content, expected_names, mmap_min_bytes
+    ):
+        """Should extract the same full names whether or not the report is memory-mapped."""
+        # Arrange
+        write_file(temp_dir, file_name, content)
+
+        # Act
+        with patch("project_test_summarizer.tools.REPORT_MMAP_MIN_BYTES", mmap_min_bytes):
+            result = analyze_test_report_content(os.path.join(temp_dir, file_name))
+
+        # Assert
+        assert [test["test_name"] for test in result["extracted_tests"]] == expected_names
+
+    def test_should_refuse_bytes_twin_of_unicode_class_pattern(self):
+        """Should not build a bytes pattern whose \\w would only match ASCII."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            _bytes_pattern(_TEXT_TEST_PATTERN)
+
+
+class TestParseJunitXml:
+    """Test streaming JUnit XML parsing."""
+
+    def test_should_read_nested_suites_and_test_statuses(self, temp_dir):
+        """Should count nested suites once and report passed, failed and errored tests."""
+        # Arrange
+        write_file(
+            temp_dir,
+            "junit.xml",
+            """<testsuites>
+              <testsuite name="outer" tests="3">
+                <testsuite name="inner" tests="2">
+                  <testcase classname="pkg.Calc" name="test_add" time="0.1"/>
+                  <testcase classname="pkg.Calc" name="test_sub">
+                    <failure message="expected 1"/>
+                  </testcase>
+                </testsuite>
+                <testcase name="test_io"><error message="disk full"/></testcase>
+              </testsuite>
+            </testsuites>""",
+        )
+
+        # Act
+        tests, test_suites, total_tests = _parse_junit_xml(os.path.join(temp_dir, "junit.xml"))
+
+        # Assert
+        assert [(t["full_name"], t["status"], t["failure_message"]) for t in tests] == [
+            ("pkg.Calc.test_add", "passed", ""),
+            ("pkg.Calc.test_sub", "failed", "expected 1"),
+            ("test_io", "error", "disk full"),
+        ]
+        assert tests[0]["execution_time"] == "0.1"
+        assert (test_suites, total_tests) == (2, 3)
+
+    def test_should_count_single_root_suite(self, temp_dir):
+        """Should count a report whose root element is the test suite."""
+        # Arrange
+        write_file(
+            temp_dir,
+            "TEST-Calc.xml",
+            '<testsuite name="Calc" tests="1"><testcase name="test_add"/></testsuite>',
+        )
+
+        # Act
+        tests, test_suites, total_tests = _parse_junit_xml(os.path.join(temp_dir, "TEST-Calc.xml"))
+
+        # Assert
+        assert len(tests) == 1
+        assert (test_suites, total_tests) == (1, 1)
+
+
+class TestCanonicalizeAndDedupeTests:
+    """Test collapsing of tests re-reported across sources."""
+
+    def test_should_collapse_parameterized_tests_across_sources(self):
+        """Should merge parameterizations and reruns of a test, keeping every source."""
+        # Arrange
+        tests = [
+            {"test_name": "test_add[1-2]", "class_name": "Calc", "source_report": "shard1.xml"},
+            {"test_name": "test_add[3-4]", "class_name": "calc", "source_report": "shard2.xml"},
+            {"test_name": "TEST_ADD", "class_name": "Calc", "source_report": "shard1.xml"},
+            {"test_name": "test_add", "class_name": "Other", "source_report": "shard2.xml"},
+        ]
+
+        # Act
+        unique_tests = canonicalize_and_dedupe_tests(tests)
+
+        # Assert
+        assert [(t["test_name"], t["class_name"]) for t in unique_tests] == [
+            ("test_add[1-2]", "Calc"),
+            ("test_add", "Other"),
+        ]
+        assert unique_tests[0]["source_reports"] == ["shard1.xml", "shard2.xml"]
+        assert unique_tests[0]["occurrences"] == 3
+        assert "source_report" not in unique_tests[0]
+
+
+def extracted_tests(count):
+    """Extraction output in the shape the extraction agent stores it."""
+    return json.dumps({"extracted_tests": [{"test_name": f"test_{i}"} for i in range(count)]})
+
+
+def chunk_names(chunks):
+    """Test names per chunk."""
+    return [[test["test_name"] for test in chunk] for chunk in chunks]
+
+
+class TestAnalyzeMultipleTestReports:
+    """Test the aggregated output of batch report analysis."""
+
+    def test_should_collapse_parameterized_cases_across_reports(self, temp_dir):
+        """Should list every reported case but collapse parameterizations into one unique test."""
+        # Arrange
+        shard1 = os.path.join(temp_dir, "shard1", "junit.xml")
+        shard2 = os.path.join(temp_dir, "shard2", "junit.xml")
+        for path, params in [(shard1, ["1-2", "3-4"]), (shard2, ["5-6"])]:
+            cases = "".join(f'<testcase classname="Calc" name="test_add[{p}]"/>' for p in params)
+            write_file(temp_dir, os.path.relpath(path, temp_dir), f"<testsuite>{cases}</testsuite>")
+
+        # Act
+        result = analyze_multiple_test_reports([shard1, shard2])
+
+        # Assert
+        assert [test["source_report"] for test in result["extracted_tests"]] == [
+            shard1,
+            shard1,
+            shard2,
+        ]
+        assert len(result["unique_tests"]) == 1
+        unique_test = result["unique_tests"][0]
+        assert unique_test["source_reports"] == [shard1, shard2]
+        assert unique_test["occurrences"] == 3
+        assert "source_report" not in unique_test
+        assert result["processing_summary"]["total_tests_extracted"] == 3
+        assert result["processing_summary"]["unique_tests_found"] == 1
+
+
+class TestSplitExtractedTests:
+    """Test splitting extracted tests between parallel analysis workers."""
+
+    @pytest.mark.parametrize(
+        "count,expected_sizes",
+        [
+            (10, [2, 2, 2, 2, 2]),
+            (17, [3, 3, 3, 3, 3, 2]),
+            (3, [1, 1, 1]),  # Fewer tests than workers
+            (0, []),
+        ],
+    )
+    def test_should_split_into_contiguous_near_equal_chunks(self, count, expected_sizes):
+        """Should keep every test once, in order, in at most the requested number of chunks."""
+        # Act
+        chunks = split_extracted_tests(extracted_tests(count), 8)
+
+        # Assert
+        assert [len(chunk) for chunk in chunks] == expected_sizes
+        assert sum(chunk_names(chunks), []) == [f"test_{i}" for i in range(count)]
+
+    def test_should_leave_out_tests_already_analyzed(self):
+        """Should skip tests an interrupted run already recorded."""
+        # Act
+        chunks = split_extracted_tests(extracted_tests(4), 2, {"test_0", "test_2"})
+
+        # Assert
+        assert chunk_names(chunks) == [["test_1"], ["test_3"]]
+
+    @pytest.mark.parametrize("extracted", ["not json", '{"no_tests": true}', None])
+    def test_should_return_none_for_unreadable_output(self, extracted):
+        """Should signal unreadable extraction output instead of guessing."""
+        # Act & Assert
+        assert split_extracted_tests(extracted, 8) is None
+
+
+class TestAssembleTestAnalysis:
+    """Test merging the workers' recorded tests into the full analysis."""
+
+    def test_should_keep_every_test_in_order_and_count_summary(self):
+        """Should keep the tests in the given order and classify each one exactly once."""
+        # Arrange
+        analyzed_tests = [
+            {"test_name": "a", "meaningfulness_score": "low", "test_location": {"found": True}},
+            {"test_name": "b", "meaningfulness_score": "High", "issues_found": []},
+            {"test_name": "c", "meaningfulness_score": "high", "issues_found": ["vague name"]},
+            {"test_name": "d", "test_location": {"found": True}},
+        ]
+
+        # Act
+        analysis = assemble_test_analysis(analyzed_tests)
+
+        # Assert
+        assert analysis["analyzed_tests"] == analyzed_tests
+        assert analysis["analysis_summary"] == {
+            "total_tests_analyzed": 4,
+            "tests_found_in_code": 2,
+            "critical_issues": 1,
+            "moderate_issues": 2,
+            "good_tests": 1,
+        }
+
+
+class TestRecordTestAnalysis:
+    """Test recording each analyzed test as soon as it is finished."""
+
+    def test_should_append_to_the_calling_agents_own_key(self):
+        """Should keep each worker's tests under its own key, reassigning the list."""
+        # Arrange
+        recorded = [{"test_name": "test_0"}]
+        state = {analysis_progress_key("Worker0"): recorded}
+        tool_context = SimpleNamespace(state=state, agent_name="Worker0")
+
+        # Act
+        result = record_test_analysis({"test_name": "test_1"}, tool_context)
+        record_test_analysis(
+            {"test_name": "other"}, SimpleNamespace(state=state, agent_name="Worker1")
+        )
+
+        # Assert
+        assert result == {"status": "success", "tests_recorded": 2}
+        assert state[analysis_progress_key("Worker0")] == [
+            {"test_name": "test_0"},
+            {"test_name": "test_1"},
+        ]
+        assert recorded == [{"test_name": "test_0"}]  # A new list, so ADK sees the change
+        assert state[analysis_progress_key("Worker1")] == [{"test_name": "other"}]
+
+    def test_should_report_error_without_context(self):
+        """Should not record anything when no tool context is available."""
+        # Act
+        result = record_test_analysis({"test_name": "test_0"})
+
+        # Assert
+        assert result["status"] == "error"
+
+
+class TestCompactTestAnalysis:
+    """Test condensing the full analysis for the report agents."""
+
+    def test_should_bucket_by_score_and_keep_tests_with_issues(self):
+        """Should count tests per score with a few exemplars and list every test with issues."""
+        # Arrange
+        analyzed_tests = [
+            {"test_name": f"good_{i}", "meaningfulness_score": "High"} for i in range(4)
+        ] + [
+            {
+                "test_name": "vague",
+                "meaningfulness_score": "low",
+                "test_location": {"file_path": "tests/test_a.py"},
+                "issues_found": ["asserts nothing"],
+                "naming_suggestions": ["test_returns_total"],
+            },
+            {"test_name": "unscored", "consistency_issues": ["name mismatch"]},
+        ]
+        analysis = json.dumps(assemble_test_analysis(analyzed_tests))
+
+        # Act
+        compact = compact_test_analysis(analysis, exemplars_per_bucket=2)
+
+        # Assert
+        assert compact["analysis_summary"]["total_tests_analyzed"] == 6
+        buckets = compact["meaningfulness_buckets"]
+        assert {score: bucket["count"] for score, bucket in buckets.items()} == {
+            "high": 4,
+            "low": 1,
+            "unknown": 1,
+        }
+        assert [test["test_name"] for test in buckets["high"]["exemplars"]] == ["good_0", "good_1"]
+        assert compact["tests_with_issues"] == [
+            {
+                "test_name": "vague",
+                "file_path": "tests/test_a.py",
+                "issues_found": ["asserts nothing"],
+                "naming_suggestions": ["test_returns_total"],
+            },
+            {
+                "test_name": "unscored",
+                "file_path": None,
+                "issues_found": ["name mismatch"],
+                "naming_suggestions": [],
+            },
+        ]
+
+    @pytest.mark.parametrize("analysis", ["not json", None, ["not", "a", "dict"]])
+    def test_should_return_none_for_unreadable_analysis(self, analysis):
+        """Should signal an analysis it can't read so callers fall back to the full text."""
+        # Act & Assert
+        assert compact_test_analysis(analysis) is None
+
+
+class TestHashTargetProject:
+    """Test finding a saved report for an unchanged project."""
+
+    def test_should_report_saved_report_for_unchanged_project(self, temp_dir):
+        """Should return the saved report path once a report exists for the project hash."""
+        # Arrange
+        project_dir = os.path.join(temp_dir, "project")
+        write_file(project_dir, "tests/test_a.py", "def test_a(): pass\n")
+        tool_context = SimpleNamespace(state={})
+        with patch("project_test_summarizer.tools.REPORT_CACHE_DIR", temp_dir):
+            first = hash_target_project(project_dir, tool_context)
+            saved_report = _cached_report_path(first["project_hash"])
+            write_file(temp_dir, os.path.basename(saved_report))
+
+            # Act
+            second = hash_target_project(project_dir, tool_context)
+
+        # Assert
+        assert first["cached_report"] is None
+        assert second["project_hash"] == first["project_hash"]
+        assert second["cached_report"] == saved_report
+        assert tool_context.state[STATE_PROJECT_HASH] == first["project_hash"]
+
+    def test_should_not_reuse_report_from_a_different_analyzer(self, temp_dir):
+        """Should ignore a report saved by an analyzer with other prompts, models or schemas."""
+        # Arrange
+        project_dir = os.path.join(temp_dir, "project")
+        write_file(project_dir, "tests/test_a.py", "def test_a(): pass\n")
+        with patch("project_test_summarizer.tools.REPORT_CACHE_DIR", temp_dir):
+            project_hash = hash_target_project(project_dir)["project_hash"]
+            write_file(temp_dir, os.path.basename(_cached_report_path(project_hash)))
+
+            # Act
+            with patch(
+                "project_test_summarizer.tools.analyzer_fingerprint", return_value="changed"
+            ):
+                result = hash_target_project(project_dir)
+
+        # Assert
+        assert result["cached_report"] is None
+
+
+class TestDiscoverTestFiles:
+    """Test the in-memory index of discovered test files."""
+
+    def test_should_reuse_index_for_same_project_hash(self, temp_dir):
+        """Should walk the tree once per directory and project hash."""
+        # Arrange
+        write_file(temp_dir, "tests/test_a.py")
+        tool_context = SimpleNamespace(state={STATE_PROJECT_HASH: f"hash-{temp_dir}"})
+        first = discover_test_files(temp_dir, tool_context)
+
+        # Act
+        with patch("project_test_summarizer.tools._find_matching_files") as mock_find:
+            second = discover_test_files(temp_dir, tool_context)
+
+        # Assert
+        mock_find.assert_not_called()
+        assert second == first
+        assert second["total_test_files_found"] == 1
+        assert tool_context.state == {STATE_PROJECT_HASH: f"hash-{temp_dir}"}
+
+    def test_should_walk_again_without_project_hash(self, temp_dir):
+        """Should not index results before the project has been hashed."""
+        # Arrange
+        write_file(temp_dir, "tests/test_a.py")
+        discover_test_files(temp_dir, SimpleNamespace(state={}))
+        write_file(temp_dir, "tests/test_b.py")
+
+        # Act
+        result = discover_test_files(temp_dir, SimpleNamespace(state={}))
+
+        # Assert
+        assert result["total_test_files_found"] == 2